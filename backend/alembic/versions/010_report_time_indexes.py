@@ -0,0 +1,40 @@
+"""Index event timestamps used by report time series
+
+Revision ID: 010_report_time_indexes
+Revises: 009_add_article_url
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '010_report_time_indexes'
+down_revision: Union[str, None] = '009_add_article_url'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_signups_created_at', 'signups', 'created_at'),
+    ('ix_signups_approved_at', 'signups', 'approved_at'),
+    ('ix_signups_checkin_time', 'signups', 'checkin_time'),
+    ('ix_activity_feedbacks_created_at', 'activity_feedbacks', 'created_at'),
+    ('ix_activity_favorites_created_at', 'activity_favorites', 'created_at'),
+    ('ix_activity_likes_created_at', 'activity_likes', 'created_at'),
+    ('ix_activity_shares_created_at', 'activity_shares', 'created_at'),
+    ('ix_activity_comments_created_at', 'activity_comments', 'created_at'),
+]
+
+
+def upgrade() -> None:
+    """Allow the report window filter to use range scans."""
+    for name, table, column in INDEXES:
+        op.create_index(name, table, [column])
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
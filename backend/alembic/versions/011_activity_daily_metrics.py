@@ -0,0 +1,41 @@
+"""Add activity_daily_metrics rollup table
+
+Revision ID: 011_activity_daily_metrics
+Revises: 010_report_time_indexes
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '011_activity_daily_metrics'
+down_revision: Union[str, None] = '010_report_time_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+METRICS = ('signups', 'approvals', 'checkins', 'feedbacks', 'favorites', 'likes', 'shares', 'comments')
+
+
+def upgrade() -> None:
+    """Create the rollup table; populate it with scripts/rebuild_daily_metrics.py."""
+    op.create_table(
+        'activity_daily_metrics',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('activity_id', sa.Integer(), sa.ForeignKey('activities.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('metric_date', sa.Date(), nullable=False),
+        *[sa.Column(name, sa.Integer(), nullable=False, server_default=sa.text('0')) for name in METRICS],
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.UniqueConstraint('activity_id', 'metric_date', name='uq_activity_daily_metrics_day'),
+    )
+    op.create_index('ix_activity_daily_metrics_date', 'activity_daily_metrics', ['metric_date'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_activity_daily_metrics_date', table_name='activity_daily_metrics')
+    op.drop_table('activity_daily_metrics')
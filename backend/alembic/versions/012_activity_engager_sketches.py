@@ -0,0 +1,38 @@
+"""Add activity_engager_sketches table
+
+Revision ID: 012_activity_engager_sketches
+Revises: 011_activity_daily_metrics
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '012_activity_engager_sketches'
+down_revision: Union[str, None] = '011_activity_daily_metrics'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the sketch table; populate it with scripts/rebuild_engager_sketches.py."""
+    op.create_table(
+        'activity_engager_sketches',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('activity_id', sa.Integer(), sa.ForeignKey('activities.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('sketch_date', sa.Date(), nullable=False),
+        sa.Column('registers', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.UniqueConstraint('activity_id', 'sketch_date', name='uq_activity_engager_sketches_day'),
+    )
+    op.create_index('ix_activity_engager_sketches_date', 'activity_engager_sketches', ['sketch_date'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_activity_engager_sketches_date', table_name='activity_engager_sketches')
+    op.drop_table('activity_engager_sketches')
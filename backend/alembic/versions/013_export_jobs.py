@@ -0,0 +1,61 @@
+"""Add export_jobs table
+
+Revision ID: 013_export_jobs
+Revises: 012_activity_engager_sketches
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '013_export_jobs'
+down_revision: Union[str, None] = '012_activity_engager_sketches'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+export_job_status_enum = sa.Enum(
+    'pending', 'running', 'succeeded', 'failed', 'expired', name='export_job_status'
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'export_jobs',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('activity_id', sa.Integer(), sa.ForeignKey('activities.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('format', sa.String(length=10), nullable=False),
+        sa.Column('params', sa.JSON(), nullable=True),
+        sa.Column('params_hash', sa.String(length=64), nullable=False),
+        sa.Column('status', export_job_status_enum, nullable=False),
+        sa.Column(
+            'requested_by_admin_id',
+            sa.Integer(),
+            sa.ForeignKey('admin_users.id', ondelete='SET NULL'),
+            nullable=True,
+        ),
+        sa.Column('total_rows', sa.Integer(), nullable=True),
+        sa.Column('processed_rows', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('filename', sa.String(length=255), nullable=True),
+        sa.Column('file_path', sa.String(length=512), nullable=True),
+        sa.Column('file_size', sa.BigInteger(), nullable=True),
+        sa.Column('error_message', sa.String(length=255), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+    )
+    op.create_index('ix_export_jobs_params_hash', 'export_jobs', ['params_hash', 'created_at'])
+    op.create_index('ix_export_jobs_status_expires', 'export_jobs', ['status', 'expires_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_export_jobs_status_expires', table_name='export_jobs')
+    op.drop_index('ix_export_jobs_params_hash', table_name='export_jobs')
+    op.drop_table('export_jobs')
+    export_job_status_enum.drop(op.get_bind(), checkfirst=True)
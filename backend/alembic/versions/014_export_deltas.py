@@ -0,0 +1,57 @@
+"""Index updated_at for delta exports and add export_tombstones
+
+Revision ID: 014_export_deltas
+Revises: 013_export_jobs
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '014_export_deltas'
+down_revision: Union[str, None] = '013_export_jobs'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_signups_updated_at', 'signups', 'updated_at'),
+    ('ix_payments_updated_at', 'payments', 'updated_at'),
+    ('ix_activity_comments_updated_at', 'activity_comments', 'updated_at'),
+    ('ix_activity_shares_updated_at', 'activity_shares', 'updated_at'),
+]
+
+
+def _existing_tables() -> set[str]:
+    # payments is not created by an earlier revision in every deployment
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade() -> None:
+    """Let delta exports find changed rows with range scans on updated_at."""
+    tables = _existing_tables()
+    for name, table, column in INDEXES:
+        if table in tables:
+            op.create_index(name, table, [column])
+    op.create_table(
+        'export_tombstones',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('entity_type', sa.String(length=20), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('activity_id', sa.Integer(), nullable=True),
+        sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+    )
+    op.create_index('ix_export_tombstones_type_deleted_at', 'export_tombstones', ['entity_type', 'deleted_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_export_tombstones_type_deleted_at', table_name='export_tombstones')
+    op.drop_table('export_tombstones')
+    tables = _existing_tables()
+    for name, table, _ in reversed(INDEXES):
+        if table in tables:
+            op.drop_index(name, table_name=table)
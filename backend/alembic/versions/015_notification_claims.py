@@ -0,0 +1,33 @@
+"""Add dispatcher claim columns to notification_logs
+
+Revision ID: 015_notification_claims
+Revises: 014_export_deltas
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '015_notification_claims'
+down_revision: Union[str, None] = '014_export_deltas'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Let several dispatcher workers claim pending notifications without sending them twice."""
+    with op.batch_alter_table('notification_logs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('claim_token', sa.String(length=36), nullable=True))
+        batch_op.add_column(sa.Column('claimed_until', sa.DateTime(timezone=True), nullable=True))
+        batch_op.create_index('ix_notification_logs_status_claimed_until', ['status', 'claimed_until'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('notification_logs', schema=None) as batch_op:
+        batch_op.drop_index('ix_notification_logs_status_claimed_until')
+        batch_op.drop_column('claimed_until')
+        batch_op.drop_column('claim_token')
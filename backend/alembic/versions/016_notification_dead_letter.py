@@ -0,0 +1,50 @@
+"""Add read and dead_letter notification statuses
+
+Revision ID: 016_notification_dead_letter
+Revises: 015_notification_claims
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '016_notification_dead_letter'
+down_revision: Union[str, None] = '015_notification_claims'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OLD_STATUSES = ('pending', 'sending', 'sent', 'failed')
+# "read" is used by mark_all_read but was never added to the column type
+NEW_STATUSES = OLD_STATUSES + ('read', 'dead_letter')
+
+
+def _alter_status(statuses: tuple[str, ...], previous: tuple[str, ...]) -> None:
+    with op.batch_alter_table('notification_logs', schema=None) as batch_op:
+        batch_op.alter_column(
+            'status',
+            type_=sa.Enum(*statuses, name='notification_status'),
+            existing_type=sa.Enum(*previous, name='notification_status'),
+            existing_nullable=False,
+        )
+
+
+def upgrade() -> None:
+    """Notifications that exhausted their retries are parked as dead_letter."""
+    if op.get_bind().dialect.name == 'postgresql':
+        for status in NEW_STATUSES[len(OLD_STATUSES):]:
+            op.execute(f"ALTER TYPE notification_status ADD VALUE IF NOT EXISTS '{status}'")
+        return
+    _alter_status(NEW_STATUSES, OLD_STATUSES)
+
+
+def downgrade() -> None:
+    op.execute("UPDATE notification_logs SET status = 'failed' WHERE status = 'dead_letter'")
+    op.execute("UPDATE notification_logs SET status = 'sent' WHERE status = 'read'")
+    if op.get_bind().dialect.name == 'postgresql':
+        # enum values cannot be dropped in PostgreSQL; the unused labels stay
+        return
+    _alter_status(OLD_STATUSES, NEW_STATUSES)
@@ -0,0 +1,40 @@
+"""Add the cached unread counter and inbox index
+
+Revision ID: 017_notification_inbox
+Revises: 016_notification_dead_letter
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '017_notification_inbox'
+down_revision: Union[str, None] = '016_notification_dead_letter'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Serve the unread badge from a counter and page the inbox by (created_at, id)."""
+    with op.batch_alter_table('user_profiles', schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column('unread_notification_count', sa.Integer(), nullable=False, server_default='0')
+        )
+    op.execute(
+        "UPDATE user_profiles SET unread_notification_count = ("
+        "SELECT count(*) FROM notification_logs "
+        "WHERE notification_logs.user_id = user_profiles.id AND notification_logs.status != 'read')"
+    )
+    with op.batch_alter_table('notification_logs', schema=None) as batch_op:
+        batch_op.create_index('ix_notification_logs_user_created_id', ['user_id', 'created_at', 'id'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('notification_logs', schema=None) as batch_op:
+        batch_op.drop_index('ix_notification_logs_user_created_id')
+    with op.batch_alter_table('user_profiles', schema=None) as batch_op:
+        batch_op.drop_column('unread_notification_count')
@@ -0,0 +1,57 @@
+"""Add notification digests
+
+Revision ID: 018_notification_digests
+Revises: 017_notification_inbox
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '018_notification_digests'
+down_revision: Union[str, None] = '017_notification_inbox'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OLD_EVENTS = ('signup_submitted', 'signup_approved', 'signup_rejected', 'signup_reminder', 'checkin_reminder')
+NEW_EVENTS = OLD_EVENTS + ('digest',)
+
+
+def _alter_event(events: tuple[str, ...], previous: tuple[str, ...]) -> None:
+    with op.batch_alter_table('notification_logs', schema=None) as batch_op:
+        batch_op.alter_column(
+            'event',
+            type_=sa.Enum(*events, name='notification_event'),
+            existing_type=sa.Enum(*previous, name='notification_event'),
+            existing_nullable=False,
+        )
+
+
+def upgrade() -> None:
+    """Coalesce a user's notifications on one channel into a single digest delivery."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("ALTER TYPE notification_event ADD VALUE IF NOT EXISTS 'digest'")
+    else:
+        _alter_event(NEW_EVENTS, OLD_EVENTS)
+    with op.batch_alter_table('notification_logs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('digest_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_notification_logs_digest_id', 'notification_logs', ['digest_id'], ['id'], ondelete='SET NULL'
+        )
+        batch_op.create_index('ix_notification_logs_digest_id', ['digest_id'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('notification_logs', schema=None) as batch_op:
+        batch_op.drop_index('ix_notification_logs_digest_id')
+        batch_op.drop_constraint('fk_notification_logs_digest_id', type_='foreignkey')
+        batch_op.drop_column('digest_id')
+    op.execute("DELETE FROM notification_logs WHERE event = 'digest'")
+    if op.get_bind().dialect.name == 'postgresql':
+        # enum values cannot be dropped in PostgreSQL; the unused label stays
+        return
+    _alter_event(OLD_EVENTS, NEW_EVENTS)
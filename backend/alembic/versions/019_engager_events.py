@@ -0,0 +1,38 @@
+"""Queue engager events instead of locking the daily sketch
+
+Revision ID: 019_engager_events
+Revises: 018_notification_digests
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '019_engager_events'
+down_revision: Union[str, None] = '018_notification_digests'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Engagements append here; the scheduler folds the rows into activity_engager_sketches."""
+    op.create_table(
+        'activity_engager_events',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('activity_id', sa.Integer(), sa.ForeignKey('activities.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('event_date', sa.Date(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+    )
+    op.create_index(
+        'ix_activity_engager_events_activity_date', 'activity_engager_events', ['activity_id', 'event_date']
+    )
+
+
+def downgrade() -> None:
+    # queued events are dropped; scripts/rebuild_engager_sketches.py recomputes the sketches
+    op.drop_index('ix_activity_engager_events_activity_date', table_name='activity_engager_events')
+    op.drop_table('activity_engager_events')
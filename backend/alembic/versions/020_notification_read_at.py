@@ -0,0 +1,36 @@
+"""Keep notification read state apart from delivery status
+
+Revision ID: 020_notification_read_at
+Revises: 019_engager_events
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '020_notification_read_at'
+down_revision: Union[str, None] = '019_engager_events'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Reading stamps read_at instead of setting status to 'read'; the unread counter keys on it."""
+    with op.batch_alter_table('notification_logs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('read_at', sa.DateTime(timezone=True), nullable=True))
+    # rows already read keep counting as read (the counter needs no recount)
+    op.execute("UPDATE notification_logs SET read_at = updated_at WHERE status = 'read'")
+
+
+def downgrade() -> None:
+    op.execute(
+        "UPDATE user_profiles SET unread_notification_count = ("
+        "SELECT count(*) FROM notification_logs "
+        "WHERE notification_logs.user_id = user_profiles.id AND notification_logs.status != 'read')"
+    )
+    with op.batch_alter_table('notification_logs', schema=None) as batch_op:
+        batch_op.drop_column('read_at')
@@ -7,7 +7,7 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
 from app.core.security import InvalidTokenError, safe_decode_token
-from app.db.session import get_db
+from app.db.session import SessionLocal, get_db
 from app.models.admin import AdminUser
 from app.models.enums import ActivityStatus
 from app.models.user import UserProfile
@@ -20,6 +20,8 @@ from app.services.feedbacks import ActivityFeedbackService
 from app.services.signups import SignupService
 from app.services.audit import AuditLogService
 from app.services.exports import ExportService
+from app.services.export_bundles import ExportBundleService
+from app.services.export_jobs import ExportJobService
 from app.services.reports import ReportService
 from app.services.engagements import ActivityEngagementService
 from app.services.badge_rules import BadgeRuleService
@@ -71,11 +73,19 @@ def get_audit_log_service(session: SessionDep) -> AuditLogService:
 
 
 def get_export_service(session: SessionDep) -> ExportService:
-    return ExportService(session)
+    return ExportService(session, session_factory=SessionLocal)
+
+
+def get_export_job_service(session: SessionDep) -> ExportJobService:
+    return ExportJobService(session, session_factory=SessionLocal)
+
+
+def get_export_bundle_service(session: SessionDep) -> ExportBundleService:
+    return ExportBundleService(session, session_factory=SessionLocal)
 
 
 def get_report_service(session: SessionDep) -> ReportService:
-    return ReportService(session)
+    return ReportService(session, session_factory=SessionLocal)
 
 
 def get_engagement_service(session: SessionDep) -> ActivityEngagementService:
@@ -1,7 +1,6 @@
 """Activity API endpoints (placeholders for implementation)."""
 
-import io
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import StreamingResponse
@@ -28,7 +27,7 @@ from app.services.activities import ActivityService
 from app.services.exceptions import InvalidStatusTransition
 from app.services.feedbacks import ActivityFeedbackService
 from app.services.signups import SignupService
-from app.services.exports import ExportService
+from app.services.exports import ExportService, export_media_type
 from app.schemas.signup import RecentSignupUser
 
 router = APIRouter()
@@ -122,59 +121,65 @@ def activity_stats(
     return ActivityStats(**stats, average_rating=ratings["average_rating"], total_feedbacks=ratings["total_feedbacks"])
 
 
+def _export_response(filename: str, content: Iterator[bytes]) -> StreamingResponse:
+    return StreamingResponse(
+        content,
+        media_type=export_media_type(filename),
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @router.get("/{activity_id}/exports/signups")
 def export_activity_signups(
     activity_id: int,
-    format: str = Query("csv", pattern="^(csv|xlsx)$"),
+    format: str = Query("csv", pattern="^(csv|xlsx|parquet|arrow)$"),
     ids: Optional[List[int]] = Query(None, description="可选，按报名ID筛选"),
     export_service: ExportService = Depends(get_export_service),
     current_admin: AdminUser = Depends(get_current_admin),
 ) -> StreamingResponse:
-    result = export_service.activity_signups_export(activity_id, actor_admin_id=current_admin.id, fmt=format, ids=ids or None)
+    result = export_service.stream_activity_signups_export(activity_id, actor_admin_id=current_admin.id, fmt=format, ids=ids or None)
     if not result:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Activity not found")
-    filename, content = result
-    return StreamingResponse(
-        io.BytesIO(content),
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet" if filename.endswith(".xlsx") else "text/csv",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
-    )
+    return _export_response(*result)
 
 
 @router.get("/{activity_id}/exports/comments")
 def export_activity_comments(
     activity_id: int,
-    format: str = Query("csv", pattern="^(csv|xlsx)$"),
+    format: str = Query("csv", pattern="^(csv|xlsx|parquet|arrow)$"),
     export_service: ExportService = Depends(get_export_service),
     current_admin: AdminUser = Depends(get_current_admin),
 ) -> StreamingResponse:
-    result = export_service.activity_comments_export(activity_id, actor_admin_id=current_admin.id, fmt=format)
+    result = export_service.stream_activity_comments_export(activity_id, actor_admin_id=current_admin.id, fmt=format)
     if not result:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Activity not found")
-    filename, content = result
-    return StreamingResponse(
-        io.BytesIO(content),
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet" if filename.endswith(".xlsx") else "text/csv",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
-    )
+    return _export_response(*result)
 
 
 @router.get("/{activity_id}/exports/shares")
 def export_activity_shares(
     activity_id: int,
-    format: str = Query("csv", pattern="^(csv|xlsx)$"),
+    format: str = Query("csv", pattern="^(csv|xlsx|parquet|arrow)$"),
     export_service: ExportService = Depends(get_export_service),
     current_admin: AdminUser = Depends(get_current_admin),
 ) -> StreamingResponse:
-    result = export_service.activity_shares_export(activity_id, actor_admin_id=current_admin.id, fmt=format)
+    result = export_service.stream_activity_shares_export(activity_id, actor_admin_id=current_admin.id, fmt=format)
     if not result:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Activity not found")
-    filename, content = result
-    return StreamingResponse(
-        io.BytesIO(content),
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet" if filename.endswith(".xlsx") else "text/csv",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
-    )
+    return _export_response(*result)
+
+
+@router.get("/{activity_id}/exports/payments")
+def export_activity_payments(
+    activity_id: int,
+    format: str = Query("csv", pattern="^(csv|xlsx|parquet|arrow)$"),
+    export_service: ExportService = Depends(get_export_service),
+    current_admin: AdminUser = Depends(get_current_admin),
+) -> StreamingResponse:
+    result = export_service.stream_activity_payments_export(activity_id, actor_admin_id=current_admin.id, fmt=format)
+    if not result:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Activity not found")
+    return _export_response(*result)
 
 
 @router.patch("/{activity_id}", response_model=ActivityDetail)
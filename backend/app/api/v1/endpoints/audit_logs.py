@@ -3,11 +3,13 @@
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 
-from app.api.deps import get_audit_log_service, get_current_admin
+from app.api.deps import get_audit_log_service, get_current_admin, get_export_service
 from app.models.enums import AuditAction, AuditEntity
 from app.schemas.audit import AuditLogRead
 from app.services.audit import AuditLogService
+from app.services.exports import ExportService, export_media_type
 
 router = APIRouter()
 
@@ -36,3 +38,27 @@ def list_audit_logs(
             offset=offset,
         )
     )
+
+
+@router.get("/export")
+def export_audit_logs(
+    *,
+    action: Optional[AuditAction] = Query(None),
+    entity_type: Optional[AuditEntity] = Query(None),
+    entity_id: Optional[int] = Query(None),
+    format: str = Query("csv", pattern="^(csv|xlsx|parquet|arrow)$"),
+    export_service: ExportService = Depends(get_export_service),
+    current_admin = Depends(get_current_admin),
+) -> StreamingResponse:
+    filename, content = export_service.stream_audit_log_export(
+        actor_admin_id=current_admin.id,
+        fmt=format,
+        action=action,
+        entity_type=entity_type,
+        entity_id=entity_id,
+    )
+    return StreamingResponse(
+        content,
+        media_type=export_media_type(filename),
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
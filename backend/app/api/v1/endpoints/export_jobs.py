@@ -0,0 +1,69 @@
+"""Background export jobs: submit, poll and download."""
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import FileResponse
+
+from app.api.deps import get_current_admin, get_export_job_service
+from app.models.admin import AdminUser
+from app.models.enums import ExportJobStatus
+from app.schemas.export_job import ExportJobCreate, ExportJobRead
+from app.services.export_jobs import ExportJobService
+from app.services.exports import export_media_type
+
+router = APIRouter()
+
+
+@router.post("", response_model=ExportJobRead, status_code=status.HTTP_202_ACCEPTED)
+def create_export_job(
+    payload: ExportJobCreate,
+    response: Response,
+    service: ExportJobService = Depends(get_export_job_service),
+    current_admin: AdminUser = Depends(get_current_admin),
+) -> ExportJobRead:
+    try:
+        result = service.submit(
+            kind=payload.kind,
+            activity_id=payload.activity_id,
+            fmt=payload.format,
+            ids=payload.ids or None,
+            actor_admin_id=current_admin.id,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    if not result:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Activity not found")
+    job, created = result
+    if not created:
+        response.status_code = status.HTTP_200_OK
+    return job
+
+
+@router.get("/{job_id}", response_model=ExportJobRead)
+def get_export_job(
+    job_id: int,
+    service: ExportJobService = Depends(get_export_job_service),
+    current_admin: AdminUser = Depends(get_current_admin),
+) -> ExportJobRead:
+    job = service.get(job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Export job not found")
+    return job
+
+
+@router.get("/{job_id}/download")
+def download_export_job(
+    job_id: int,
+    service: ExportJobService = Depends(get_export_job_service),
+    current_admin: AdminUser = Depends(get_current_admin),
+) -> FileResponse:
+    job = service.get(job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Export job not found")
+    path = service.artifact_path(job)
+    if path is None:
+        if job.status in (ExportJobStatus.PENDING, ExportJobStatus.RUNNING):
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Export job not finished")
+        if job.status == ExportJobStatus.FAILED:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Export job failed")
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Export artifact expired")
+    return FileResponse(path, media_type=export_media_type(job.filename or path.name), filename=job.filename)
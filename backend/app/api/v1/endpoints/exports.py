@@ -0,0 +1,71 @@
+"""Exports across activities: incremental deltas and ZIP bundles."""
+
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from app.api.deps import get_current_admin, get_export_bundle_service, get_export_service
+from app.models.admin import AdminUser
+from app.schemas.export_job import ExportBundleCreate
+from app.services.export_bundles import ExportBundleService
+from app.services.exports import ExportService, export_media_type
+
+router = APIRouter()
+
+
+@router.get("/{kind}/delta")
+def export_delta(
+    kind: str,
+    activity_id: Optional[int] = Query(None, description="可选，仅导出该活动"),
+    since: Optional[datetime] = Query(None, description="只导出此时间之后变更的记录"),
+    cursor: Optional[str] = Query(None, description="上次导出返回的 X-Export-Cursor，优先于 since"),
+    format: str = Query("csv", pattern="^(csv|xlsx)$"),
+    export_service: ExportService = Depends(get_export_service),
+    current_admin: AdminUser = Depends(get_current_admin),
+) -> StreamingResponse:
+    try:
+        result = export_service.stream_delta_export(
+            kind,
+            activity_id=activity_id,
+            since=since,
+            cursor=cursor,
+            actor_admin_id=current_admin.id,
+            fmt=format,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    if not result:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Activity not found")
+    filename, content, next_cursor = result
+    return StreamingResponse(
+        content,
+        media_type=export_media_type(filename),
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Export-Cursor": next_cursor,
+        },
+    )
+
+
+@router.post("/bundle")
+def export_bundle(
+    payload: ExportBundleCreate,
+    bundle_service: ExportBundleService = Depends(get_export_bundle_service),
+    current_admin: AdminUser = Depends(get_current_admin),
+) -> StreamingResponse:
+    try:
+        result = bundle_service.stream_bundle(
+            payload.activity_ids, payload.kinds, fmt=payload.format, actor_admin_id=current_admin.id
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    if not result:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Activity not found")
+    filename, content = result
+    return StreamingResponse(
+        content,
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
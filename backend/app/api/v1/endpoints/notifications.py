@@ -2,7 +2,7 @@
 
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 
 from app.api.deps import get_current_admin, get_current_user, get_notification_service
 from app.models.user import UserProfile
@@ -12,6 +12,7 @@ from app.schemas.notification import (
     NotificationPreviewRequest,
     NotificationPreviewResponse,
     NotificationEnqueueRequest,
+    NotificationUnreadCount,
 )
 from app.services.notifications import NotificationService
 
@@ -32,14 +33,29 @@ def list_notifications(
 
 @router.get("/me", response_model=List[NotificationLogRead])
 def list_my_notifications(
+    response: Response,
     service: NotificationService = Depends(get_notification_service),
     current_user: UserProfile = Depends(get_current_user),
     limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="上一页返回的 X-Next-Cursor"),
 ) -> List[NotificationLogRead]:
-    logs = service.list_logs(user_id=current_user.id, limit=limit)
+    try:
+        logs, next_cursor = service.list_inbox(current_user.id, limit=limit, cursor=cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return [NotificationLogRead.model_validate(log, from_attributes=True) for log in logs]
 
 
+@router.get("/me/unread-count", response_model=NotificationUnreadCount)
+def my_unread_count(
+    service: NotificationService = Depends(get_notification_service),
+    current_user: UserProfile = Depends(get_current_user),
+) -> NotificationUnreadCount:
+    return NotificationUnreadCount(unread=service.unread_count(current_user.id))
+
+
 @router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
 def clear_my_notifications(
     service: NotificationService = Depends(get_notification_service),
@@ -1,9 +1,20 @@
 """Reporting endpoints for administrative dashboards."""
 
-from fastapi import APIRouter, Depends, Query
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 
 from app.api.deps import get_current_admin, get_report_service
-from app.schemas.report import ReportOverview, ReportActivity
+from app.schemas.report import (
+    ReportActivity,
+    ReportActivityBatch,
+    ReportActivityBatchRequest,
+    ReportCacheStats,
+    ReportFunnel,
+    ReportOverview,
+    ReportUniqueEngagers,
+)
+from app.services.report_cache import get_report_cache
 from app.services.reports import ReportService
 
 router = APIRouter()
@@ -12,10 +23,15 @@ router = APIRouter()
 @router.get("/overview", response_model=ReportOverview)
 def get_report_overview(
     days: int | None = Query(None, ge=1, le=365, description="统计时间范围（天）"),
+    granularity: str = Query("day", pattern="^(hour|day|week|month)$", description="时间序列粒度"),
+    tz: str | None = Query(None, description="时间序列时区，如 Asia/Shanghai"),
     service: ReportService = Depends(get_report_service),
     current_admin=Depends(get_current_admin),
 ) -> ReportOverview:
-    data = service.overview(days=days)
+    try:
+        data = service.cached_overview(days=days, granularity=granularity, tz=tz)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
     return ReportOverview(**data)
 
 
@@ -23,8 +39,63 @@ def get_report_overview(
 def get_activity_report(
     activity_id: int,
     days: int | None = Query(None, ge=1, le=365, description="统计时间范围（天）"),
+    granularity: str = Query("day", pattern="^(hour|day|week|month)$", description="时间序列粒度"),
+    tz: str | None = Query(None, description="时间序列时区，如 Asia/Shanghai"),
     service: ReportService = Depends(get_report_service),
     current_admin=Depends(get_current_admin),
 ) -> ReportActivity:
-    data = service.activity_report(activity_id, days=days)
+    try:
+        data = service.cached_activity_report(activity_id, days=days, granularity=granularity, tz=tz)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
     return ReportActivity(**data)
+
+
+@router.post("/activity/batch", response_model=ReportActivityBatch)
+def get_activity_reports_batch(
+    payload: ReportActivityBatchRequest,
+    service: ReportService = Depends(get_report_service),
+    current_admin=Depends(get_current_admin),
+) -> ReportActivityBatch:
+    """一次请求返回多个活动的统计报告（活动列表页使用）"""
+    try:
+        items = service.cached_batch_activity_reports(
+            payload.activity_ids, days=payload.days, granularity=payload.granularity, tz=payload.tz
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return ReportActivityBatch(items=[ReportActivity(**item) for item in items])
+
+
+@router.get("/activity/{activity_id}/funnel", response_model=ReportFunnel)
+def get_activity_funnel(
+    activity_id: int,
+    service: ReportService = Depends(get_report_service),
+    current_admin=Depends(get_current_admin),
+) -> ReportFunnel:
+    data = service.cached_funnel_report(activity_id)
+    return ReportFunnel(**data)
+
+
+@router.get("/unique-engagers", response_model=ReportUniqueEngagers)
+def get_unique_engagers(
+    activity_id: int | None = Query(None, description="活动ID（默认全部活动）"),
+    start_date: date | None = Query(None, description="开始日期（UTC）"),
+    end_date: date | None = Query(None, description="结束日期（UTC）"),
+    days: int = Query(30, ge=1, le=365, description="未指定日期时统计最近天数"),
+    service: ReportService = Depends(get_report_service),
+    current_admin=Depends(get_current_admin),
+) -> ReportUniqueEngagers:
+    """参与用户去重数（HyperLogLog 近似值，标准误差约 3%）"""
+    try:
+        data = service.unique_engagers(activity_id=activity_id, start_date=start_date, end_date=end_date, days=days)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return ReportUniqueEngagers(**data)
+
+
+@router.get("/cache/stats", response_model=ReportCacheStats)
+def get_report_cache_stats(
+    current_admin=Depends(get_current_admin),
+) -> ReportCacheStats:
+    return ReportCacheStats(**get_report_cache().stats())
@@ -5,7 +5,7 @@ from fastapi import APIRouter
 from app.api.v1.endpoints import (
     activities, auth, badges, notifications, signups, feedbacks, audit_logs,
     reports, engagements, users, badge_rules, scheduler, registrations, wechat,
-    payments, invoice_headers,
+    payments, invoice_headers, export_jobs, exports,
 )
 
 api_router = APIRouter()
@@ -19,6 +19,8 @@ api_router.include_router(notifications.router, prefix="/notifications", tags=["
 api_router.include_router(feedbacks.router, tags=["feedbacks"])
 api_router.include_router(audit_logs.router, prefix="/audit-logs", tags=["audit"])
 api_router.include_router(reports.router, prefix="/reports", tags=["reports"])
+api_router.include_router(export_jobs.router, prefix="/export-jobs", tags=["exports"])
+api_router.include_router(exports.router, prefix="/exports", tags=["exports"])
 api_router.include_router(engagements.router, prefix="/activities", tags=["activities"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(badge_rules.router, prefix="/badge-rules", tags=["badges"])
@@ -18,11 +18,56 @@ class Settings(BaseSettings):
     notification_sender_wechat: str = "mock"
     notification_sender_email: str = "mock"
     notification_sender_sms: str = "mock"
+    # "inline": enqueue sends due notifications immediately; "deferred": enqueue only
+    # inserts the log and the background dispatcher sends it
+    notification_delivery_mode: str = "inline"
+    notification_dispatch_latency_seconds: float = 2.0
+    notification_claim_lease_seconds: int = 300
+    notification_dispatch_workers: int = 4
+    notification_dispatch_batch_size: int = 100
+    notification_http_timeout_seconds: float = 5.0
+    notification_http_max_connections: int = 50
+    notification_channel_concurrency: int = 10
+    # sends per second allowed by each provider (0 = unlimited) and the burst after idle periods
+    notification_rate_limit_wechat: float = 0.0
+    notification_rate_limit_email: float = 0.0
+    notification_rate_limit_sms: float = 0.0
+    notification_rate_burst: int = 20
+    # failed sends are retried with exponential backoff, then dead-lettered
+    notification_max_attempts: int = 5
+    notification_retry_base_seconds: float = 30.0
+    notification_retry_max_seconds: float = 3600.0
+    # notifications a user gets on one channel within this many seconds go out as one digest
+    # (0 = off; deferred delivery mode only)
+    notification_coalesce_window_seconds: float = 0.0
     badge_auto_rules_enabled: bool = True
     badge_first_attendance_code: str | None = "first_attendance"
     badge_checkin_code: str | None = "checkin_complete"
     badge_repeat_attendance_code: str | None = "repeat_attendance"
     badge_repeat_attendance_threshold: int = 3
+    report_daily_metrics_enabled: bool = True
+    report_cache_ttl_seconds: float = 30.0
+    report_cache_stale_seconds: float = 0.0
+    report_cache_max_entries: int = 1024
+    # larger batch report requests are computed without the cache
+    report_cache_batch_max_ids: int = 50
+    report_concurrent_enabled: bool = False
+    report_concurrent_workers: int = 4
+    export_spool_max_bytes: int = 8 * 1024 * 1024
+    export_artifacts_dir: str = "var/exports"
+    export_job_workers: int = 2
+    export_job_reuse_seconds: int = 300
+    export_artifact_ttl_seconds: int = 24 * 3600
+    # pending/running jobs not updated for this long are treated as lost (e.g. after a restart)
+    export_job_stale_seconds: int = 1800
+    export_delta_settle_seconds: int = 5
+    export_bundle_workers: int = 4
+    export_bundle_max_entries: int = 200
+    # "immediate": each record is inserted and flushed at once; "buffered": records are
+    # inserted together when the session commits; "async": handed to a writer thread after it
+    audit_write_mode: str = "immediate"
+    audit_async_queue_size: int = 10000
+    audit_async_batch_size: int = 500
 
     model_config = {
         "env_file": ".env",
@@ -1,13 +1,40 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1 import api_router
 from app.core.config import get_settings
+from app.db.session import SessionLocal
+from app.services.audit_writer import get_audit_writer
+from app.services.notification_dispatcher import BackgroundNotificationDispatcher, NotificationDispatcher
+from app.services.notification_senders import get_sender_runtime
 
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # deferred delivery: enqueue only writes the log, this thread sends it
+    dispatcher = None
+    if settings.notification_delivery_mode == "deferred":
+        dispatcher = BackgroundNotificationDispatcher(NotificationDispatcher(SessionLocal))
+        dispatcher.start()
+    try:
+        yield
+    finally:
+        if dispatcher:
+            dispatcher.stop()
+        if settings.audit_write_mode == "async":
+            # write the audit records still queued before the process exits
+            get_audit_writer().close()
+        # close the pooled HTTP client and stop the senders' event loop thread
+        get_sender_runtime().close()
+
+
 app = FastAPI(
     title=settings.app_name,
+    lifespan=lifespan,
     docs_url=f"{settings.api_prefix}/docs",
     openapi_url=f"{settings.api_prefix}/openapi.json",
 )
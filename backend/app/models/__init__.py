@@ -1,12 +1,16 @@
 """Expose SQLAlchemy models for Alembic discovery."""
 
 from app.models.activity import Activity
+from app.models.activity_daily_metric import ActivityDailyMetric
+from app.models.activity_engager_sketch import ActivityEngagerEvent, ActivityEngagerSketch
 from app.models.activity_feedback import ActivityFeedback
 from app.models.activity_engagement import ActivityFavorite, ActivityLike, ActivityShare, ActivityComment
 from app.models.audit import AuditLog
 from app.models.admin import AdminUser
 from app.models.badge import Badge, UserBadge
 from app.models.badge_rule import BadgeRule
+from app.models.export_job import ExportJob
+from app.models.export_tombstone import ExportTombstone
 from app.models.companion import SignupCompanion
 from app.models.form_field import ActivityFormField, ActivityFormFieldOption
 from app.models.invoice_header import InvoiceHeader
@@ -18,6 +22,9 @@ from app.models.user import UserProfile
 __all__ = [
     "AdminUser",
     "Activity",
+    "ActivityDailyMetric",
+    "ActivityEngagerEvent",
+    "ActivityEngagerSketch",
     "ActivityFeedback",
     "ActivityFavorite",
     "ActivityLike",
@@ -28,6 +35,8 @@ __all__ = [
     "ActivityFormFieldOption",
     "Badge",
     "BadgeRule",
+    "ExportJob",
+    "ExportTombstone",
     "InvoiceHeader",
     "NotificationLog",
     "Payment",
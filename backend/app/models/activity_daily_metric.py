@@ -0,0 +1,41 @@
+"""Pre-aggregated per-day activity metrics used by reports."""
+
+from __future__ import annotations
+
+from datetime import date
+
+from sqlalchemy import Column, Date, ForeignKey, Index, Integer, UniqueConstraint, text
+from sqlalchemy.orm import Mapped
+
+from app.db.base import Base
+from app.models.mixins import TimestampMixin
+
+
+class ActivityDailyMetric(TimestampMixin, Base):
+    """Event counts for one activity on one UTC day.
+
+    Rows are maintained incrementally on every flush that touches signups,
+    feedback or engagement rows (see ``app.services.report_rollups``).
+    """
+
+    __tablename__ = "activity_daily_metrics"
+
+    id: Mapped[int] = Column(Integer, primary_key=True, autoincrement=True)
+    activity_id: Mapped[int] = Column(ForeignKey("activities.id", ondelete="CASCADE"), nullable=False)
+    metric_date: Mapped[date] = Column(Date, nullable=False)
+    signups: Mapped[int] = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    approvals: Mapped[int] = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    checkins: Mapped[int] = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    feedbacks: Mapped[int] = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    favorites: Mapped[int] = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    likes: Mapped[int] = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    shares: Mapped[int] = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    comments: Mapped[int] = Column(Integer, nullable=False, default=0, server_default=text("0"))
+
+    __table_args__ = (
+        UniqueConstraint("activity_id", "metric_date", name="uq_activity_daily_metrics_day"),
+        Index("ix_activity_daily_metrics_date", "metric_date"),
+    )
+
+    def __repr__(self) -> str:  # pragma: no cover - debug helper
+        return f"ActivityDailyMetric(activity_id={self.activity_id!r}, metric_date={self.metric_date!r})"
@@ -5,7 +5,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Text, UniqueConstraint
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, String, Text, UniqueConstraint
 from sqlalchemy.orm import Mapped, relationship
 
 from app.db.base import Base
@@ -28,6 +28,7 @@ class ActivityFavorite(TimestampMixin, Base):
 
     __table_args__ = (
         UniqueConstraint("activity_id", "user_id", name="uq_activity_favorites_user"),
+        Index("ix_activity_favorites_created_at", "created_at"),
     )
 
     def __repr__(self) -> str:  # pragma: no cover
@@ -46,6 +47,7 @@ class ActivityLike(TimestampMixin, Base):
 
     __table_args__ = (
         UniqueConstraint("activity_id", "user_id", name="uq_activity_likes_user"),
+        Index("ix_activity_likes_created_at", "created_at"),
     )
 
     def __repr__(self) -> str:  # pragma: no cover
@@ -63,6 +65,11 @@ class ActivityShare(TimestampMixin, Base):
     activity: Mapped["Activity"] = relationship("Activity", back_populates="shares")
     user: Mapped["UserProfile | None"] = relationship("UserProfile", back_populates="shares")
 
+    __table_args__ = (
+        Index("ix_activity_shares_created_at", "created_at"),
+        Index("ix_activity_shares_updated_at", "updated_at"),
+    )
+
     def __repr__(self) -> str:  # pragma: no cover
         return f"ActivityShare(activity_id={self.activity_id!r}, user_id={self.user_id!r}, channel={self.channel!r})"
 
@@ -82,5 +89,10 @@ class ActivityComment(TimestampMixin, Base):
     user: Mapped["UserProfile"] = relationship("UserProfile", back_populates="activity_comments")
     parent: Mapped["ActivityComment | None"] = relationship("ActivityComment", remote_side="ActivityComment.id")
 
+    __table_args__ = (
+        Index("ix_activity_comments_created_at", "created_at"),
+        Index("ix_activity_comments_updated_at", "updated_at"),
+    )
+
     def __repr__(self) -> str:  # pragma: no cover
         return f"ActivityComment(id={self.id!r}, activity_id={self.activity_id!r}, user_id={self.user_id!r})"
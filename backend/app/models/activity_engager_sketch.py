@@ -0,0 +1,50 @@
+"""Per-day HyperLogLog sketches of the users engaging with an activity, and the events not yet folded in."""
+
+from __future__ import annotations
+
+from datetime import date
+
+from sqlalchemy import Column, Date, ForeignKey, Index, Integer, LargeBinary, UniqueConstraint
+from sqlalchemy.orm import Mapped
+
+from app.db.base import Base
+from app.models.mixins import TimestampMixin
+
+
+class ActivityEngagerSketch(TimestampMixin, Base):
+    """Sketch of distinct users who signed up, liked, favorited, shared or commented on one UTC day.
+
+    ``registers`` holds the raw registers of an ``app.utils.hyperloglog.HyperLogLog``.
+    """
+
+    __tablename__ = "activity_engager_sketches"
+
+    id: Mapped[int] = Column(Integer, primary_key=True, autoincrement=True)
+    activity_id: Mapped[int] = Column(ForeignKey("activities.id", ondelete="CASCADE"), nullable=False)
+    sketch_date: Mapped[date] = Column(Date, nullable=False)
+    registers: Mapped[bytes] = Column(LargeBinary, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("activity_id", "sketch_date", name="uq_activity_engager_sketches_day"),
+        Index("ix_activity_engager_sketches_date", "sketch_date"),
+    )
+
+    def __repr__(self) -> str:  # pragma: no cover - debug helper
+        return f"ActivityEngagerSketch(activity_id={self.activity_id!r}, sketch_date={self.sketch_date!r})"
+
+
+class ActivityEngagerEvent(Base):
+    """A user engaging with an activity on one UTC day, waiting to be folded into that day's sketch.
+
+    Write paths only append these rows, so concurrent engagements never wait on
+    a shared sketch row; ``EngagerSketchRepository.compact`` folds them in.
+    """
+
+    __tablename__ = "activity_engager_events"
+
+    id: Mapped[int] = Column(Integer, primary_key=True, autoincrement=True)
+    activity_id: Mapped[int] = Column(ForeignKey("activities.id", ondelete="CASCADE"), nullable=False)
+    event_date: Mapped[date] = Column(Date, nullable=False)
+    user_id: Mapped[int] = Column(Integer, nullable=False)
+
+    __table_args__ = (Index("ix_activity_engager_events_activity_date", "activity_id", "event_date"),)
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Text, UniqueConstraint
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String, Text, UniqueConstraint
 from sqlalchemy.orm import Mapped, relationship
 
 from app.db.base import Base
@@ -30,6 +30,7 @@ class ActivityFeedback(TimestampMixin, Base):
 
     __table_args__ = (
         UniqueConstraint("activity_id", "user_id", name="uq_activity_feedback_user"),
+        Index("ix_activity_feedbacks_created_at", "created_at"),
         {"mysql_charset": "utf8mb4", "mysql_collate": "utf8mb4_unicode_ci"},
     )
 
@@ -57,6 +57,7 @@ class NotificationStatus(StrEnum):
     SENT = "sent"
     FAILED = "failed"
     READ = "read"
+    DEAD_LETTER = "dead_letter"
 
 
 class NotificationEvent(StrEnum):
@@ -65,6 +66,7 @@ class NotificationEvent(StrEnum):
     SIGNUP_REJECTED = "signup_rejected"
     SIGNUP_REMINDER = "signup_reminder"
     CHECKIN_REMINDER = "checkin_reminder"
+    DIGEST = "digest"
 
 
 class AuditAction(StrEnum):
@@ -75,6 +77,7 @@ class AuditAction(StrEnum):
     NOTIFICATION_SENT = "notification_sent"
     BADGE_AWARDED = "badge_awarded"
     EXPORT_SIGNUPS = "export_signups"
+    EXPORT_BUNDLE = "export_bundle"
     BADGE_RULE_CHANGED = "badge_rule_changed"
     BADGE_RULE_TRIGGERED = "badge_rule_triggered"
     TASK_RUN = "task_run"
@@ -89,6 +92,14 @@ class AuditEntity(StrEnum):
     TASK = "task"
 
 
+class ExportJobStatus(StrEnum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    EXPIRED = "expired"
+
+
 class BadgeRuleType(StrEnum):
     FIRST_APPROVED = "first_approved"
     TOTAL_APPROVED = "total_approved"
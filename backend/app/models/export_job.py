@@ -0,0 +1,62 @@
+"""Background export jobs and their on-disk artifacts."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, Enum, ForeignKey, Index, Integer, JSON, String
+from sqlalchemy.orm import Mapped
+
+from app.db.base import Base
+from app.models.enums import ExportJobStatus, enum_values
+from app.models.mixins import TimestampMixin
+
+
+class ExportJob(TimestampMixin, Base):
+    """One requested export, built by a worker into ``file_path``.
+
+    ``params_hash`` identifies the export (kind, activity, format, ids) so a
+    recent identical request can reuse the job instead of rebuilding the file.
+    """
+
+    __tablename__ = "export_jobs"
+
+    id: Mapped[int] = Column(Integer, primary_key=True, autoincrement=True)
+    kind: Mapped[str] = Column(String(20), nullable=False)
+    activity_id: Mapped[int] = Column(ForeignKey("activities.id", ondelete="CASCADE"), nullable=False)
+    format: Mapped[str] = Column(String(10), nullable=False, default="csv")
+    params: Mapped[dict | None] = Column(JSON, nullable=True)
+    params_hash: Mapped[str] = Column(String(64), nullable=False)
+    status: Mapped[ExportJobStatus] = Column(
+        Enum(ExportJobStatus, name="export_job_status", values_callable=enum_values),
+        nullable=False,
+        default=ExportJobStatus.PENDING,
+    )
+    requested_by_admin_id: Mapped[int | None] = Column(
+        ForeignKey("admin_users.id", ondelete="SET NULL"), nullable=True
+    )
+    total_rows: Mapped[int | None] = Column(Integer, nullable=True)
+    processed_rows: Mapped[int] = Column(Integer, nullable=False, default=0)
+    filename: Mapped[str | None] = Column(String(255), nullable=True)
+    file_path: Mapped[str | None] = Column(String(512), nullable=True)
+    file_size: Mapped[int | None] = Column(BigInteger, nullable=True)
+    error_message: Mapped[str | None] = Column(String(255), nullable=True)
+    started_at: Mapped[datetime | None] = Column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime | None] = Column(DateTime(timezone=True), nullable=True)
+    expires_at: Mapped[datetime | None] = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_export_jobs_params_hash", "params_hash", "created_at"),
+        Index("ix_export_jobs_status_expires", "status", "expires_at"),
+    )
+
+    @property
+    def progress(self) -> float | None:
+        if self.status == ExportJobStatus.SUCCEEDED:
+            return 1.0
+        if not self.total_rows:
+            return None
+        return round(min(self.processed_rows / self.total_rows, 1.0), 4)
+
+    def __repr__(self) -> str:  # pragma: no cover - debug helper
+        return f"ExportJob(id={self.id!r}, kind={self.kind!r}, status={self.status!r})"
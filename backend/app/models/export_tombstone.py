@@ -0,0 +1,30 @@
+"""Deletion records for incremental (delta) exports."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, func
+from sqlalchemy.orm import Mapped
+
+from app.db.base import Base
+
+
+class ExportTombstone(Base):
+    """One deleted signup, payment, comment or share, written in the deleting transaction.
+
+    ``activity_id`` is a plain column so the record outlives the activity.
+    """
+
+    __tablename__ = "export_tombstones"
+
+    id: Mapped[int] = Column(Integer, primary_key=True, autoincrement=True)
+    entity_type: Mapped[str] = Column(String(20), nullable=False)
+    entity_id: Mapped[int] = Column(Integer, nullable=False)
+    activity_id: Mapped[int | None] = Column(Integer, nullable=True)
+    deleted_at: Mapped[datetime] = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (Index("ix_export_tombstones_type_deleted_at", "entity_type", "deleted_at"),)
+
+    def __repr__(self) -> str:  # pragma: no cover - debug helper
+        return f"ExportTombstone(entity_type={self.entity_type!r}, entity_id={self.entity_id!r})"
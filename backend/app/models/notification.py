@@ -5,7 +5,7 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer, JSON, String
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Index, Integer, JSON, String
 from sqlalchemy.orm import Mapped, relationship
 
 from app.db.base import Base
@@ -20,6 +20,11 @@ if TYPE_CHECKING:  # pragma: no cover
 
 class NotificationLog(TimestampMixin, Base):
     __tablename__ = "notification_logs"
+    __table_args__ = (
+        Index("ix_notification_logs_status_claimed_until", "status", "claimed_until"),
+        Index("ix_notification_logs_user_created_id", "user_id", "created_at", "id"),
+        Index("ix_notification_logs_digest_id", "digest_id"),
+    )
 
     id: Mapped[int] = Column(Integer, primary_key=True, autoincrement=True)
     user_id: Mapped[int | None] = Column(Integer, ForeignKey("user_profiles.id", ondelete="SET NULL"), nullable=True)
@@ -41,6 +46,15 @@ class NotificationLog(TimestampMixin, Base):
     scheduled_send_at: Mapped[datetime | None] = Column(DateTime(timezone=True), nullable=True)
     sent_at: Mapped[datetime | None] = Column(DateTime(timezone=True), nullable=True)
     retry_count: Mapped[int] = Column(Integer, nullable=False, default=0)
+    # set while a dispatcher worker holds the row; the lease lets another worker retake it after a crash
+    claim_token: Mapped[str | None] = Column(String(36), nullable=True)
+    claimed_until: Mapped[datetime | None] = Column(DateTime(timezone=True), nullable=True)
+    # set when the user reads the notification; kept apart from status so reading never cancels a delivery
+    read_at: Mapped[datetime | None] = Column(DateTime(timezone=True), nullable=True)
+    # set on notifications coalesced into a DIGEST log, which delivers them in one send
+    digest_id: Mapped[int | None] = Column(
+        Integer, ForeignKey("notification_logs.id", ondelete="SET NULL"), nullable=True
+    )
 
     user: Mapped["UserProfile | None"] = relationship("UserProfile", back_populates="notifications")
     signup: Mapped["Signup | None"] = relationship("Signup", back_populates="notifications")
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import Column, DateTime, Enum, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, Enum, Float, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, relationship
 
 from app.db.base import Base
@@ -42,6 +42,7 @@ class Payment(TimestampMixin, Base):
     activity: Mapped["Activity"] = relationship("Activity", backref="payments")
 
     __table_args__ = (
+        Index("ix_payments_updated_at", "updated_at"),
         {"mysql_charset": "utf8mb4", "mysql_collate": "utf8mb4_unicode_ci"},
     )
 
@@ -5,7 +5,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import TYPE_CHECKING, List, Optional
 
-from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer, JSON, String, Text
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Index, Integer, JSON, String, Text
 from sqlalchemy.orm import Mapped, relationship
 
 from app.db.base import Base
@@ -78,6 +78,10 @@ class Signup(TimestampMixin, Base):
     )
 
     __table_args__ = (
+        Index("ix_signups_created_at", "created_at"),
+        Index("ix_signups_approved_at", "approved_at"),
+        Index("ix_signups_checkin_time", "checkin_time"),
+        Index("ix_signups_updated_at", "updated_at"),
         {
             "mysql_charset": "utf8mb4",
             "mysql_collate": "utf8mb4_unicode_ci",
@@ -34,6 +34,8 @@ class UserProfile(TimestampMixin, Base):
     is_active: Mapped[bool] = Column(Boolean, default=True, nullable=False)
     tags: Mapped[list[str] | None] = Column(JSON, nullable=True)
     extra: Mapped[dict | None] = Column(JSON, nullable=True)
+    # notifications not yet read; maintained by NotificationRepository
+    unread_notification_count: Mapped[int] = Column(Integer, nullable=False, default=0, server_default="0")
 
     signups: Mapped[List["Signup"]] = relationship(
         "Signup", back_populates="user", cascade="all, delete-orphan", passive_deletes=True
@@ -52,6 +52,14 @@ class ActivityRepository:
     def get(self, activity_id: int) -> Activity | None:
         return self.session.get(Activity, activity_id)
 
+    def list_form_fields(self, activity_id: int) -> Sequence[ActivityFormField]:
+        query = (
+            select(ActivityFormField)
+            .where(ActivityFormField.activity_id == activity_id)
+            .order_by(ActivityFormField.display_order.asc(), ActivityFormField.id.asc())
+        )
+        return self.session.execute(query).scalars().all()
+
     def create(self, data: dict) -> Activity:
         activity = Activity(**data)
         self.session.add(activity)
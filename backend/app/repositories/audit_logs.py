@@ -2,13 +2,14 @@
 
 from __future__ import annotations
 
-from typing import Optional, Sequence
+from typing import Iterator, Optional, Sequence
 
-from sqlalchemy import Select, desc, select
+from sqlalchemy import Select, desc, insert, select
 from sqlalchemy.orm import Session, selectinload
 
 from app.models.audit import AuditLog
 from app.models.enums import AuditAction, AuditEntity
+from app.repositories.pagination import iter_id_chunks
 
 
 class AuditLogRepository:
@@ -27,6 +28,15 @@ class AuditLogRepository:
         self.session.flush()
         return log
 
+    def create_many(self, payloads: list[dict]) -> None:
+        self.session.add_all(AuditLog(**payload) for payload in payloads)
+        self.session.flush()
+
+    def insert_many(self, payloads: list[dict]) -> None:
+        """Insert ``payloads`` as one multi-row INSERT, without loading them into the session."""
+        if payloads:
+            self.session.execute(insert(AuditLog), payloads)
+
     def list(
         self,
         *,
@@ -55,3 +65,21 @@ class AuditLogRepository:
         if offset:
             query = query.offset(offset)
         return self.session.execute(query).scalars().all()
+
+    def iter_chunks(
+        self,
+        *,
+        action: Optional[AuditAction] = None,
+        entity_type: Optional[AuditEntity] = None,
+        entity_id: Optional[int] = None,
+        chunk_size: int = 500,
+    ) -> Iterator[list[AuditLog]]:
+        """Matching logs newest first (by id), without loading the actor relationships."""
+        query = select(AuditLog)
+        if action is not None:
+            query = query.where(AuditLog.action == action)
+        if entity_type is not None:
+            query = query.where(AuditLog.entity_type == entity_type)
+        if entity_id is not None:
+            query = query.where(AuditLog.entity_id == entity_id)
+        return iter_id_chunks(self.session, query, AuditLog.id, chunk_size=chunk_size)
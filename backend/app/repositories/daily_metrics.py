@@ -0,0 +1,126 @@
+"""Repository for the pre-aggregated activity daily metrics table."""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Mapping, Sequence
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.models.activity_daily_metric import ActivityDailyMetric
+
+METRIC_COLUMNS: tuple[str, ...] = (
+    "signups",
+    "approvals",
+    "checkins",
+    "feedbacks",
+    "favorites",
+    "likes",
+    "shares",
+    "comments",
+)
+
+MetricDeltas = Mapping[tuple[int, date], Mapping[str, int]]
+
+
+def apply_metric_deltas(connection: Connection, deltas: MetricDeltas) -> None:
+    """Atomically add ``deltas`` to the (activity_id, metric_date) rows, creating them as needed."""
+    table = ActivityDailyMetric.__table__
+    dialect = connection.dialect.name
+    for (activity_id, metric_date), metrics in deltas.items():
+        values = {name: value for name, value in metrics.items() if value}
+        if not values:
+            continue
+        row = {"activity_id": activity_id, "metric_date": metric_date, **values}
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+            stmt = sqlite_insert(table).values(**row)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.activity_id, table.c.metric_date],
+                set_={**{name: table.c[name] + stmt.excluded[name] for name in values}, "updated_at": func.now()},
+            )
+            connection.execute(stmt)
+        elif dialect in {"mysql", "mariadb"}:
+            from sqlalchemy.dialects.mysql import insert as mysql_insert
+
+            stmt = mysql_insert(table).values(**row)
+            stmt = stmt.on_duplicate_key_update(
+                {**{name: table.c[name] + stmt.inserted[name] for name in values}, "updated_at": func.now()}
+            )
+            connection.execute(stmt)
+        else:
+            result = connection.execute(
+                update(table)
+                .where(table.c.activity_id == activity_id, table.c.metric_date == metric_date)
+                .values(**{name: table.c[name] + value for name, value in values.items()}, updated_at=func.now())
+            )
+            if result.rowcount == 0:
+                connection.execute(insert(table).values(**row))
+
+
+class DailyMetricsRepository:
+    def __init__(self, session: Session) -> None:
+        self.session = session
+
+    def apply_deltas(self, deltas: MetricDeltas) -> None:
+        apply_metric_deltas(self.session.connection(), deltas)
+
+    def series(
+        self,
+        *,
+        start_date: date,
+        end_date: date,
+        activity_id: int | None = None,
+    ) -> dict[date, dict[str, int]]:
+        """Sum metrics per day in ``[start_date, end_date]``; reads at most one row per day and activity."""
+        query = (
+            select(
+                ActivityDailyMetric.metric_date,
+                *(func.sum(getattr(ActivityDailyMetric, name)) for name in METRIC_COLUMNS),
+            )
+            .where(ActivityDailyMetric.metric_date >= start_date, ActivityDailyMetric.metric_date <= end_date)
+            .group_by(ActivityDailyMetric.metric_date)
+        )
+        if activity_id is not None:
+            query = query.where(ActivityDailyMetric.activity_id == activity_id)
+        return {
+            row[0]: {name: int(value or 0) for name, value in zip(METRIC_COLUMNS, row[1:])}
+            for row in self.session.execute(query).all()
+        }
+
+    def series_by_activity(
+        self,
+        *,
+        activity_ids: Sequence[int],
+        start_date: date,
+        end_date: date,
+    ) -> dict[tuple[int, date], dict[str, int]]:
+        """Rollup rows of several activities keyed by ``(activity_id, metric_date)``."""
+        if not activity_ids:
+            return {}
+        query = select(
+            ActivityDailyMetric.activity_id,
+            ActivityDailyMetric.metric_date,
+            *(getattr(ActivityDailyMetric, name) for name in METRIC_COLUMNS),
+        ).where(
+            ActivityDailyMetric.activity_id.in_(list(activity_ids)),
+            ActivityDailyMetric.metric_date >= start_date,
+            ActivityDailyMetric.metric_date <= end_date,
+        )
+        return {
+            (row[0], row[1]): {name: int(value or 0) for name, value in zip(METRIC_COLUMNS, row[2:])}
+            for row in self.session.execute(query).all()
+        }
+
+    def delete_for(self, *, activity_id: int | None = None) -> int:
+        stmt = delete(ActivityDailyMetric)
+        if activity_id is not None:
+            stmt = stmt.where(ActivityDailyMetric.activity_id == activity_id)
+        return self.session.execute(stmt).rowcount
+
+    def bulk_insert(self, rows: list[dict]) -> None:
+        if rows:
+            self.session.execute(insert(ActivityDailyMetric), rows)
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Optional, Sequence
+from typing import Iterator, Optional, Sequence
 
 from sqlalchemy import func, select
 from sqlalchemy.exc import IntegrityError
@@ -14,11 +14,14 @@ from app.models.activity_engagement import (
     ActivityLike,
     ActivityShare,
 )
+from app.repositories.engager_sketches import EngagerSketchRepository
+from app.repositories.pagination import iter_id_chunks
 
 
 class ActivityEngagementRepository:
     def __init__(self, session: Session) -> None:
         self.session = session
+        self.sketches = EngagerSketchRepository(session)
 
     # Favorites
     def is_favorited(self, *, activity_id: int, user_id: int) -> bool:
@@ -41,6 +44,8 @@ class ActivityEngagementRepository:
                     ActivityFavorite.user_id == user_id,
                 )
             ).scalar_one()
+        else:
+            self.sketches.record_event(favorite)
         return favorite
 
     def remove_favorite(self, *, activity_id: int, user_id: int) -> bool:
@@ -82,6 +87,8 @@ class ActivityEngagementRepository:
                     ActivityLike.user_id == user_id,
                 )
             ).scalar_one()
+        else:
+            self.sketches.record_event(like)
         return like
 
     def remove_like(self, *, activity_id: int, user_id: int) -> bool:
@@ -107,6 +114,7 @@ class ActivityEngagementRepository:
         share = ActivityShare(activity_id=activity_id, user_id=user_id, channel=channel)
         self.session.add(share)
         self.session.flush()
+        self.sketches.record_event(share)
         return share
 
     def share_count(self, activity_id: int) -> int:
@@ -123,6 +131,14 @@ class ActivityEngagementRepository:
         )
         return query.scalars().all()
 
+    def iter_share_chunks(self, *, activity_id: int, chunk_size: int = 500) -> Iterator[list[ActivityShare]]:
+        query = (
+            select(ActivityShare)
+            .options(selectinload(ActivityShare.user))
+            .where(ActivityShare.activity_id == activity_id)
+        )
+        return iter_id_chunks(self.session, query, ActivityShare.id, chunk_size=chunk_size)
+
     def user_stats(self, user_id: int) -> dict[str, int]:
         favorites = self.session.execute(
             select(func.count()).select_from(ActivityFavorite).where(ActivityFavorite.user_id == user_id)
@@ -153,6 +169,27 @@ class ActivityEngagementRepository:
             ).scalar_one(),
         }
 
+    def engagement_summary_by_activity(self, activity_ids: Sequence[int]) -> dict[int, dict[str, int]]:
+        """``engagement_summary`` for several activities: one grouped query per engagement table."""
+        results = {
+            activity_id: {"favorites": 0, "likes": 0, "shares": 0, "comments": 0} for activity_id in activity_ids
+        }
+        if not activity_ids:
+            return results
+        ids = list(activity_ids)
+        for name, model in (
+            ("favorites", ActivityFavorite),
+            ("likes", ActivityLike),
+            ("shares", ActivityShare),
+            ("comments", ActivityComment),
+        ):
+            rows = self.session.execute(
+                select(model.activity_id, func.count()).where(model.activity_id.in_(ids)).group_by(model.activity_id)
+            ).all()
+            for activity_id, count in rows:
+                results[activity_id][name] = int(count)
+        return results
+
     def user_activity_metrics(self, *, activity_id: int, user_id: int) -> dict[str, int | bool]:
         return {
             "is_favorited": self.is_favorited(activity_id=activity_id, user_id=user_id),
@@ -169,6 +206,33 @@ class ActivityEngagementRepository:
             ).scalar_one(),
         }
 
+    def user_activity_metrics_by_user(
+        self, *, activity_id: int, user_ids: Sequence[int]
+    ) -> dict[int, dict[str, int | bool]]:
+        """``user_activity_metrics`` for many users of one activity in four grouped queries."""
+        ids = list(set(user_ids))
+        metrics: dict[int, dict[str, int | bool]] = {
+            user_id: {"is_favorited": False, "is_liked": False, "share_count": 0, "comment_count": 0}
+            for user_id in ids
+        }
+        if not ids:
+            return metrics
+        for flag, model in (("is_favorited", ActivityFavorite), ("is_liked", ActivityLike)):
+            rows = self.session.execute(
+                select(model.user_id).where(model.activity_id == activity_id, model.user_id.in_(ids))
+            ).scalars()
+            for user_id in rows:
+                metrics[user_id][flag] = True
+        for name, model in (("share_count", ActivityShare), ("comment_count", ActivityComment)):
+            rows = self.session.execute(
+                select(model.user_id, func.count())
+                .where(model.activity_id == activity_id, model.user_id.in_(ids))
+                .group_by(model.user_id)
+            ).all()
+            for user_id, count in rows:
+                metrics[user_id][name] = int(count)
+        return metrics
+
     def overall_counts(self) -> dict[str, int]:
         favorites = self.session.execute(select(func.count()).select_from(ActivityFavorite)).scalar_one()
         likes = self.session.execute(select(func.count()).select_from(ActivityLike)).scalar_one()
@@ -262,11 +326,13 @@ class ActivityEngagementRepository:
 class ActivityCommentRepository:
     def __init__(self, session: Session) -> None:
         self.session = session
+        self.sketches = EngagerSketchRepository(session)
 
     def create(self, payload: dict) -> ActivityComment:
         comment = ActivityComment(**payload)
         self.session.add(comment)
         self.session.flush()
+        self.sketches.record_event(comment)
         return comment
 
     def list(self, *, activity_id: int, limit: int, offset: int) -> Sequence[ActivityComment]:
@@ -289,6 +355,14 @@ class ActivityCommentRepository:
         )
         return self.session.execute(query).scalars().all()
 
+    def iter_chunks(self, activity_id: int, *, chunk_size: int = 500) -> Iterator[list[ActivityComment]]:
+        query = (
+            select(ActivityComment)
+            .options(selectinload(ActivityComment.user))
+            .where(ActivityComment.activity_id == activity_id, ActivityComment.deleted_at.is_(None))
+        )
+        return iter_id_chunks(self.session, query, ActivityComment.id, chunk_size=chunk_size)
+
     def get(self, comment_id: int) -> ActivityComment | None:
         return self.session.execute(select(ActivityComment).where(ActivityComment.id == comment_id)).scalar_one_or_none()
 
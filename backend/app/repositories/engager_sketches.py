@@ -0,0 +1,149 @@
+"""Repository for per-day unique-engager sketches.
+
+Engagements append an ``ActivityEngagerEvent`` row instead of updating the
+(activity, day) sketch, so write paths take no shared lock.  Reads merge the
+sketches with the events not folded in yet; ``compact`` folds events into the
+sketches in batches.  Folding is a union, so an event folded twice (two
+compactions overlapping) does not change the estimate.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+from typing import Iterable
+
+from sqlalchemy import delete, insert, inspect, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.activity_engager_sketch import ActivityEngagerEvent, ActivityEngagerSketch
+from app.utils.hyperloglog import HyperLogLog
+
+
+def _event_day(value: datetime | None) -> date:
+    if value is None:
+        return datetime.now(timezone.utc).date()
+    if value.tzinfo is None:
+        return value.date()
+    return value.astimezone(timezone.utc).date()
+
+
+class EngagerSketchRepository:
+    def __init__(self, session: Session) -> None:
+        self.session = session
+
+    def record_event(self, obj) -> None:
+        """Queue the user of a just-flushed signup/engagement row for its (activity, day) sketch."""
+        # read from the instance state: server-default columns are not loaded after flush
+        values = inspect(obj).dict
+        user_id = values.get("user_id")
+        activity_id = values.get("activity_id")
+        if user_id is None or activity_id is None:
+            return
+        self.session.execute(
+            insert(ActivityEngagerEvent).values(
+                activity_id=activity_id, event_date=_event_day(values.get("created_at")), user_id=user_id
+            )
+        )
+
+    def compact(self, *, batch_size: int = 10000) -> int:
+        """Fold up to ``batch_size`` of the oldest events into their sketches; returns how many were folded.
+
+        Only the compaction transaction locks sketch rows, one per (activity, day) in the batch.
+        """
+        rows = self.session.execute(
+            select(
+                ActivityEngagerEvent.id,
+                ActivityEngagerEvent.activity_id,
+                ActivityEngagerEvent.event_date,
+                ActivityEngagerEvent.user_id,
+            )
+            .order_by(ActivityEngagerEvent.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return 0
+        users: dict[tuple[int, date], set[int]] = {}
+        for _, activity_id, event_date, user_id in rows:
+            users.setdefault((activity_id, event_date), set()).add(user_id)
+        for (activity_id, event_date), user_ids in sorted(users.items()):
+            self.record(activity_id=activity_id, sketch_date=event_date, user_ids=user_ids)
+        # delete exactly the rows read: an event committed meanwhile with a lower id is left for the next batch
+        ids = [row[0] for row in rows]
+        for start in range(0, len(ids), 1000):
+            chunk = ids[start : start + 1000]
+            self.session.execute(delete(ActivityEngagerEvent).where(ActivityEngagerEvent.id.in_(chunk)))
+        return len(rows)
+
+    def record(self, *, activity_id: int, sketch_date: date, user_ids: Iterable[int]) -> None:
+        """Merge ``user_ids`` into the (activity, day) sketch, holding its row lock until commit."""
+        row = self._locked_row(activity_id, sketch_date)
+        if row is None:
+            sketch = HyperLogLog()
+            sketch.update(user_ids)
+            try:
+                with self.session.begin_nested():
+                    self.session.add(
+                        ActivityEngagerSketch(
+                            activity_id=activity_id, sketch_date=sketch_date, registers=sketch.to_bytes()
+                        )
+                    )
+                return
+            except IntegrityError:
+                # created concurrently: fall through and merge into that row
+                row = self._locked_row(activity_id, sketch_date)
+        sketch = HyperLogLog.from_bytes(row.registers)
+        if sketch.update(user_ids):
+            row.registers = sketch.to_bytes()
+            self.session.flush()
+
+    def _locked_row(self, activity_id: int, sketch_date: date) -> ActivityEngagerSketch | None:
+        return self.session.execute(
+            select(ActivityEngagerSketch)
+            .where(ActivityEngagerSketch.activity_id == activity_id, ActivityEngagerSketch.sketch_date == sketch_date)
+            .with_for_update()
+        ).scalar_one_or_none()
+
+    def merged(
+        self,
+        *,
+        start_date: date,
+        end_date: date,
+        activity_id: int | None = None,
+    ) -> tuple[HyperLogLog, int]:
+        """Union of the sketches in ``[start_date, end_date]`` and of the events not folded in yet.
+
+        Returns the sketch and the number of sketches merged.
+        """
+        query = select(ActivityEngagerSketch.registers).where(
+            ActivityEngagerSketch.sketch_date >= start_date,
+            ActivityEngagerSketch.sketch_date <= end_date,
+        )
+        if activity_id is not None:
+            query = query.where(ActivityEngagerSketch.activity_id == activity_id)
+        merged = HyperLogLog()
+        count = 0
+        for registers in self.session.execute(query).scalars():
+            merged.merge(HyperLogLog.from_bytes(registers))
+            count += 1
+        pending = select(ActivityEngagerEvent.user_id).where(
+            ActivityEngagerEvent.event_date >= start_date,
+            ActivityEngagerEvent.event_date <= end_date,
+        )
+        if activity_id is not None:
+            pending = pending.where(ActivityEngagerEvent.activity_id == activity_id)
+        merged.update(self.session.execute(pending.distinct()).scalars())
+        return merged, count
+
+    def delete_for(self, *, activity_id: int | None = None) -> int:
+        stmt = delete(ActivityEngagerSketch)
+        if activity_id is not None:
+            stmt = stmt.where(ActivityEngagerSketch.activity_id == activity_id)
+        return self.session.execute(stmt).rowcount
+
+    def bulk_insert(self, sketches: dict[tuple[int, date], HyperLogLog]) -> None:
+        self.session.add_all(
+            ActivityEngagerSketch(activity_id=activity_id, sketch_date=sketch_date, registers=sketch.to_bytes())
+            for (activity_id, sketch_date), sketch in sketches.items()
+        )
+        self.session.flush()
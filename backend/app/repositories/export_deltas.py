@@ -0,0 +1,80 @@
+"""Range reads over ``updated_at`` and tombstones for delta exports."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Iterator, Sequence
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.models.export_tombstone import ExportTombstone
+
+
+def _window(column, since: datetime | None, until: datetime) -> list:
+    conditions = [column <= until]
+    if since is not None:
+        conditions.append(column > since)
+    return conditions
+
+
+class ExportDeltaRepository:
+    def __init__(self, session: Session) -> None:
+        self.session = session
+
+    def iter_changed(
+        self,
+        model,
+        *,
+        since: datetime | None,
+        until: datetime,
+        activity_id: int | None = None,
+        chunk_size: int = 500,
+    ) -> Iterator[list]:
+        """Yield ``model`` rows with ``since < updated_at <= until`` by ``(updated_at, id)``, ``chunk_size`` at a time.
+
+        Each chunk is a keyset query continuing after the last row of the
+        previous one (a range scan of the updated_at index), so the changed ids
+        are never collected up front.
+        """
+        query = select(model).where(*_window(model.updated_at, since, until))
+        if activity_id is not None:
+            query = query.where(model.activity_id == activity_id)
+        query = query.order_by(model.updated_at.asc(), model.id.asc()).limit(chunk_size)
+        last = None
+        while True:
+            chunk_query = query
+            if last is not None:
+                updated_at, last_id = last
+                # compare with the anchor row's stored value while it is still in the window, so the
+                # bound parameter's formatting never has to match the database's
+                anchor = func.coalesce(
+                    select(model.updated_at).where(model.id == last_id, model.updated_at <= until).scalar_subquery(),
+                    updated_at,
+                )
+                chunk_query = query.where(
+                    or_(model.updated_at > anchor, and_(model.updated_at == anchor, model.id > last_id))
+                )
+            rows = self.session.execute(chunk_query).scalars().all()
+            if not rows:
+                return
+            yield rows
+            if len(rows) < chunk_size:
+                return
+            last = (rows[-1].updated_at, rows[-1].id)
+
+    def tombstones(
+        self,
+        entity_type: str,
+        *,
+        since: datetime | None,
+        until: datetime,
+        activity_id: int | None = None,
+    ) -> Sequence[ExportTombstone]:
+        query = select(ExportTombstone).where(
+            ExportTombstone.entity_type == entity_type,
+            *_window(ExportTombstone.deleted_at, since, until),
+        )
+        if activity_id is not None:
+            query = query.where(ExportTombstone.activity_id == activity_id)
+        return self.session.execute(query.order_by(ExportTombstone.id.asc())).scalars().all()
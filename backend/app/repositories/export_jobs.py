@@ -0,0 +1,101 @@
+"""Export job repository."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Sequence
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models.enums import ExportJobStatus
+from app.models.export_job import ExportJob
+
+REUSABLE_STATUSES = (ExportJobStatus.PENDING, ExportJobStatus.RUNNING, ExportJobStatus.SUCCEEDED)
+ACTIVE_STATUSES = (ExportJobStatus.PENDING, ExportJobStatus.RUNNING)
+
+
+class ExportJobRepository:
+    def __init__(self, session: Session) -> None:
+        self.session = session
+
+    def create(self, data: dict) -> ExportJob:
+        job = ExportJob(**data)
+        self.session.add(job)
+        self.session.flush()
+        return job
+
+    def get(self, job_id: int) -> ExportJob | None:
+        return self.session.get(ExportJob, job_id)
+
+    def find_reusable(
+        self, params_hash: str, *, since: datetime, now: datetime, stale_before: datetime
+    ) -> ExportJob | None:
+        """Most recent job with the same parameters requested after ``since`` whose artifact is (or will be) available.
+
+        Pending and running jobs only count if they were updated after ``stale_before``.
+        """
+        query = (
+            select(ExportJob)
+            .where(
+                ExportJob.params_hash == params_hash,
+                ExportJob.created_at >= since,
+                ExportJob.status.in_(REUSABLE_STATUSES),
+                or_(ExportJob.status == ExportJobStatus.SUCCEEDED, ExportJob.updated_at >= stale_before),
+                or_(ExportJob.expires_at.is_(None), ExportJob.expires_at > now),
+            )
+            .order_by(ExportJob.id.desc())
+            .limit(1)
+        )
+        return self.session.execute(query).scalar_one_or_none()
+
+    def claim(self, job_id: int, *, total_rows: int, now: datetime) -> bool:
+        """Move a pending job to running; False if another worker got there first."""
+        result = self.session.execute(
+            update(ExportJob)
+            .where(ExportJob.id == job_id, ExportJob.status == ExportJobStatus.PENDING)
+            .values(status=ExportJobStatus.RUNNING, total_rows=total_rows, processed_rows=0, started_at=now)
+        )
+        return result.rowcount == 1
+
+    def add_progress(self, job_id: int, rows: int) -> None:
+        self.session.execute(
+            update(ExportJob)
+            .where(ExportJob.id == job_id)
+            .values(processed_rows=ExportJob.processed_rows + rows)
+        )
+
+    def finish(self, job_id: int, *, status: ExportJobStatus, now: datetime, **values) -> None:
+        self.session.execute(
+            update(ExportJob).where(ExportJob.id == job_id).values(status=status, finished_at=now, **values)
+        )
+
+    def list_stale(self, *, before: datetime, limit: int = 500) -> Sequence[ExportJob]:
+        """Pending or running jobs last updated before ``before``."""
+        query = (
+            select(ExportJob)
+            .where(ExportJob.status.in_(ACTIVE_STATUSES), ExportJob.updated_at < before)
+            .order_by(ExportJob.id.asc())
+            .limit(limit)
+        )
+        return self.session.execute(query).scalars().all()
+
+    def update_stale(self, job_id: int, *, current: ExportJobStatus, before: datetime, **values) -> bool:
+        """Update a job still ``current`` and last updated before ``before``; False if it has moved on."""
+        result = self.session.execute(
+            update(ExportJob)
+            .where(ExportJob.id == job_id, ExportJob.status == current, ExportJob.updated_at < before)
+            .values(updated_at=func.now(), **values)
+            # the timestamp comparison cannot be evaluated in Python against naive loaded values
+            .execution_options(synchronize_session="fetch")
+        )
+        return result.rowcount == 1
+
+    def list_expired(self, *, now: datetime, limit: int = 500) -> Sequence[ExportJob]:
+        query = (
+            select(ExportJob)
+            .where(ExportJob.status == ExportJobStatus.SUCCEEDED, ExportJob.expires_at <= now)
+            .order_by(ExportJob.id.asc())
+            .limit(limit)
+        )
+        return self.session.execute(query).scalars().all()
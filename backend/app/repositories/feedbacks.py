@@ -80,6 +80,35 @@ class ActivityFeedbackRepository:
             "total_feedbacks": int(avg_rating[1]),
         }
 
+    def aggregate_by_activity(self, activity_ids: Sequence[int]) -> dict[int, dict[str, float | int | None]]:
+        """``aggregate_for_activity`` for several activities in one grouped query."""
+        results: dict[int, dict[str, float | int | None]] = {
+            activity_id: {"average_rating": None, "total_feedbacks": 0} for activity_id in activity_ids
+        }
+        if not activity_ids:
+            return results
+        rows = self.session.execute(
+            select(ActivityFeedback.activity_id, func.avg(ActivityFeedback.rating), func.count(ActivityFeedback.id))
+            .where(ActivityFeedback.activity_id.in_(list(activity_ids)))
+            .group_by(ActivityFeedback.activity_id)
+        ).all()
+        for activity_id, average, total in rows:
+            results[activity_id] = {
+                "average_rating": float(average) if average is not None else None,
+                "total_feedbacks": int(total),
+            }
+        return results
+
+    def get_by_users(self, *, activity_id: int, user_ids: Sequence[int]) -> dict[int, ActivityFeedback]:
+        """Feedback of several users for one activity, keyed by user_id."""
+        ids = list(set(user_ids))
+        if not ids:
+            return {}
+        query = select(ActivityFeedback).where(
+            ActivityFeedback.activity_id == activity_id, ActivityFeedback.user_id.in_(ids)
+        )
+        return {feedback.user_id: feedback for feedback in self.session.execute(query).scalars()}
+
     def aggregate_overall(self, *, since: datetime | None = None) -> dict[str, float | int | None]:
         query = select(func.avg(ActivityFeedback.rating), func.count(ActivityFeedback.id))
         if since is not None:
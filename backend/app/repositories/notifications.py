@@ -1,4 +1,11 @@
-"""Notification repository."""
+"""Notification repository.
+
+``user_profiles.unread_notification_count`` counts each user's notifications
+without a ``read_at``.  Read state is kept apart from the delivery status, so
+reading a notification never stops it (or its retries) from being sent.  Every path here that creates, reads or deletes
+notifications adjusts it in the same transaction with a relative
+``UPDATE``, so concurrent writers do not overwrite each other's changes.
+"""
 
 from __future__ import annotations
 
@@ -6,11 +13,15 @@ from typing import Optional, Sequence
 
 from datetime import datetime
 
-from sqlalchemy import Select, select, or_
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, and_, bindparam, delete, exists, func, or_, select, update
+from sqlalchemy.orm import Session, aliased
 
-from app.models.enums import NotificationStatus
+from app.models.enums import NotificationChannel, NotificationEvent, NotificationStatus
 from app.models.notification import NotificationLog
+from app.models.user import UserProfile
+
+# a digest in one of these states will still deliver its members
+_OPEN_DIGEST_STATUSES = (NotificationStatus.PENDING, NotificationStatus.SENDING, NotificationStatus.FAILED)
 
 
 class NotificationRepository:
@@ -24,28 +35,238 @@ class NotificationRepository:
         log = NotificationLog(**data)
         self.session.add(log)
         self.session.flush()
+        if log.user_id is not None and log.read_at is None:
+            self._adjust_unread(log.user_id, 1)
         return log
 
-    def list(self, *, user_id: Optional[int] = None, limit: Optional[int] = None) -> Sequence[NotificationLog]:
+    def list(
+        self,
+        *,
+        user_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        after: tuple[datetime, int] | None = None,
+    ) -> Sequence[NotificationLog]:
+        """Newest first by ``(created_at, id)``; ``after`` is the key of the last row of the previous page."""
         query = self._base_query()
         if user_id is not None:
             query = query.where(NotificationLog.user_id == user_id)
-        query = query.order_by(NotificationLog.created_at.desc())
+        if after is not None:
+            created_at, last_id = after
+            # compare with the anchor row's stored value when it still exists, so the
+            # bound parameter's formatting never has to match the database's
+            anchor = func.coalesce(
+                select(NotificationLog.created_at).where(NotificationLog.id == last_id).scalar_subquery(),
+                created_at,
+            )
+            query = query.where(
+                or_(
+                    NotificationLog.created_at < anchor,
+                    and_(NotificationLog.created_at == anchor, NotificationLog.id < last_id),
+                )
+            )
+        query = query.order_by(NotificationLog.created_at.desc(), NotificationLog.id.desc())
         if limit:
             query = query.limit(limit)
         return self.session.execute(query).scalars().all()
 
-    def list_pending(self, *, limit: int, now: datetime) -> Sequence[NotificationLog]:
+    def unread_count(self, user_id: int) -> int:
+        count = self.session.execute(
+            select(UserProfile.unread_notification_count).where(UserProfile.id == user_id)
+        ).scalar_one_or_none()
+        return count or 0
+
+    def _adjust_unread(self, user_id: int, delta) -> None:
+        self.session.execute(
+            update(UserProfile)
+            .where(UserProfile.id == user_id)
+            .values(unread_notification_count=UserProfile.unread_notification_count + delta)
+            .execution_options(synchronize_session=False)
+        )
+
+    def _unread_where(self, *criteria):
+        return (
+            select(func.count())
+            .select_from(NotificationLog)
+            .where(*criteria, NotificationLog.read_at.is_(None))
+            .scalar_subquery()
+        )
+
+    def _claimable(self, now: datetime):
+        return or_(
+            # FAILED rows are retries: scheduled_send_at holds the backoff deadline
+            and_(
+                NotificationLog.status.in_([NotificationStatus.PENDING, NotificationStatus.FAILED]),
+                or_(NotificationLog.scheduled_send_at.is_(None), NotificationLog.scheduled_send_at <= now),
+            ),
+            # claimed by a worker whose lease ran out (crashed or stuck mid-batch)
+            and_(NotificationLog.status == NotificationStatus.SENDING, NotificationLog.claimed_until < now),
+        )
+
+    def _not_held_by_digest(self):
+        # a digest member is delivered by its digest; it is only sent on its own when it
+        # joined a digest that has already gone out (or been removed) without it
+        digest = aliased(NotificationLog)
+        return or_(
+            NotificationLog.digest_id.is_(None),
+            ~exists().where(digest.id == NotificationLog.digest_id, digest.status.in_(_OPEN_DIGEST_STATUSES)),
+        )
+
+    def claim_batch(self, *, token: str, limit: int, now: datetime, lease_until: datetime) -> Sequence[NotificationLog]:
+        """Atomically mark up to ``limit`` due notifications as SENDING under ``token`` and return them.
+
+        On MySQL/PostgreSQL the candidates are selected ``FOR UPDATE SKIP LOCKED``
+        so concurrent workers take disjoint batches without waiting on each
+        other.  SQLite has no row locks but serialises writers, so a single
+        ``UPDATE ... WHERE id IN (SELECT ... LIMIT n)`` claims atomically.  The
+        update repeats the claimable condition either way, so a row taken by
+        another worker in between is skipped rather than claimed twice.
+        """
+        claimable = self._claimable(now)
+        candidates = (
+            select(NotificationLog.id)
+            .where(claimable, self._not_held_by_digest())
+            .order_by(NotificationLog.id)
+            .limit(limit)
+        )
+        if self.session.get_bind().dialect.name in {"mysql", "mariadb", "postgresql"}:
+            ids = self.session.execute(candidates.with_for_update(skip_locked=True)).scalars().all()
+            if not ids:
+                return []
+            target = NotificationLog.id.in_(ids)
+        else:
+            target = NotificationLog.id.in_(candidates)
+        self.session.execute(
+            update(NotificationLog)
+            .where(target, claimable)
+            .values(status=NotificationStatus.SENDING, claim_token=token, claimed_until=lease_until)
+            .execution_options(synchronize_session=False)
+        )
+        query = (
+            self._base_query()
+            .where(NotificationLog.claim_token == token)
+            .order_by(NotificationLog.id)
+            .execution_options(populate_existing=True)
+        )
+        return self.session.execute(query).scalars().all()
+
+    def renew_claim(self, ids: list[int], *, token: str, lease_until: datetime) -> int:
+        """Extend the lease of the rows still claimed under ``token``; rows another worker took are left alone."""
+        if not ids:
+            return 0
+        result = self.session.execute(
+            update(NotificationLog)
+            .where(NotificationLog.id.in_(ids), NotificationLog.claim_token == token)
+            .values(claimed_until=lease_until)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    def list_claimed(self, ids: list[int], *, token: str) -> Sequence[NotificationLog]:
+        """The rows of ``ids`` still claimed under ``token``, freshly loaded."""
+        if not ids:
+            return []
         query = (
             self._base_query()
+            .where(NotificationLog.id.in_(ids), NotificationLog.claim_token == token)
+            .order_by(NotificationLog.id)
+            .execution_options(populate_existing=True)
+        )
+        return self.session.execute(query).scalars().all()
+
+    def finish_claimed(
+        self,
+        ids: list[int],
+        *,
+        token: str,
+        status: NotificationStatus,
+        now: datetime,
+        error: str | None = None,
+    ) -> int:
+        """Set the outcome of claimed rows in one statement; rows whose claim was lost are left alone."""
+        if not ids:
+            return 0
+        values: dict = {"status": status, "claim_token": None, "claimed_until": None}
+        if status == NotificationStatus.SENT:
+            values.update(sent_at=now, error_message=None)
+        else:
+            values.update(sent_at=None, error_message=error, retry_count=NotificationLog.retry_count + 1)
+        result = self.session.execute(
+            update(NotificationLog)
+            .where(NotificationLog.id.in_(ids), NotificationLog.claim_token == token)
+            .values(**values)
+        )
+        return result.rowcount
+
+    def reschedule_claimed(self, retries: list[tuple[int, str, datetime]], *, token: str) -> None:
+        """Mark claimed rows FAILED with their error and next attempt time (one executemany)."""
+        if not retries:
+            return
+        table = NotificationLog.__table__
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("log_id"), table.c.claim_token == token)
+            .values(
+                status=NotificationStatus.FAILED,
+                error_message=bindparam("error"),
+                scheduled_send_at=bindparam("retry_at"),
+                retry_count=table.c.retry_count + 1,
+                sent_at=None,
+                claim_token=None,
+                claimed_until=None,
+            )
+        )
+        self.session.execute(
+            stmt, [{"log_id": log_id, "error": error, "retry_at": retry_at} for log_id, error, retry_at in retries]
+        )
+
+    def find_open_digest(self, *, user_id: int, channel: NotificationChannel, now: datetime) -> int | None:
+        """Id of the user's digest on ``channel`` that is still collecting notifications, if any."""
+        digest = aliased(NotificationLog)
+        query = (
+            select(digest.id)
+            .join(NotificationLog, NotificationLog.digest_id == digest.id)
             .where(
-                NotificationLog.status == NotificationStatus.PENDING,
-                or_(NotificationLog.scheduled_send_at.is_(None), NotificationLog.scheduled_send_at <= now),
+                NotificationLog.user_id == user_id,
+                NotificationLog.channel == channel,
+                digest.event == NotificationEvent.DIGEST,
+                digest.status == NotificationStatus.PENDING,
+                digest.scheduled_send_at > now,
             )
-            .order_by(NotificationLog.created_at.asc())
-            .limit(limit)
+            .order_by(digest.id.desc())
+            .limit(1)
         )
-        return self.session.execute(query).scalars().all()
+        return self.session.execute(query).scalar_one_or_none()
+
+    def digest_members(self, digest_ids: list[int]) -> dict[int, list[NotificationLog]]:
+        """The PENDING notifications of each digest, oldest first."""
+        members: dict[int, list[NotificationLog]] = {digest_id: [] for digest_id in digest_ids}
+        if not digest_ids:
+            return members
+        query = (
+            self._base_query()
+            .where(NotificationLog.digest_id.in_(digest_ids), NotificationLog.status == NotificationStatus.PENDING)
+            .order_by(NotificationLog.id)
+        )
+        for log in self.session.execute(query).scalars():
+            members[log.digest_id].append(log)
+        return members
+
+    def finish_digest_members(
+        self, member_ids: list[int], *, status: NotificationStatus, now: datetime, error: str | None = None
+    ) -> int:
+        """Give delivered digest members their digest's outcome in one statement."""
+        if not member_ids:
+            return 0
+        values: dict = {"status": status, "error_message": error}
+        if status == NotificationStatus.SENT:
+            values["sent_at"] = now
+        result = self.session.execute(
+            update(NotificationLog)
+            .where(NotificationLog.id.in_(member_ids), NotificationLog.status == NotificationStatus.PENDING)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
 
     def get(self, notification_id: int) -> NotificationLog | None:
         return self.session.get(NotificationLog, notification_id)
@@ -67,44 +288,30 @@ class NotificationRepository:
         return log
 
     def delete_one(self, notification_id: int, *, user_id: int) -> bool:
-        log = self.session.get(NotificationLog, notification_id)
-        if log and log.user_id == user_id:
-            self.session.delete(log)
-            self.session.flush()
-            return True
-        return False
+        return self.delete_batch([notification_id], user_id=user_id) > 0
 
     def delete_batch(self, notification_ids: list[int], *, user_id: int) -> int:
-        count = 0
-        for nid in notification_ids:
-            log = self.session.get(NotificationLog, nid)
-            if log and log.user_id == user_id:
-                self.session.delete(log)
-                count += 1
-        if count:
-            self.session.flush()
-        return count
+        if not notification_ids:
+            return 0
+        return self._delete_for_user(user_id, NotificationLog.id.in_(set(notification_ids)))
 
     def delete_all_for_user(self, user_id: int) -> int:
-        query = self._base_query().where(NotificationLog.user_id == user_id)
-        logs = self.session.execute(query).scalars().all()
-        count = len(logs)
-        for log in logs:
-            self.session.delete(log)
-        if count:
-            self.session.flush()
-        return count
-
-    def mark_all_read(self, user_id: int) -> int:
-        query = self._base_query().where(
-            NotificationLog.user_id == user_id,
-            NotificationLog.status.in_([NotificationStatus.PENDING, NotificationStatus.SENT]),
-        )
-        logs = self.session.execute(query).scalars().all()
-        count = 0
-        for log in logs:
-            log.status = NotificationStatus.READ
-            count += 1
-        if count:
-            self.session.flush()
-        return count
+        return self._delete_for_user(user_id)
+
+    def _delete_for_user(self, user_id: int, *criteria) -> int:
+        criteria = (NotificationLog.user_id == user_id, *criteria)
+        # the counter update runs first: it has to count the unread rows about to go
+        self._adjust_unread(user_id, -self._unread_where(*criteria))
+        return self.session.execute(delete(NotificationLog).where(*criteria)).rowcount
+
+    def mark_all_read(self, user_id: int, *, now: datetime) -> int:
+        """Stamp ``read_at`` on every unread notification of the user; delivery status is left alone."""
+        stmt = (
+            update(NotificationLog)
+            .where(NotificationLog.user_id == user_id, NotificationLog.read_at.is_(None))
+            .values(read_at=now)
+        )
+        updated = self.session.execute(stmt).rowcount
+        if updated:
+            self._adjust_unread(user_id, -updated)
+        return updated
@@ -0,0 +1,48 @@
+"""Keyset iteration helpers for reading large result sets in bounded chunks, and page cursors."""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Iterator
+
+from sqlalchemy import Select
+from sqlalchemy.orm import Session
+
+
+def iter_id_chunks(session: Session, query: Select, id_column, *, chunk_size: int = 500) -> Iterator[list]:
+    """Yield the entities of ``query`` newest id first, ``chunk_size`` rows per round trip.
+
+    Each chunk is a separate ``WHERE id < :last_id ORDER BY id DESC LIMIT n``
+    query, so no cursor stays open between chunks and the connection remains
+    usable for other statements while a chunk is being processed.
+    """
+    last_id = None
+    while True:
+        chunk_query = query.order_by(id_column.desc()).limit(chunk_size)
+        if last_id is not None:
+            chunk_query = chunk_query.where(id_column < last_id)
+        rows = session.execute(chunk_query).scalars().all()
+        if not rows:
+            return
+        yield rows
+        if len(rows) < chunk_size:
+            return
+        last_id = rows[-1].id
+
+
+def encode_keyset_cursor(created_at: datetime, row_id: int) -> str:
+    """Opaque cursor for the row a ``(created_at, id)``-ordered page ended on."""
+    payload = json.dumps({"created_at": created_at.isoformat(), "id": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_keyset_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(payload["created_at"]), int(payload["id"])
+    except (ValueError, KeyError, TypeError, binascii.Error, UnicodeError):
+        raise ValueError("invalid_cursor") from None
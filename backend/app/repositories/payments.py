@@ -3,12 +3,13 @@
 from __future__ import annotations
 
 import math
-from typing import Optional, Sequence
+from typing import Iterator, Optional, Sequence
 
 from sqlalchemy import Select, func, select
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from app.models.payment import Payment
+from app.repositories.pagination import iter_id_chunks
 
 
 class PaymentRepository:
@@ -61,6 +62,10 @@ class PaymentRepository:
             query = query.where(Payment.category == category)
         return self.session.execute(query).scalar_one()
 
+    def iter_chunks(self, *, activity_id: int, chunk_size: int = 500) -> Iterator[list[Payment]]:
+        query = self._base_query().options(selectinload(Payment.user)).where(Payment.activity_id == activity_id)
+        return iter_id_chunks(self.session, query, Payment.id, chunk_size=chunk_size)
+
     def get(self, payment_id: int) -> Optional[Payment]:
         return self.session.execute(
             self._base_query().where(Payment.id == payment_id)
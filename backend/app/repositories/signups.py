@@ -3,14 +3,16 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Iterable, Sequence
+from typing import Iterable, Iterator, Sequence
 
-from sqlalchemy import Select, func, select
+from sqlalchemy import Select, case, func, literal_column, select
 from sqlalchemy.orm import Session, selectinload
 
 from app.models.signup import Signup, SignupFieldAnswer
 from app.models.activity import Activity
 from app.models.enums import CheckinStatus, SignupStatus
+from app.repositories.engager_sketches import EngagerSketchRepository
+from app.repositories.pagination import iter_id_chunks
 
 
 class SignupRepository:
@@ -18,6 +20,7 @@ class SignupRepository:
 
     def __init__(self, session: Session):
         self.session = session
+        self.sketches = EngagerSketchRepository(session)
 
     def _base_query(self) -> Select:
         return select(Signup).options(
@@ -52,6 +55,48 @@ class SignupRepository:
             query = query.offset(offset)
         return self.session.execute(query).scalars().all()
 
+    def iter_chunks(
+        self,
+        *,
+        activity_id: int,
+        ids: Iterable[int] | None = None,
+        chunk_size: int = 500,
+    ) -> Iterator[list[Signup]]:
+        """Yield the activity's signups (newest first) in chunks with their users loaded."""
+        query = select(Signup).options(selectinload(Signup.user)).where(Signup.activity_id == activity_id)
+        if ids:
+            query = query.where(Signup.id.in_(list(ids)))
+        return iter_id_chunks(self.session, query, Signup.id, chunk_size=chunk_size)
+
+    def iter_answers(
+        self,
+        *,
+        activity_id: int,
+        ids: Iterable[int] | None = None,
+        batch_size: int = 1000,
+    ) -> Iterator:
+        """Stream ``(signup_id, field_id, value_text, value_json)`` rows of the activity, newest signup first.
+
+        The result is read with a server-side cursor in batches of
+        ``batch_size``; run it on a session of its own, as the open cursor keeps
+        the connection busy until the iteration ends.
+        """
+        query = (
+            select(
+                SignupFieldAnswer.signup_id,
+                SignupFieldAnswer.field_id,
+                SignupFieldAnswer.value_text,
+                SignupFieldAnswer.value_json,
+            )
+            .join(Signup, Signup.id == SignupFieldAnswer.signup_id)
+            .where(Signup.activity_id == activity_id)
+            .order_by(SignupFieldAnswer.signup_id.desc(), SignupFieldAnswer.id.asc())
+            .execution_options(yield_per=batch_size)
+        )
+        if ids:
+            query = query.where(Signup.id.in_(list(ids)))
+        return iter(self.session.execute(query))
+
     def get(self, signup_id: int) -> Signup | None:
         return self.session.execute(
             self._base_query().where(Signup.id == signup_id)
@@ -121,6 +166,7 @@ class SignupRepository:
             signup.answers.append(SignupFieldAnswer(**answer))
         self.session.add(signup)
         self.session.flush()
+        self.sketches.record_event(signup)
         return signup
 
     def update(self, signup: Signup, data: dict) -> Signup:
@@ -142,43 +188,87 @@ class SignupRepository:
             signup.answers.append(SignupFieldAnswer(**answer))
         self.session.flush()
 
-    def activity_stats(self, activity_id: int) -> dict[str, dict]:
-        status_rows = self.session.execute(
-            select(Signup.status, func.count())
-            .where(Signup.activity_id == activity_id)
-            .group_by(Signup.status)
-        ).all()
-        checkin_rows = self.session.execute(
-            select(Signup.checkin_status, func.count())
-            .where(Signup.activity_id == activity_id)
-            .group_by(Signup.checkin_status)
-        ).all()
+    @staticmethod
+    def _status_count_columns() -> list:
+        """Aggregate columns read back by ``_status_count_row``."""
+        return [
+            func.count(),
+            # activity reports count a signup as checked in once it has a check-in time
+            func.coalesce(func.sum(case((Signup.checkin_time.is_not(None), 1), else_=0)), 0),
+            *(func.coalesce(func.sum(case((Signup.status == status, 1), else_=0)), 0) for status in SignupStatus),
+            *(
+                func.coalesce(func.sum(case((Signup.checkin_status == status, 1), else_=0)), 0)
+                for status in CheckinStatus
+            ),
+        ]
+
+    @staticmethod
+    def _status_count_row(row) -> dict:
+        status_values = row[2 : 2 + len(SignupStatus)]
+        checkin_values = row[2 + len(SignupStatus) :]
         return {
-            "status": {status: count for status, count in status_rows},
-            "checkin": {status: count for status, count in checkin_rows},
+            "total": int(row[0]),
+            "with_checkin_time": int(row[1]),
+            "status": {status: int(count) for status, count in zip(SignupStatus, status_values)},
+            "checkin": {status: int(count) for status, count in zip(CheckinStatus, checkin_values)},
         }
 
-    def overall_counts(self, *, since: datetime | None = None) -> dict[str, int]:
-        query = select(func.count()).select_from(Signup)
+    def status_counts(self, *, activity_id: int | None = None, since: datetime | None = None) -> dict:
+        """Total, check-in-time, per-status and per-check-in-status counts computed in a single scan."""
+        query = select(*self._status_count_columns()).select_from(Signup)
+        if activity_id is not None:
+            query = query.where(Signup.activity_id == activity_id)
         if since is not None:
             query = query.where(Signup.created_at >= since)
-        total = self.session.execute(query).scalar_one()
+        return self._status_count_row(self.session.execute(query).one())
 
-        approved_query = select(func.count()).select_from(Signup).where(Signup.status == SignupStatus.APPROVED)
-        if since is not None:
-            approved_query = approved_query.where(Signup.created_at >= since)
-        approved = self.session.execute(approved_query).scalar_one()
-
-        checkin_query = select(func.count()).select_from(Signup).where(
-            Signup.checkin_status == CheckinStatus.CHECKED_IN
+    def status_counts_by_activity(self, activity_ids: Sequence[int]) -> dict[int, dict]:
+        """``status_counts`` for several activities with one ``GROUP BY activity_id`` query."""
+        results = {
+            activity_id: {
+                "total": 0,
+                "with_checkin_time": 0,
+                "status": {status: 0 for status in SignupStatus},
+                "checkin": {status: 0 for status in CheckinStatus},
+            }
+            for activity_id in activity_ids
+        }
+        if not activity_ids:
+            return results
+        query = (
+            select(Signup.activity_id, *self._status_count_columns())
+            .where(Signup.activity_id.in_(list(activity_ids)))
+            .group_by(Signup.activity_id)
         )
-        if since is not None:
-            checkin_query = checkin_query.where(Signup.created_at >= since)
-        checked_in = self.session.execute(checkin_query).scalar_one()
+        for row in self.session.execute(query).all():
+            results[row[0]] = self._status_count_row(row[1:])
+        return results
+
+    def latency_seconds(self, column, *, activity_id: int) -> list[float]:
+        """Seconds between ``created_at`` and ``column`` for the activity's signups where it is set.
+
+        The difference is computed by the database so only one float per row is transferred.
+        """
+        dialect = self.session.get_bind().dialect.name
+        if dialect == "sqlite":
+            delta = (func.julianday(column) - func.julianday(Signup.created_at)) * 86400.0
+        elif dialect in {"mysql", "mariadb"}:
+            delta = func.timestampdiff(literal_column("MICROSECOND"), Signup.created_at, column) / 1_000_000.0
+        else:
+            delta = func.extract("epoch", column - Signup.created_at)
+        query = select(delta).where(Signup.activity_id == activity_id, column.is_not(None))
+        return [float(value) for value in self.session.execute(query).scalars() if value is not None]
+
+    def activity_stats(self, activity_id: int) -> dict[str, dict]:
+        counts = self.status_counts(activity_id=activity_id)
+        return {"status": counts["status"], "checkin": counts["checkin"]}
+
+    def overall_counts(self, *, since: datetime | None = None) -> dict[str, int]:
+        counts = self.status_counts(since=since)
         return {
-            "total": total,
-            "approved": approved,
-            "checked_in": checked_in,
+            "total": counts["total"],
+            "approved": counts["status"][SignupStatus.APPROVED],
+            "checked_in": counts["checkin"][CheckinStatus.CHECKED_IN],
         }
 
     def delete_many(self, ids: list[int]) -> int:
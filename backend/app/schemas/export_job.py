@@ -0,0 +1,44 @@
+"""Schemas for background export jobs and export bundles."""
+
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import Field
+
+from app.models.enums import ExportJobStatus
+from app.schemas.common import ORMModel
+
+
+class ExportJobCreate(ORMModel):
+    kind: str = Field(pattern="^(signups|comments|shares|payments)$")
+    activity_id: int
+    format: str = Field("csv", pattern="^(csv|xlsx|parquet|arrow)$")
+    ids: Optional[List[int]] = Field(None, description="可选，按报名ID筛选（仅 signups）")
+
+
+class ExportJobRead(ORMModel):
+    id: int
+    kind: str
+    activity_id: int
+    format: str
+    status: ExportJobStatus
+    total_rows: Optional[int] = None
+    processed_rows: int
+    progress: Optional[float] = None
+    filename: Optional[str] = None
+    file_size: Optional[int] = None
+    error_message: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    created_at: datetime
+
+
+class ExportBundleCreate(ORMModel):
+    activity_ids: List[int] = Field(min_length=1, description="要打包导出的活动ID")
+    kinds: List[str] = Field(
+        default_factory=lambda: ["signups", "comments", "shares"],
+        min_length=1,
+        description="导出类型：signups / comments / shares / payments",
+    )
+    format: str = Field("csv", pattern="^(csv|xlsx|parquet|arrow)$")
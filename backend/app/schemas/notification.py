@@ -25,6 +25,7 @@ class NotificationLogRead(TimestampedSchema):
     error_message: Optional[str] = None
     scheduled_send_at: Optional[datetime] = None
     sent_at: Optional[datetime] = None
+    read_at: Optional[datetime] = None
     retry_count: int
 
 
@@ -74,3 +75,7 @@ class NotificationEnqueueRequest(ORMModel):
 
 class NotificationBatchDeleteRequest(ORMModel):
     ids: list[int]
+
+
+class NotificationUnreadCount(ORMModel):
+    unread: int
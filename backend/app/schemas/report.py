@@ -1,8 +1,10 @@
 """Schemas for reporting endpoints."""
 
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 
+from pydantic import Field
+
 from app.schemas.common import ORMModel
 
 
@@ -32,7 +34,10 @@ class ReportOverview(ORMModel):
     total_shares: int
     total_comments: int
     time_series: Optional[list[TimeSeriesPoint]] = None
+    granularity: Optional[str] = None
+    timezone: Optional[str] = None
     badge_rule_issuance: Optional[dict[str, int]] = None
+    query_timings_ms: Optional[dict[str, float]] = None
 
 
 class ReportActivity(ORMModel):
@@ -48,3 +53,61 @@ class ReportActivity(ORMModel):
     total_shares: int
     total_comments: int
     time_series: Optional[list[TimeSeriesPoint]] = None
+    granularity: Optional[str] = None
+    timezone: Optional[str] = None
+
+
+class ReportActivityBatchRequest(ORMModel):
+    activity_ids: list[int] = Field(..., min_length=1, max_length=200, description="活动ID列表")
+    days: Optional[int] = Field(None, ge=1, le=365, description="统计时间范围（天）")
+    granularity: str = Field("day", pattern="^(hour|day|week|month)$", description="时间序列粒度")
+    tz: Optional[str] = Field(None, description="时间序列时区，如 Asia/Shanghai")
+
+
+class ReportActivityBatch(ORMModel):
+    items: list[ReportActivity]
+
+
+class FunnelStage(ORMModel):
+    stage: str
+    count: int
+    rate_from_previous: float
+    rate_from_signup: float
+
+
+class LatencySummary(ORMModel):
+    count: int
+    mean: float | None
+    min: float | None
+    max: float | None
+    p50: float | None
+    p90: float | None
+    p99: float | None
+
+
+class ReportFunnel(ORMModel):
+    activity_id: int
+    generated_at: datetime
+    stages: list[FunnelStage]
+    approval_latency: LatencySummary
+    review_latency: LatencySummary
+
+
+class ReportUniqueEngagers(ORMModel):
+    activity_id: int | None
+    start_date: date
+    end_date: date
+    estimate: int
+    standard_error: float
+    sketches_merged: int
+
+
+class ReportCacheStats(ORMModel):
+    hits: int
+    misses: int
+    stale_hits: int
+    refreshes: int
+    invalidations: int
+    evictions: int
+    entries: int
+    hit_rate: float
@@ -1,20 +1,47 @@
-"""Service layer for recording and listing audit logs."""
+"""Service layer for recording and listing audit logs.
+
+How ``record`` writes depends on ``audit_write_mode``:
+
+``immediate`` (default)
+    Each record is inserted and flushed at once, in the caller's transaction.
+``buffered``
+    Records are kept on the session and inserted with one multi-row INSERT
+    just before it commits, still in the caller's transaction.  They commit
+    or roll back together with the changes they describe, exactly as with
+    ``immediate``, but queries in the same transaction do not see them
+    before the commit.  Ids follow ``record`` order within a transaction
+    and commit order across transactions.
+``async``
+    Records are kept on the session until it commits, then handed to the
+    background ``AuditWriter`` (``app.services.audit_writer``); a rollback
+    discards them.  They are stamped with the time ``record`` was called
+    and written in the order their transactions committed (a full queue
+    makes the committing thread wait), but in a later transaction: a crash
+    or a failed write between the commit and the writer's insert loses them.
+"""
 
 from __future__ import annotations
 
+from datetime import datetime, timezone
 from typing import Optional, Sequence
 
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 
+from app.core.config import get_settings
 from app.models.enums import AuditAction, AuditEntity
 from app.repositories.audit_logs import AuditLogRepository
 from app.schemas.audit import AuditLogRead
 
+_BUFFERED = "audit_buffered"
+_ASYNC = "audit_async"
+
 
 class AuditLogService:
     def __init__(self, session: Session) -> None:
         self.session = session
         self.repo = AuditLogRepository(session)
+        self.settings = get_settings()
 
     def record(
         self,
@@ -27,20 +54,42 @@ class AuditLogService:
         description: Optional[str] = None,
         context: Optional[dict] = None,
     ) -> None:
-        action_value = action.value if isinstance(action, AuditAction) else action
-        entity_value = entity_type.value if isinstance(entity_type, AuditEntity) else entity_type
-        self.repo.create(
-            {
-                "action": action_value,
-                "entity_type": entity_value,
-                "entity_id": entity_id,
-                "actor_admin_id": actor_admin_id,
-                "actor_user_id": actor_user_id,
-                "description": description,
-                "context": context,
-            }
+        payload = _payload(
+            action=action,
+            entity_type=entity_type,
+            entity_id=entity_id,
+            actor_admin_id=actor_admin_id,
+            actor_user_id=actor_user_id,
+            description=description,
+            context=context,
         )
-        self.session.flush()
+        if not self._defer([payload]):
+            self.repo.create(payload)
+            self.session.flush()
+
+    def record_many(self, entries: list[dict]) -> None:
+        """Record several entries (``record`` keyword arguments) with a single flush."""
+        if entries:
+            payloads = [_payload(**entry) for entry in entries]
+            if not self._defer(payloads):
+                self.repo.create_many(payloads)
+
+    def _defer(self, payloads: list[dict]) -> bool:
+        """Keep ``payloads`` on the session for the configured write mode; False in immediate mode."""
+        mode = self.settings.audit_write_mode
+        if mode in ("async", "buffered") and not self.session.in_transaction():
+            # nothing has touched the database yet: begin so a rollback still discards the records
+            self.session.begin()
+        if mode == "async":
+            now = datetime.now(timezone.utc)
+            for payload in payloads:
+                payload["created_at"] = payload["updated_at"] = now
+            self.session.info.setdefault(_ASYNC, []).extend(payloads)
+        elif mode == "buffered":
+            self.session.info.setdefault(_BUFFERED, []).extend(payloads)
+        else:
+            return False
+        return True
 
     def list_logs(
         self,
@@ -63,3 +112,51 @@ class AuditLogService:
             offset=offset,
         )
         return [AuditLogRead.model_validate(log, from_attributes=True) for log in logs]
+
+
+def _payload(
+    *,
+    action: AuditAction,
+    entity_type: AuditEntity,
+    entity_id: Optional[int] = None,
+    actor_admin_id: Optional[int] = None,
+    actor_user_id: Optional[int] = None,
+    description: Optional[str] = None,
+    context: Optional[dict] = None,
+) -> dict:
+    return {
+        "action": action.value if isinstance(action, AuditAction) else action,
+        "entity_type": entity_type.value if isinstance(entity_type, AuditEntity) else entity_type,
+        "entity_id": entity_id,
+        "actor_admin_id": actor_admin_id,
+        "actor_user_id": actor_user_id,
+        "description": description,
+        "context": context,
+    }
+
+
+def _write_buffered(session: Session) -> None:
+    payloads = session.info.pop(_BUFFERED, None)
+    if payloads:
+        AuditLogRepository(session).insert_many(payloads)
+
+
+def _submit_async(session: Session) -> None:
+    payloads = session.info.pop(_ASYNC, None)
+    if payloads:
+        from app.services.audit_writer import get_audit_writer
+
+        get_audit_writer().submit(payloads)
+
+
+def _discard_pending(session: Session, transaction) -> None:
+    # a commit has already taken its records; this drops those of a rollback or of
+    # a session closed mid-transaction (close() does not fire after_rollback)
+    if transaction.parent is None:
+        session.info.pop(_BUFFERED, None)
+        session.info.pop(_ASYNC, None)
+
+
+event.listen(Session, "before_commit", _write_buffered)
+event.listen(Session, "after_commit", _submit_async)
+event.listen(Session, "after_transaction_end", _discard_pending)
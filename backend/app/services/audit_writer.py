@@ -0,0 +1,108 @@
+"""Background writer for the ``async`` audit write mode.
+
+Records reach the writer only after the transaction that produced them has
+committed.  They go onto a bounded queue (``audit_async_queue_size``); one
+daemon thread takes up to ``audit_async_batch_size`` of them at a time and
+inserts them in a single multi-row INSERT and its own transaction.  While the
+queue is full the submitting thread waits for room, so a slow database slows
+producers down instead of dropping records or writing them out of order.
+
+Records are written in the order they were submitted.  They are not durable
+until the writer has committed them: a batch whose insert fails is logged
+and lost, and so is whatever is still queued if the process dies without
+``close`` being called.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from functools import lru_cache
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import get_settings
+from app.repositories.audit_logs import AuditLogRepository
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class AuditWriter:
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        *,
+        queue_size: int = 10000,
+        batch_size: int = 500,
+    ) -> None:
+        self.session_factory = session_factory
+        self.batch_size = max(1, batch_size)
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def submit(self, payloads: list[dict]) -> None:
+        """Queue committed records for writing; blocks while the queue is full."""
+        self._ensure_started()
+        # no timeout: writing around the queue would put these records ahead of older ones
+        for payload in payloads:
+            self._queue.put(payload)
+
+    def close(self, *, timeout: float | None = 10.0) -> None:
+        """Write everything queued so far, then stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while batch[-1] is not _STOP and len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = batch[-1] is _STOP
+            if stopping:
+                batch.pop()
+            if batch:
+                try:
+                    self._write(batch)
+                except Exception:
+                    logger.exception("failed to write %d audit records", len(batch))
+            if stopping:
+                return
+
+    def _write(self, payloads: list[dict]) -> None:
+        session = self.session_factory()
+        try:
+            AuditLogRepository(session).insert_many(payloads)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+
+@lru_cache
+def get_audit_writer() -> AuditWriter:
+    from app.db.session import SessionLocal
+
+    settings = get_settings()
+    return AuditWriter(
+        SessionLocal,
+        queue_size=settings.audit_async_queue_size,
+        batch_size=settings.audit_async_batch_size,
+    )
@@ -9,6 +9,7 @@ from app.models.signup import Signup
 from app.repositories.signups import SignupRepository
 from app.services.notifications import NotificationService
 from app.services.badge_rules import BadgeRuleService
+from app.services.report_cache import invalidate_reports
 from app.services.badges import BadgeService
 from app.core.config import get_settings
 
@@ -72,6 +73,7 @@ class CheckinService:
         self._auto_award_on_checkin(signup)
 
         self.session.commit()
+        invalidate_reports(signup.activity_id)
         self.session.refresh(signup)
         return signup
 
@@ -17,6 +17,7 @@ from app.schemas.engagement import (
     ActivityShareRequest,
     UserEngagementStats,
 )
+from app.services.report_cache import invalidate_reports
 
 
 class ActivityEngagementService:
@@ -29,26 +30,31 @@ class ActivityEngagementService:
     def favorite(self, *, activity_id: int, user_id: int) -> ActivityEngagementSummary:
         self.repo.add_favorite(activity_id=activity_id, user_id=user_id)
         self.session.commit()
+        invalidate_reports(activity_id)
         return self.get_summary(activity_id, user_id=user_id)
 
     def unfavorite(self, *, activity_id: int, user_id: int) -> ActivityEngagementSummary:
         self.repo.remove_favorite(activity_id=activity_id, user_id=user_id)
         self.session.commit()
+        invalidate_reports(activity_id)
         return self.get_summary(activity_id, user_id=user_id)
 
     def like(self, *, activity_id: int, user_id: int) -> ActivityEngagementSummary:
         self.repo.add_like(activity_id=activity_id, user_id=user_id)
         self.session.commit()
+        invalidate_reports(activity_id)
         return self.get_summary(activity_id, user_id=user_id)
 
     def unlike(self, *, activity_id: int, user_id: int) -> ActivityEngagementSummary:
         self.repo.remove_like(activity_id=activity_id, user_id=user_id)
         self.session.commit()
+        invalidate_reports(activity_id)
         return self.get_summary(activity_id, user_id=user_id)
 
     def share(self, *, activity_id: int, user_id: Optional[int], payload: ActivityShareRequest) -> ActivityEngagementSummary:
         self.repo.add_share(activity_id=activity_id, user_id=user_id, channel=payload.channel)
         self.session.commit()
+        invalidate_reports(activity_id)
         return self.get_summary(activity_id, user_id=user_id)
 
     def get_summary(self, activity_id: int, *, user_id: Optional[int]) -> ActivityEngagementSummary:
@@ -99,6 +105,7 @@ class ActivityEngagementService:
             }
         )
         self.session.commit()
+        invalidate_reports(activity_id)
         self.session.refresh(comment)
         return self._to_comment_schema(comment)
 
@@ -116,8 +123,10 @@ class ActivityEngagementService:
             return False
         if actor_admin_id is None and comment.user_id != actor_user_id:
             return False
+        activity_id = comment.activity_id
         self.comments_repo.delete(comment)
         self.session.commit()
+        invalidate_reports(activity_id)
         return True
 
     def _to_comment_schema(self, comment: ActivityComment) -> ActivityCommentRead:
@@ -0,0 +1,160 @@
+"""Multi-activity export bundles streamed as one ZIP archive.
+
+A bundle is one entry per (activity, kind) pair.  Entries are built on a
+shared worker pool (``export_bundle_workers`` threads), each with its own
+session, into a ``SpooledTemporaryFile``; at most one entry per worker is
+built ahead of the one being written.  The archive is written to a sink that
+is drained after every block, so the response streams as entries complete
+instead of after the whole ZIP is assembled.  Entries are written in request
+order, the central directory last.
+
+The whole bundle is audited as a single ``EXPORT_BUNDLE`` record.
+"""
+
+from __future__ import annotations
+
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
+from tempfile import SpooledTemporaryFile
+from typing import Iterator
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import get_settings
+from app.models.activity import Activity
+from app.models.enums import AuditAction, AuditEntity
+from app.services.audit import AuditLogService
+from app.services.export_columnar import COLUMNAR_FORMATS
+from app.services.exports import EXPORT_COLUMNS, FILE_BLOCK_SIZE, ExportService
+
+# formats that are already compressed are stored as-is
+_STORED_FORMATS = ("xlsx", *COLUMNAR_FORMATS)
+
+
+class _ZipSink:
+    """Write-only file object collecting the archive bytes until they are drained."""
+
+    def __init__(self) -> None:
+        self._parts: list[bytes] = []
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+class ExportBundleService:
+    def __init__(self, session: Session, *, session_factory: sessionmaker | None = None) -> None:
+        self.session = session
+        self.session_factory = session_factory or sessionmaker(bind=session.get_bind(), autoflush=False, future=True)
+        self.audit = AuditLogService(session)
+        self.settings = get_settings()
+
+    def stream_bundle(
+        self,
+        activity_ids: list[int],
+        kinds: list[str],
+        *,
+        fmt: str = "csv",
+        actor_admin_id: int | None = None,
+    ) -> tuple[str, Iterator[bytes]] | None:
+        """Stream a ZIP of every ``kind`` export of every activity; None if an activity does not exist."""
+        activity_ids = list(dict.fromkeys(activity_ids))
+        kinds = list(dict.fromkeys(kinds))
+        for kind in kinds:
+            if kind not in EXPORT_COLUMNS:
+                raise ValueError(f"unknown_export_kind:{kind}")
+        if not activity_ids or not kinds:
+            raise ValueError("empty_export_bundle")
+        if len(activity_ids) * len(kinds) > self.settings.export_bundle_max_entries:
+            raise ValueError("export_bundle_too_large")
+        fmt = ExportService(self.session).resolve_format(fmt)
+        found = set(self.session.execute(select(Activity.id).where(Activity.id.in_(activity_ids))).scalars())
+        if len(found) != len(activity_ids):
+            return None
+
+        self.audit.record(
+            action=AuditAction.EXPORT_BUNDLE,
+            entity_type=AuditEntity.ACTIVITY,
+            actor_admin_id=actor_admin_id,
+            context={"activity_ids": activity_ids, "kinds": kinds, "format": fmt},
+        )
+        self.session.commit()
+        now = datetime.now(timezone.utc)
+        entries = [(kind, activity_id) for activity_id in activity_ids for kind in kinds]
+        return f"export_bundle_{now:%Y%m%d%H%M%S}.zip", self._iter_zip(entries, fmt)
+
+    def _build_entry(self, kind: str, activity_id: int, fmt: str) -> tuple[str, SpooledTemporaryFile]:
+        output = SpooledTemporaryFile(max_size=self.settings.export_spool_max_bytes)
+        session = self.session_factory()
+        try:
+            exports = ExportService(session, session_factory=self.session_factory)
+            filename = exports.write_export(kind, activity_id, output, fmt=fmt)
+        except Exception:
+            output.close()
+            raise
+        finally:
+            session.close()
+        output.seek(0)
+        return filename, output
+
+    def _iter_zip(self, entries: list[tuple[str, int]], fmt: str) -> Iterator[bytes]:
+        executor = _bundle_executor(self.settings.export_bundle_workers)
+        ahead = max(1, self.settings.export_bundle_workers)
+        todo = iter(entries)
+        pending: deque[Future] = deque()
+
+        def submit_next() -> None:
+            entry = next(todo, None)
+            if entry is not None:
+                pending.append(executor.submit(self._build_entry, *entry, fmt))
+
+        sink = _ZipSink()
+        compression = zipfile.ZIP_STORED if fmt in _STORED_FORMATS else zipfile.ZIP_DEFLATED
+        try:
+            for _ in range(ahead):
+                submit_next()
+            with zipfile.ZipFile(sink, "w") as archive:
+                while pending:
+                    filename, spool = pending.popleft().result()
+                    submit_next()
+                    with spool:
+                        info = zipfile.ZipInfo(filename, date_time=datetime.now().timetuple()[:6])
+                        info.compress_type = compression
+                        info.file_size = spool.seek(0, 2)
+                        spool.seek(0)
+                        with archive.open(info, "w") as entry:
+                            while block := spool.read(FILE_BLOCK_SIZE):
+                                entry.write(block)
+                                if data := sink.drain():
+                                    yield data
+                    if data := sink.drain():
+                        yield data
+            yield sink.drain()
+        finally:
+            # client went away or an entry failed: drop the entries built ahead
+            for future in pending:
+                if not future.cancel():
+                    future.add_done_callback(_discard_entry)
+
+
+def _discard_entry(future: Future) -> None:
+    if not future.cancelled() and future.exception() is None:
+        future.result()[1].close()
+
+
+@lru_cache
+def _bundle_executor(max_workers: int) -> ThreadPoolExecutor:
+    # shared by all requests: bounds the number of bundle entries built concurrently
+    return ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="export-bundle")
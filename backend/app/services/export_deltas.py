@@ -0,0 +1,193 @@
+"""Incremental (delta) exports of signups, payments, comments and shares.
+
+A delta export covers the window ``since < updated_at <= until`` and returns
+an opaque cursor encoding ``until``; passing that cursor to the next export
+continues exactly where the previous one stopped, so repeated pulls only read
+the rows changed in between (range scans of the ``updated_at`` indexes).
+
+``until`` is the last fully elapsed second minus ``export_delta_settle_seconds``:
+timestamps are stored with second precision and transactions may commit a
+little after stamping their rows, so the newest second is left for the next
+pull instead of being split between two windows.
+
+Each row starts with an ``op`` column: ``upsert`` for inserted or updated rows
+and ``delete`` for tombstones.  Importing this module installs a
+``before_flush`` listener that writes an ``export_tombstones`` row for every
+deleted signup, payment, comment or share in the deleting transaction.  Rows
+removed with bulk SQL statements or database-level cascades leave no tombstone.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.activity_engagement import ActivityComment, ActivityShare
+from app.models.export_tombstone import ExportTombstone
+from app.models.payment import Payment
+from app.models.signup import Signup
+
+
+def _iso(value: datetime | None) -> str:
+    return value.isoformat() if isinstance(value, datetime) else ""
+
+
+@dataclass(frozen=True)
+class DeltaSpec:
+    model: type
+    entity_type: str
+    headers: list[str]
+    row: Callable[[Any], list]
+
+
+DELTA_SPECS: dict[str, DeltaSpec] = {
+    "signups": DeltaSpec(
+        model=Signup,
+        entity_type="signup",
+        headers=[
+            "op", "signup_id", "activity_id", "user_id", "status", "checkin_status",
+            "approved_at", "checkin_time", "created_at", "updated_at",
+        ],
+        row=lambda signup: [
+            "upsert",
+            signup.id,
+            signup.activity_id,
+            signup.user_id,
+            signup.status.value,
+            signup.checkin_status.value,
+            _iso(signup.approved_at),
+            _iso(signup.checkin_time),
+            _iso(signup.created_at),
+            _iso(signup.updated_at),
+        ],
+    ),
+    "payments": DeltaSpec(
+        model=Payment,
+        entity_type="payment",
+        headers=[
+            "op", "payment_id", "activity_id", "user_id", "amount", "category", "status",
+            "pay_date", "order_no", "transaction_no", "created_at", "updated_at",
+        ],
+        row=lambda payment: [
+            "upsert",
+            payment.id,
+            payment.activity_id,
+            payment.user_id,
+            payment.amount,
+            payment.category,
+            payment.status,
+            payment.pay_date or "",
+            payment.order_no or "",
+            payment.transaction_no or "",
+            _iso(payment.created_at),
+            _iso(payment.updated_at),
+        ],
+    ),
+    "comments": DeltaSpec(
+        model=ActivityComment,
+        entity_type="comment",
+        headers=[
+            "op", "comment_id", "activity_id", "user_id", "parent_id", "content", "is_pinned",
+            "created_at", "updated_at",
+        ],
+        row=lambda comment: [
+            "delete" if comment.deleted_at else "upsert",
+            comment.id,
+            comment.activity_id,
+            comment.user_id,
+            comment.parent_id or "",
+            comment.content,
+            "yes" if comment.is_pinned else "no",
+            _iso(comment.created_at),
+            _iso(comment.updated_at),
+        ],
+    ),
+    "shares": DeltaSpec(
+        model=ActivityShare,
+        entity_type="share",
+        headers=["op", "share_id", "activity_id", "user_id", "channel", "created_at", "updated_at"],
+        row=lambda share: [
+            "upsert",
+            share.id,
+            share.activity_id,
+            share.user_id or "",
+            share.channel or "",
+            _iso(share.created_at),
+            _iso(share.updated_at),
+        ],
+    ),
+}
+
+_TOMBSTONED = {spec.model: spec.entity_type for spec in DELTA_SPECS.values()}
+
+
+def get_delta_spec(kind: str) -> DeltaSpec:
+    try:
+        return DELTA_SPECS[kind]
+    except KeyError:
+        raise ValueError(f"unknown_export_kind:{kind}") from None
+
+
+def tombstone_row(spec: DeltaSpec, tombstone: ExportTombstone) -> list:
+    """``delete`` row carrying the id, activity and deletion time; other columns are blank."""
+    row: list = ["delete", tombstone.entity_id, tombstone.activity_id or ""]
+    row.extend([""] * (len(spec.headers) - 4))
+    row.append(_iso(tombstone.deleted_at))
+    return row
+
+
+# ----- watermark ------------------------------------------------------------
+
+
+def to_utc_naive(value: datetime) -> datetime:
+    """Timestamps are stored as naive UTC."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def delta_until(*, now: datetime | None = None, settle_seconds: int = 0) -> datetime:
+    """Upper bound of a delta window: the last fully elapsed second, minus the settle lag."""
+    now = to_utc_naive(now or datetime.now(timezone.utc))
+    return (now - timedelta(seconds=settle_seconds)).replace(microsecond=0) - timedelta(seconds=1)
+
+
+def encode_cursor(kind: str, activity_id: int | None, until: datetime) -> str:
+    payload = json.dumps({"kind": kind, "activity_id": activity_id, "until": until.isoformat()}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, *, kind: str, activity_id: int | None) -> datetime:
+    """Watermark of a cursor returned by a previous export of the same kind and activity."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        until = datetime.fromisoformat(payload["until"])
+    except (ValueError, KeyError, TypeError, binascii.Error, UnicodeError):
+        raise ValueError("invalid_export_cursor") from None
+    if payload.get("kind") != kind or payload.get("activity_id") != activity_id:
+        raise ValueError("export_cursor_mismatch")
+    return until
+
+
+# ----- tombstones -----------------------------------------------------------
+
+
+def _record_tombstones(session: Session, flush_context, instances) -> None:
+    tombstones = [
+        ExportTombstone(entity_type=_TOMBSTONED[type(obj)], entity_id=obj.id, activity_id=obj.activity_id)
+        for obj in session.deleted
+        if type(obj) in _TOMBSTONED and obj.id is not None
+    ]
+    if tombstones:
+        session.add_all(tombstones)
+
+
+event.listen(Session, "before_flush", _record_tombstones)
@@ -0,0 +1,250 @@
+"""Background export jobs.
+
+``submit`` records a job row (and the export's audit entry) and hands it to a
+shared worker pool; the HTTP request returns immediately and the client polls
+the job.  A worker writes the file into ``export_artifacts_dir`` under a
+``.part`` name, renames it once complete and updates ``processed_rows`` after
+every chunk so the status endpoint can report progress.
+
+At most ``export_job_workers`` exports are built at a time per process; further
+jobs wait in the pool's queue as ``pending``.  A request identical to one made
+in the last ``export_job_reuse_seconds`` (same kind, activity, format and ids)
+returns that job instead of building the file again.  Artifacts expire after
+``export_artifact_ttl_seconds`` and are deleted by ``cleanup_expired``, which
+the scheduler runs periodically.
+
+The pool lives in the process, so a restart loses its queued and running jobs.
+A running job updates its row after every chunk; pending or running jobs not
+updated for ``export_job_stale_seconds`` are never reused, and
+``recover_stale`` (also run by the scheduler) queues stale pending jobs again
+and fails stale running ones.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import Executor, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from pathlib import Path
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import get_settings
+from app.models.enums import ExportJobStatus
+from app.models.export_job import ExportJob
+from app.repositories.activities import ActivityRepository
+from app.repositories.export_jobs import ExportJobRepository
+from app.services.exports import EXPORT_COLUMNS, ExportService
+
+logger = logging.getLogger(__name__)
+
+
+def export_params(kind: str, activity_id: int, fmt: str, ids: list[int] | None) -> tuple[dict, str]:
+    """Normalised job parameters and their hash (the reuse key)."""
+    params = {"kind": kind, "activity_id": activity_id, "format": fmt, "ids": sorted(set(ids)) if ids else None}
+    digest = hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()
+    return params, digest
+
+
+class ExportJobService:
+    def __init__(
+        self,
+        session: Session,
+        *,
+        session_factory: sessionmaker | None = None,
+        executor: Executor | None = None,
+    ) -> None:
+        self.session = session
+        self.session_factory = session_factory or sessionmaker(bind=session.get_bind(), autoflush=False, future=True)
+        self.jobs = ExportJobRepository(session)
+        self.activities = ActivityRepository(session)
+        self.settings = get_settings()
+        self._executor = executor
+
+    @property
+    def executor(self) -> Executor:
+        return self._executor or _export_executor(self.settings.export_job_workers)
+
+    def submit(
+        self,
+        *,
+        kind: str,
+        activity_id: int,
+        fmt: str = "csv",
+        ids: list[int] | None = None,
+        actor_admin_id: int | None = None,
+    ) -> tuple[ExportJob, bool] | None:
+        """Queue an export; returns ``(job, created)`` or None if the activity does not exist.
+
+        ``created`` is False when a recent identical job was reused.
+        """
+        if kind not in EXPORT_COLUMNS:
+            raise ValueError(f"unknown_export_kind:{kind}")
+        fmt = ExportService(self.session).resolve_format(fmt)
+        if not self.activities.get(activity_id):
+            return None
+        params, params_hash = export_params(kind, activity_id, fmt, ids)
+        now = datetime.now(timezone.utc)
+        reuse_seconds = self.settings.export_job_reuse_seconds
+        if reuse_seconds > 0:
+            existing = self.jobs.find_reusable(
+                params_hash,
+                since=now - timedelta(seconds=reuse_seconds),
+                now=now,
+                stale_before=now - timedelta(seconds=self.settings.export_job_stale_seconds),
+            )
+            if existing:
+                return existing, False
+
+        job = self.jobs.create(
+            {
+                "kind": kind,
+                "activity_id": activity_id,
+                "format": fmt,
+                "params": params,
+                "params_hash": params_hash,
+                "status": ExportJobStatus.PENDING,
+                "requested_by_admin_id": actor_admin_id,
+            }
+        )
+        ExportService(self.session).record_export(kind, activity_id, actor_admin_id=actor_admin_id, ids=params["ids"])
+        self.session.commit()
+        self.executor.submit(self._run_in_new_session, job.id)
+        return job, True
+
+    def get(self, job_id: int) -> ExportJob | None:
+        return self.jobs.get(job_id)
+
+    def artifact_path(self, job: ExportJob) -> Path | None:
+        """Path of a finished, unexpired artifact, or None."""
+        if job.status != ExportJobStatus.SUCCEEDED or not job.file_path:
+            return None
+        if job.expires_at and _as_utc(job.expires_at) <= datetime.now(timezone.utc):
+            return None
+        path = Path(job.file_path)
+        return path if path.is_file() else None
+
+    # ----- worker ----------------------------------------------------------
+
+    def _run_in_new_session(self, job_id: int) -> None:
+        session = self.session_factory()
+        try:
+            ExportJobService(session, session_factory=self.session_factory, executor=self._executor).run(job_id)
+        except Exception:  # pragma: no cover - run() records failures itself
+            logger.exception("export job %s crashed", job_id)
+        finally:
+            session.close()
+
+    def run(self, job_id: int) -> None:
+        """Build the artifact of a pending job; failures are recorded on the job."""
+        job = self.jobs.get(job_id)
+        if not job or job.status != ExportJobStatus.PENDING:
+            return
+        kind, activity_id, fmt = job.kind, job.activity_id, job.format
+        ids = (job.params or {}).get("ids")
+        exports = ExportService(self.session)
+        if not self.jobs.claim(job_id, total_rows=exports.count_rows(kind, activity_id, ids=ids), now=_now()):
+            self.session.rollback()
+            return
+        self.session.commit()
+
+        directory = Path(self.settings.export_artifacts_dir)
+        partial = directory / f"{job_id}.part"
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            with open(partial, "wb") as output:
+                filename = exports.write_export(
+                    kind, activity_id, output, fmt=fmt, ids=ids, on_chunk=lambda rows: self._progress(job_id, rows)
+                )
+            path = directory / f"{job_id}-{filename}"
+            os.replace(partial, path)
+        except Exception as exc:
+            logger.exception("export job %s failed", job_id)
+            self.session.rollback()
+            partial.unlink(missing_ok=True)
+            self.jobs.finish(job_id, status=ExportJobStatus.FAILED, now=_now(), error_message=str(exc)[:255])
+            self.session.commit()
+            return
+
+        now = _now()
+        self.jobs.finish(
+            job_id,
+            status=ExportJobStatus.SUCCEEDED,
+            now=now,
+            filename=filename,
+            file_path=str(path),
+            file_size=path.stat().st_size,
+            expires_at=now + timedelta(seconds=self.settings.export_artifact_ttl_seconds),
+        )
+        self.session.commit()
+
+    def _progress(self, job_id: int, rows: int) -> None:
+        self.jobs.add_progress(job_id, rows)
+        self.session.commit()
+
+    # ----- cleanup ---------------------------------------------------------
+
+    def recover_stale(self, *, now: datetime | None = None) -> int:
+        """Requeue stale pending jobs and fail stale running ones; returns the number recovered.
+
+        A requeued job still waiting in another process's queue is built once: ``run`` claims it first.
+        """
+        now = now or _now()
+        before = now - timedelta(seconds=self.settings.export_job_stale_seconds)
+        requeue: list[int] = []
+        failed = 0
+        for job in self.jobs.list_stale(before=before):
+            if job.status == ExportJobStatus.PENDING:
+                if self.jobs.update_stale(job.id, current=ExportJobStatus.PENDING, before=before):
+                    requeue.append(job.id)
+            elif self.jobs.update_stale(
+                job.id,
+                current=ExportJobStatus.RUNNING,
+                before=before,
+                status=ExportJobStatus.FAILED,
+                finished_at=now,
+                error_message="worker_lost",
+            ):
+                Path(self.settings.export_artifacts_dir, f"{job.id}.part").unlink(missing_ok=True)
+                failed += 1
+        self.session.commit()
+        for job_id in requeue:
+            self.executor.submit(self._run_in_new_session, job_id)
+        if requeue or failed:
+            logger.warning("recovered stale export jobs: %s requeued, %s failed", len(requeue), failed)
+        return len(requeue) + failed
+
+    def cleanup_expired(self, *, now: datetime | None = None) -> int:
+        """Delete expired artifacts and mark their jobs expired; returns the number cleaned up."""
+        now = now or _now()
+        paths: list[str] = []
+        jobs = self.jobs.list_expired(now=now)
+        for job in jobs:
+            if job.file_path:
+                paths.append(job.file_path)
+            job.status = ExportJobStatus.EXPIRED
+            job.file_path = None
+        # the rows stop pointing at the files before they are deleted: a failure in between
+        # leaves an orphaned file, never a SUCCEEDED job whose artifact is gone
+        self.session.commit()
+        for path in paths:
+            Path(path).unlink(missing_ok=True)
+        return len(jobs)
+
+
+@lru_cache
+def _export_executor(max_workers: int) -> ThreadPoolExecutor:
+    # shared by all requests: bounds the number of exports built concurrently
+    return ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="export-job")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
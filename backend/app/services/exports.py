@@ -1,207 +1,677 @@
-"""Services for exporting data snapshots (CSV/XLSX)."""
+"""Services for exporting data snapshots (CSV/XLSX/Parquet/Arrow).
+
+Rows are produced chunk by chunk (keyset pagination over ids), so exports can
+be streamed: ``stream_activity_*_export`` read from their own session and
+release each chunk's objects once written.  CSV is yielded as the UTF-8 BOM and
+header followed by one encoded block per chunk; XLSX is written by a write-only
+workbook into a ``SpooledTemporaryFile`` and streamed back in blocks.  Peak
+memory is bounded by the chunk size (and the spool threshold) rather than the
+number of rows.  Rows hold typed values (None, bool, datetime); CSV and XLSX
+render them as text, Parquet and Arrow keep the types (``export_columnar``).
+``stream_delta_export`` emits only the rows changed since a
+watermark (see ``app.services.export_deltas``).
+"""
 
 from __future__ import annotations
 
+import codecs
 import csv
 import io
+import json
 from datetime import datetime
+from tempfile import SpooledTemporaryFile
+from typing import BinaryIO, Callable, Iterable, Iterator
 
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, sessionmaker
 
+from app.core.config import get_settings
 from app.models.activity import Activity
+from app.models.activity_engagement import ActivityComment, ActivityShare
 from app.models.enums import AuditAction, AuditEntity
+from app.models.payment import Payment
+from app.models.signup import Signup
 from app.repositories.activities import ActivityRepository
+from app.repositories.audit_logs import AuditLogRepository
+from app.repositories.export_deltas import ExportDeltaRepository
 from app.repositories.signups import SignupRepository
 from app.repositories.feedbacks import ActivityFeedbackRepository
+from app.repositories.payments import PaymentRepository
 from app.repositories.engagements import ActivityEngagementRepository, ActivityCommentRepository
 from app.services.audit import AuditLogService
+from app.services.export_columnar import COLUMNAR_FORMATS, Columns, arrow_available, write_columnar
+from app.services.export_deltas import (
+    DeltaSpec,
+    decode_cursor,
+    delta_until,
+    encode_cursor,
+    get_delta_spec,
+    to_utc_naive,
+    tombstone_row,
+)
+
+EXPORT_CHUNK_SIZE = 500
+FILE_BLOCK_SIZE = 64 * 1024
+
+SIGNUP_COLUMNS = [
+    ("signup_id", "int"),
+    ("user_id", "int"),
+    ("user_name", "str"),
+    ("status", "str"),
+    ("checkin_status", "str"),
+    ("approved_at", "timestamp"),
+    ("checkin_time", "timestamp"),
+    ("created_at", "timestamp"),
+    ("feedback_rating", "int"),
+    ("feedback_comment", "str"),
+    ("is_favorited", "bool"),
+    ("is_liked", "bool"),
+    ("user_share_count", "int"),
+    ("user_comment_count", "int"),
+]
+SHARE_COLUMNS = [
+    ("share_id", "int"),
+    ("user_id", "int"),
+    ("user_name", "str"),
+    ("channel", "str"),
+    ("created_at", "timestamp"),
+]
+COMMENT_COLUMNS = [
+    ("comment_id", "int"),
+    ("user_id", "int"),
+    ("user_name", "str"),
+    ("content", "str"),
+    ("parent_id", "int"),
+    ("created_at", "timestamp"),
+    ("is_pinned", "bool"),
+]
+PAYMENT_COLUMNS = [
+    ("payment_id", "int"),
+    ("user_id", "int"),
+    ("user_name", "str"),
+    ("amount", "float"),
+    ("category", "str"),
+    ("status", "str"),
+    ("pay_date", "str"),
+    ("payer", "str"),
+    ("order_no", "str"),
+    ("transaction_no", "str"),
+    ("created_at", "timestamp"),
+    ("updated_at", "timestamp"),
+]
+AUDIT_LOG_COLUMNS = [
+    ("log_id", "int"),
+    ("action", "str"),
+    ("entity_type", "str"),
+    ("entity_id", "int"),
+    ("actor_admin_id", "int"),
+    ("actor_user_id", "int"),
+    ("description", "str"),
+    ("context", "str"),
+    ("created_at", "timestamp"),
+]
+
+# per-activity export kinds
+EXPORT_COLUMNS = {
+    "signups": SIGNUP_COLUMNS,
+    "shares": SHARE_COLUMNS,
+    "comments": COMMENT_COLUMNS,
+    "payments": PAYMENT_COLUMNS,
+}
+EXPORT_HEADERS = {kind: [name for name, _ in columns] for kind, columns in EXPORT_COLUMNS.items()}
+SIGNUP_HEADERS = EXPORT_HEADERS["signups"]
+SHARE_HEADERS = EXPORT_HEADERS["shares"]
+COMMENT_HEADERS = EXPORT_HEADERS["comments"]
+EXPORT_FORMATS = ("csv", "xlsx", *COLUMNAR_FORMATS)
+
+_MEDIA_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.file",
+}
+
+RowChunks = Iterator[list[list]]
+
+
+def export_media_type(filename: str) -> str:
+    return _MEDIA_TYPES.get(filename.rsplit(".", 1)[-1], "text/csv; charset=utf-8")
+
+
+def _text_value(value):
+    """Spreadsheet rendering of a typed value: blank for null, yes/no, ISO timestamps."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "yes" if value else "no"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _text_rows(rows: Iterable[list]) -> Iterator[list]:
+    return ([_text_value(value) for value in row] for row in rows)
+
+
+def iter_csv(headers: list[str], chunks: Iterable[list[list]]) -> Iterator[bytes]:
+    """Encode row chunks as CSV: BOM and header first, then one block per chunk."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    yield codecs.BOM_UTF8 + buffer.getvalue().encode("utf-8")
+    for rows in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(_text_rows(rows))
+        yield buffer.getvalue().encode("utf-8")
+
+
+def xlsx_available() -> bool:
+    try:
+        import openpyxl  # type: ignore  # noqa: F401
+        return True
+    except Exception:
+        return False
+
+
+def save_xlsx(headers: list[str], rows: Iterable[list], output: BinaryIO) -> None:
+    """Write rows with a write-only workbook into ``output``.
+
+    Write-only worksheets serialise each row as it is appended instead of
+    keeping cell objects.
+    """
+    from openpyxl import Workbook  # type: ignore
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(headers)
+    for row in _text_rows(rows):
+        ws.append(row)
+    wb.save(output)
+
+
+def iter_file(fileobj, *, block_size: int = FILE_BLOCK_SIZE) -> Iterator[bytes]:
+    """Yield ``fileobj`` in blocks and close it afterwards."""
+    try:
+        while block := fileobj.read(block_size):
+            yield block
+    finally:
+        fileobj.close()
 
 
 class ExportService:
     """Provide structured exports for administrative use."""
 
-    def __init__(self, session: Session) -> None:
+    def __init__(self, session: Session, *, session_factory: sessionmaker | None = None) -> None:
         self.session = session
+        self.session_factory = session_factory or sessionmaker(bind=session.get_bind(), autoflush=False, future=True)
         self.activities = ActivityRepository(session)
         self.signups = SignupRepository(session)
         self.feedbacks = ActivityFeedbackRepository(session)
         self.engagements = ActivityEngagementRepository(session)
         self.comments_repo = ActivityCommentRepository(session)
         self.audit = AuditLogService(session)
+        self.settings = get_settings()
 
     def _xlsx_available(self) -> bool:
+        return xlsx_available()
+
+    def _arrow_available(self) -> bool:
+        return arrow_available()
+
+    def resolve_format(self, fmt: str) -> str:
+        """Format actually produced for ``fmt``: CSV when its optional dependency is missing."""
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"unknown_export_format:{fmt}")
+        if fmt == "xlsx" and not self._xlsx_available():
+            return "csv"
+        if fmt in COLUMNAR_FORMATS and not self._arrow_available():
+            return "csv"
+        return fmt
+
+    def _write_file(self, fmt: str, columns: Columns, chunks: RowChunks, output: BinaryIO) -> None:
+        headers = [name for name, _ in columns]
+        if fmt == "xlsx":
+            save_xlsx(headers, (row for rows in chunks for row in rows), output)
+        elif fmt in COLUMNAR_FORMATS:
+            write_columnar(fmt, columns, chunks, output)
+        else:
+            for block in iter_csv(headers, chunks):
+                output.write(block)
+
+    def _spool(self, fmt: str, columns: Columns, chunks: RowChunks) -> SpooledTemporaryFile:
+        """Write a binary format into a spooled temp file, rewound for reading; the caller closes it."""
+        output = SpooledTemporaryFile(max_size=self.settings.export_spool_max_bytes)
         try:
-            import openpyxl  # type: ignore  # noqa: F401
-            return True
+            self._write_file(fmt, columns, chunks, output)
         except Exception:
-            return False
-
-    def _to_xlsx(self, headers: list[str], rows: list[list], filename: str) -> tuple[str, bytes]:
-        from openpyxl import Workbook  # type: ignore
-        wb = Workbook()
-        ws = wb.active
-        ws.append(headers)
-        for row in rows:
-            ws.append(row)
-        output = io.BytesIO()
-        wb.save(output)
-        return filename, output.getvalue()
+            output.close()
+            raise
+        output.seek(0)
+        return output
 
-    def activity_signups_export(self, activity_id: int, *, actor_admin_id: int | None = None, fmt: str = "csv", ids: list[int] | None = None) -> tuple[str, bytes] | None:
-        activity: Activity | None = self.activities.get(activity_id)
-        if not activity:
-            return None
+    def _render(self, columns: Columns, chunks: RowChunks, basename: str, fmt: str) -> tuple[str, bytes]:
+        fmt = self.resolve_format(fmt)
+        if fmt == "csv":
+            return f"{basename}.csv", b"".join(iter_csv([name for name, _ in columns], chunks))
+        with self._spool(fmt, columns, chunks) as output:
+            return f"{basename}.{fmt}", output.read()
+
+    def _private_chunks(self, produce: Callable[[ExportService], RowChunks]) -> RowChunks:
+        """Run ``produce`` on a private session, dropping each chunk's objects once it has been consumed."""
+        session = self.session_factory()
+        try:
+            for rows in produce(ExportService(session, session_factory=self.session_factory)):
+                yield rows
+                session.expunge_all()
+        finally:
+            session.close()
+
+    def _stream_export(
+        self,
+        produce: Callable[[ExportService], RowChunks],
+        columns: Columns,
+        basename: str,
+        fmt: str,
+    ) -> tuple[str, Iterator[bytes]]:
+        fmt = self.resolve_format(fmt)
+        if fmt == "csv":
+            return f"{basename}.csv", iter_csv([name for name, _ in columns], self._private_chunks(produce))
+        return f"{basename}.{fmt}", iter_file(self._spool(fmt, columns, self._private_chunks(produce)))
+
+    # ----- row producers -------------------------------------------------
+
+    def _columns(self, kind: str, activity_id: int) -> tuple[Columns, list[int]]:
+        """Columns of an export and, for signups, the form field ids of its answer columns."""
+        if kind not in EXPORT_COLUMNS:
+            raise ValueError(f"unknown_export_kind:{kind}")
+        if kind != "signups":
+            return EXPORT_COLUMNS[kind], []
+        fields = self.activities.list_form_fields(activity_id)
+        return SIGNUP_COLUMNS + [(field.label, "str") for field in fields], [field.id for field in fields]
+
+    def _signup_rows(
+        self,
+        activity_id: int,
+        *,
+        ids: list[int] | None = None,
+        field_ids: list[int] | None = None,
+        chunk_size: int = EXPORT_CHUNK_SIZE,
+    ) -> RowChunks:
+        # answers come from one streamed query in the same signup order as the
+        # chunks; it holds a cursor open, so it gets a session of its own
+        answers_session = self.session_factory() if field_ids else None
+        try:
+            answers = None
+            if answers_session is not None:
+                answers = _AnswerPivot(SignupRepository(answers_session).iter_answers(activity_id=activity_id, ids=ids))
+            for signups in self.signups.iter_chunks(activity_id=activity_id, ids=ids, chunk_size=chunk_size):
+                yield self._signup_chunk_rows(activity_id, signups, field_ids or [], answers)
+        finally:
+            if answers_session is not None:
+                answers_session.close()
 
-        signups = self.signups.list(activity_id=activity_id)
-        if ids:
-            signups = [s for s in signups if s.id in set(ids)]
-
-        headers = [
-            "signup_id",
-            "user_id",
-            "user_name",
-            "status",
-            "checkin_status",
-            "approved_at",
-            "checkin_time",
-            "created_at",
-            "feedback_rating",
-            "feedback_comment",
-            "is_favorited",
-            "is_liked",
-            "user_share_count",
-            "user_comment_count",
-        ]
+    def _signup_chunk_rows(
+        self,
+        activity_id: int,
+        signups: list[Signup],
+        field_ids: list[int],
+        answers: _AnswerPivot | None,
+    ) -> list[list]:
+        # enrich the whole chunk with a fixed number of grouped queries
+        user_ids = [signup.user_id for signup in signups]
+        feedbacks = self.feedbacks.get_by_users(activity_id=activity_id, user_ids=user_ids)
+        engagements = self.engagements.user_activity_metrics_by_user(activity_id=activity_id, user_ids=user_ids)
         rows: list[list] = []
         for signup in signups:
             user = signup.user
-            feedback = self.feedbacks.get_by_user_activity(activity_id=activity_id, user_id=signup.user_id)
-            engagement = self.engagements.user_activity_metrics(activity_id=activity_id, user_id=signup.user_id)
-            rows.append(
+            feedback = feedbacks.get(signup.user_id)
+            engagement = engagements[signup.user_id]
+            row = [
+                signup.id,
+                signup.user_id,
+                user.name if user else None,
+                signup.status.value,
+                signup.checkin_status.value,
+                signup.approved_at,
+                signup.checkin_time,
+                signup.created_at,
+                feedback.rating if feedback else None,
+                feedback.comment if feedback else None,
+                bool(engagement["is_favorited"]),
+                bool(engagement["is_liked"]),
+                engagement["share_count"],
+                engagement["comment_count"],
+            ]
+            if field_ids:
+                values = answers.take(signup.id) if answers is not None else {}
+                row.extend(values.get(field_id) for field_id in field_ids)
+            rows.append(row)
+        return rows
+
+    def _share_rows(self, activity_id: int, *, chunk_size: int = EXPORT_CHUNK_SIZE) -> RowChunks:
+        for shares in self.engagements.iter_share_chunks(activity_id=activity_id, chunk_size=chunk_size):
+            yield [
+                [
+                    share.id,
+                    share.user_id,
+                    share.user.name if share.user else None,
+                    share.channel or None,
+                    share.created_at,
+                ]
+                for share in shares
+            ]
+
+    def _comment_rows(self, activity_id: int, *, chunk_size: int = EXPORT_CHUNK_SIZE) -> RowChunks:
+        for comments in self.comments_repo.iter_chunks(activity_id, chunk_size=chunk_size):
+            yield [
+                [
+                    comment.id,
+                    comment.user_id,
+                    comment.user.name if comment.user else None,
+                    comment.content,
+                    comment.parent_id,
+                    comment.created_at,
+                    bool(comment.is_pinned),
+                ]
+                for comment in comments
+            ]
+
+    def _payment_rows(self, activity_id: int, *, chunk_size: int = EXPORT_CHUNK_SIZE) -> RowChunks:
+        for payments in PaymentRepository(self.session).iter_chunks(activity_id=activity_id, chunk_size=chunk_size):
+            yield [
                 [
-                    signup.id,
-                    signup.user_id,
-                    user.name if user else "",
-                    signup.status.value,
-                    signup.checkin_status.value,
-                    signup.approved_at.isoformat() if signup.approved_at else "",
-                    signup.checkin_time.isoformat() if signup.checkin_time else "",
-                    signup.created_at.isoformat() if isinstance(signup.created_at, datetime) else "",
-                    feedback.rating if feedback else "",
-                    feedback.comment if feedback else "",
-                    "yes" if engagement["is_favorited"] else "no",
-                    "yes" if engagement["is_liked"] else "no",
-                    engagement["share_count"],
-                    engagement["comment_count"],
+                    payment.id,
+                    payment.user_id,
+                    payment.user.name if payment.user else None,
+                    payment.amount,
+                    payment.category or None,
+                    payment.status,
+                    payment.pay_date,
+                    payment.payer,
+                    payment.order_no,
+                    payment.transaction_no,
+                    payment.created_at,
+                    payment.updated_at,
                 ]
-            )
+                for payment in payments
+            ]
 
-        if fmt == "xlsx" and self._xlsx_available():
-            filename = f"activity_{activity_id}_signups.xlsx"
-            filename, content = self._to_xlsx(headers, rows, filename)
+    def _audit_log_rows(self, *, chunk_size: int = EXPORT_CHUNK_SIZE, **filters) -> RowChunks:
+        for logs in AuditLogRepository(self.session).iter_chunks(chunk_size=chunk_size, **filters):
+            yield [
+                [
+                    log.id,
+                    str(log.action),
+                    str(log.entity_type),
+                    log.entity_id,
+                    log.actor_admin_id,
+                    log.actor_user_id,
+                    log.description,
+                    json.dumps(log.context, ensure_ascii=False) if log.context is not None else None,
+                    log.created_at,
+                ]
+                for log in logs
+            ]
+
+    def _rows(
+        self,
+        kind: str,
+        activity_id: int,
+        *,
+        ids: list[int] | None = None,
+        field_ids: list[int] | None = None,
+        chunk_size: int = EXPORT_CHUNK_SIZE,
+    ) -> RowChunks:
+        if kind == "signups":
+            return self._signup_rows(activity_id, ids=ids, field_ids=field_ids, chunk_size=chunk_size)
+        if kind == "shares":
+            return self._share_rows(activity_id, chunk_size=chunk_size)
+        if kind == "comments":
+            return self._comment_rows(activity_id, chunk_size=chunk_size)
+        if kind == "payments":
+            return self._payment_rows(activity_id, chunk_size=chunk_size)
+        raise ValueError(f"unknown_export_kind:{kind}")
+
+    # ----- audit ---------------------------------------------------------
+
+    def _count(self, model, activity_id: int, *conditions) -> int:
+        return self.session.execute(
+            select(func.count()).select_from(model).where(model.activity_id == activity_id, *conditions)
+        ).scalar_one()
+
+    def count_rows(self, kind: str, activity_id: int, *, ids: list[int] | None = None) -> int:
+        """Number of rows an export of ``kind`` will contain."""
+        if kind == "signups":
+            return self._count(Signup, activity_id, *([Signup.id.in_(ids)] if ids else []))
+        if kind == "shares":
+            return self._count(ActivityShare, activity_id)
+        if kind == "comments":
+            return self._count(ActivityComment, activity_id, ActivityComment.deleted_at.is_(None))
+        if kind == "payments":
+            return self._count(Payment, activity_id)
+        raise ValueError(f"unknown_export_kind:{kind}")
+
+    def record_export(self, kind: str, activity_id: int, *, actor_admin_id: int | None, ids: list[int] | None = None) -> None:
+        """Write the audit record of an export of ``kind``."""
+        count = self.count_rows(kind, activity_id, ids=ids)
+        if kind == "signups":
+            engagement_summary = self.engagements.engagement_summary(activity_id)
+            feedback_totals = self.feedbacks.aggregate_for_activity(activity_id)
+            context = {
+                "count": count,
+                "favorites": engagement_summary["favorites"],
+                "likes": engagement_summary["likes"],
+                "shares": engagement_summary["shares"],
+                "comments": engagement_summary["comments"],
+                "feedbacks": feedback_totals["total_feedbacks"],
+            }
         else:
-            buffer = io.StringIO()
-            writer = csv.writer(buffer)
-            writer.writerow(headers)
-            writer.writerows(rows)
-            filename = f"activity_{activity_id}_signups.csv"
-            content = buffer.getvalue().encode("utf-8-sig")
-
-        engagement_summary = self.engagements.engagement_summary(activity_id)
-        feedback_totals = self.feedbacks.aggregate_for_activity(activity_id)
+            context = {kind: count}
         self.audit.record(
             action=AuditAction.EXPORT_SIGNUPS,
             entity_type=AuditEntity.ACTIVITY,
             entity_id=activity_id,
             actor_admin_id=actor_admin_id,
-            context={
-                "count": len(signups),
-                "favorites": engagement_summary["favorites"],
-                "likes": engagement_summary["likes"],
-                "shares": engagement_summary["shares"],
-                "comments": engagement_summary["comments"],
-                "feedbacks": feedback_totals["total_feedbacks"],
-            },
+            context=context,
         )
         self.session.flush()
 
+    # ----- file exports --------------------------------------------------
+
+    def write_export(
+        self,
+        kind: str,
+        activity_id: int,
+        output: BinaryIO,
+        *,
+        fmt: str = "csv",
+        ids: list[int] | None = None,
+        on_chunk: Callable[[int], None] | None = None,
+        chunk_size: int = EXPORT_CHUNK_SIZE,
+    ) -> str:
+        """Write an export of ``kind`` into ``output``; returns the download filename.
+
+        ``on_chunk`` is called with the number of rows of each chunk once it
+        has been written, for progress reporting.
+        """
+        fmt = self.resolve_format(fmt)
+        columns, field_ids = self._columns(kind, activity_id)
+        chunks = self._rows(kind, activity_id, ids=ids, field_ids=field_ids, chunk_size=chunk_size)
+        if on_chunk is not None:
+            chunks = _reporting(chunks, on_chunk)
+        self._write_file(fmt, columns, chunks, output)
+        return f"activity_{activity_id}_{kind}.{fmt}"
+
+    # ----- buffered exports ----------------------------------------------
+
+    def activity_signups_export(self, activity_id: int, *, actor_admin_id: int | None = None, fmt: str = "csv", ids: list[int] | None = None) -> tuple[str, bytes] | None:
+        activity: Activity | None = self.activities.get(activity_id)
+        if not activity:
+            return None
+        columns, field_ids = self._columns("signups", activity_id)
+        filename, content = self._render(
+            columns, self._signup_rows(activity_id, ids=ids, field_ids=field_ids), f"activity_{activity_id}_signups", fmt
+        )
+        self.record_export("signups", activity_id, actor_admin_id=actor_admin_id, ids=ids)
         return filename, content
 
     def activity_shares_export(self, activity_id: int, *, actor_admin_id: int | None = None, fmt: str = "csv") -> tuple[str, bytes] | None:
         activity: Activity | None = self.activities.get(activity_id)
         if not activity:
             return None
+        filename, content = self._render(SHARE_COLUMNS, self._share_rows(activity_id), f"activity_{activity_id}_shares", fmt)
+        self.record_export("shares", activity_id, actor_admin_id=actor_admin_id)
+        return filename, content
 
-        shares = self.engagements.list_shares(activity_id=activity_id)
-        headers = ["share_id", "user_id", "user_name", "channel", "created_at"]
-        rows = []
-        for share in shares:
-            user = share.user
-            rows.append([
-                share.id,
-                share.user_id or "",
-                user.name if user else "",
-                share.channel or "",
-                share.created_at.isoformat() if isinstance(share.created_at, datetime) else "",
-            ])
-
-        if fmt == "xlsx" and self._xlsx_available():
-            filename, content = self._to_xlsx(headers, rows, f"activity_{activity_id}_shares.xlsx")
-        else:
-            buffer = io.StringIO()
-            writer = csv.writer(buffer)
-            writer.writerow(headers)
-            writer.writerows(rows)
-            filename = f"activity_{activity_id}_shares.csv"
-            content = buffer.getvalue().encode("utf-8-sig")
+    def activity_comments_export(self, activity_id: int, *, actor_admin_id: int | None = None, fmt: str = "csv") -> tuple[str, bytes] | None:
+        activity: Activity | None = self.activities.get(activity_id)
+        if not activity:
+            return None
+        filename, content = self._render(
+            COMMENT_COLUMNS, self._comment_rows(activity_id), f"activity_{activity_id}_comments", fmt
+        )
+        self.record_export("comments", activity_id, actor_admin_id=actor_admin_id)
+        return filename, content
+
+    # ----- streaming exports ---------------------------------------------
+    # The audit record is written and committed up front on the request
+    # session; rows are read with a private session so the returned iterator
+    # keeps working after the request-scoped session has been closed.  CSV is
+    # encoded lazily chunk by chunk; XLSX is written with a write-only
+    # workbook into a spooled temp file, which is then streamed back.
+
+    def stream_export(
+        self,
+        kind: str,
+        activity_id: int,
+        *,
+        actor_admin_id: int | None = None,
+        fmt: str = "csv",
+        ids: list[int] | None = None,
+        chunk_size: int = EXPORT_CHUNK_SIZE,
+    ) -> tuple[str, Iterator[bytes]] | None:
+        if not self.activities.get(activity_id):
+            return None
+        columns, field_ids = self._columns(kind, activity_id)
+        self.record_export(kind, activity_id, actor_admin_id=actor_admin_id, ids=ids)
+        self.session.commit()
+        return self._stream_export(
+            lambda service: service._rows(kind, activity_id, ids=ids, field_ids=field_ids, chunk_size=chunk_size),
+            columns,
+            f"activity_{activity_id}_{kind}",
+            fmt,
+        )
+
+    def stream_activity_signups_export(self, activity_id: int, **options) -> tuple[str, Iterator[bytes]] | None:
+        return self.stream_export("signups", activity_id, **options)
+
+    def stream_activity_shares_export(self, activity_id: int, **options) -> tuple[str, Iterator[bytes]] | None:
+        return self.stream_export("shares", activity_id, **options)
+
+    def stream_activity_comments_export(self, activity_id: int, **options) -> tuple[str, Iterator[bytes]] | None:
+        return self.stream_export("comments", activity_id, **options)
+
+    def stream_activity_payments_export(self, activity_id: int, **options) -> tuple[str, Iterator[bytes]] | None:
+        return self.stream_export("payments", activity_id, **options)
+
+    def stream_audit_log_export(
+        self,
+        *,
+        actor_admin_id: int | None = None,
+        fmt: str = "csv",
+        action: AuditAction | None = None,
+        entity_type: AuditEntity | None = None,
+        entity_id: int | None = None,
+        chunk_size: int = EXPORT_CHUNK_SIZE,
+    ) -> tuple[str, Iterator[bytes]]:
+        """Stream audit logs (newest first), optionally filtered like the audit log listing."""
+        filters = {"action": action, "entity_type": entity_type, "entity_id": entity_id}
         self.audit.record(
             action=AuditAction.EXPORT_SIGNUPS,
             entity_type=AuditEntity.ACTIVITY,
-            entity_id=activity_id,
+            entity_id=None,
             actor_admin_id=actor_admin_id,
-            context={"shares": len(shares)},
+            context={"kind": "audit_logs", **{name: str(value) for name, value in filters.items() if value is not None}},
+        )
+        self.session.commit()
+        return self._stream_export(
+            lambda service: service._audit_log_rows(chunk_size=chunk_size, **filters),
+            AUDIT_LOG_COLUMNS,
+            "audit_logs",
+            fmt,
         )
-        self.session.flush()
-        return filename, content
 
-    def activity_comments_export(self, activity_id: int, *, actor_admin_id: int | None = None, fmt: str = "csv") -> tuple[str, bytes] | None:
-        activity: Activity | None = self.activities.get(activity_id)
-        if not activity:
-            return None
+    # ----- delta exports -------------------------------------------------
+    # See app.services.export_deltas for the window/cursor semantics.
 
-        comments = self.comments_repo.list_all(activity_id)
-        headers = ["comment_id", "user_id", "user_name", "content", "parent_id", "created_at", "is_pinned"]
-        rows = []
-        for comment in comments:
-            user = comment.user
-            rows.append([
-                comment.id,
-                comment.user_id,
-                user.name if user else "",
-                comment.content,
-                comment.parent_id or "",
-                comment.created_at.isoformat() if isinstance(comment.created_at, datetime) else "",
-                "yes" if comment.is_pinned else "no",
-            ])
-
-        if fmt == "xlsx" and self._xlsx_available():
-            filename, content = self._to_xlsx(headers, rows, f"activity_{activity_id}_comments.xlsx")
-        else:
-            buffer = io.StringIO()
-            writer = csv.writer(buffer)
-            writer.writerow(headers)
-            writer.writerows(rows)
-            filename = f"activity_{activity_id}_comments.csv"
-            content = buffer.getvalue().encode("utf-8-sig")
+    def _delta_rows(
+        self,
+        spec: DeltaSpec,
+        *,
+        since: datetime | None,
+        until: datetime,
+        activity_id: int | None,
+        chunk_size: int = EXPORT_CHUNK_SIZE,
+    ) -> RowChunks:
+        deltas = ExportDeltaRepository(self.session)
+        changed = deltas.iter_changed(
+            spec.model, since=since, until=until, activity_id=activity_id, chunk_size=chunk_size
+        )
+        for entities in changed:
+            yield [spec.row(entity) for entity in entities]
+        tombstones = deltas.tombstones(spec.entity_type, since=since, until=until, activity_id=activity_id)
+        for start in range(0, len(tombstones), chunk_size):
+            yield [tombstone_row(spec, tombstone) for tombstone in tombstones[start : start + chunk_size]]
+
+    def stream_delta_export(
+        self,
+        kind: str,
+        *,
+        activity_id: int | None = None,
+        since: datetime | None = None,
+        cursor: str | None = None,
+        actor_admin_id: int | None = None,
+        fmt: str = "csv",
+        now: datetime | None = None,
+        chunk_size: int = EXPORT_CHUNK_SIZE,
+    ) -> tuple[str, Iterator[bytes], str] | None:
+        """Stream the rows of ``kind`` changed after ``since`` (or the watermark of ``cursor``).
+
+        Returns ``(filename, content, next_cursor)``; None if ``activity_id`` is
+        given but does not exist.  Without ``since`` and ``cursor`` everything up
+        to the current watermark is exported.
+        """
+        spec = get_delta_spec(kind)
+        if activity_id is not None and not self.activities.get(activity_id):
+            return None
+        if cursor:
+            since = decode_cursor(cursor, kind=kind, activity_id=activity_id)
+        elif since is not None:
+            since = to_utc_naive(since)
+        until = delta_until(now=now, settle_seconds=self.settings.export_delta_settle_seconds)
         self.audit.record(
             action=AuditAction.EXPORT_SIGNUPS,
             entity_type=AuditEntity.ACTIVITY,
             entity_id=activity_id,
             actor_admin_id=actor_admin_id,
-            context={"comments": len(comments)},
+            context={
+                "kind": kind,
+                "delta": True,
+                "since": since.isoformat() if since else None,
+                "until": until.isoformat(),
+            },
         )
-        self.session.flush()
-        return filename, content
+        self.session.commit()
+        scope = f"activity_{activity_id}_" if activity_id is not None else ""
+        filename, content = self._stream_export(
+            lambda service: service._delta_rows(
+                spec, since=since, until=until, activity_id=activity_id, chunk_size=chunk_size
+            ),
+            [(name, "str") for name in spec.headers],
+            f"{scope}{kind}_delta_{until:%Y%m%d%H%M%S}",
+            fmt,
+        )
+        return filename, content, encode_cursor(kind, activity_id, until)
 
     # Backward-compatible CSV helpers (used by existing tests)
     def activity_signups_csv(self, activity_id: int, *, actor_admin_id: int | None = None) -> tuple[str, bytes] | None:
@@ -212,3 +682,39 @@ class ExportService:
 
     def activity_shares_csv(self, activity_id: int, *, actor_admin_id: int | None = None) -> tuple[str, bytes] | None:
         return self.activity_shares_export(activity_id, actor_admin_id=actor_admin_id, fmt="csv")
+
+
+class _AnswerPivot:
+    """Pivot a streamed answer result (newest signup first) into per-signup ``{field_id: value}``.
+
+    ``take`` must be called with signup ids in the same descending order; it
+    skips answers of signups the export does not visit, so only the current
+    signup's answers are held in memory.
+    """
+
+    def __init__(self, rows: Iterator) -> None:
+        self._rows = rows
+        self._pending = next(self._rows, None)
+
+    def take(self, signup_id: int) -> dict[int, str | None]:
+        values: dict[int, str | None] = {}
+        while self._pending is not None and self._pending.signup_id >= signup_id:
+            row = self._pending
+            if row.signup_id == signup_id:
+                values[row.field_id] = _answer_value(row.value_text, row.value_json)
+            self._pending = next(self._rows, None)
+        return values
+
+
+def _answer_value(value_text: str | None, value_json) -> str | None:
+    if value_text is not None:
+        return value_text
+    if value_json is None:
+        return None
+    return json.dumps(value_json, ensure_ascii=False)
+
+
+def _reporting(chunks: RowChunks, on_chunk: Callable[[int], None]) -> RowChunks:
+    for rows in chunks:
+        yield rows
+        on_chunk(len(rows))
@@ -11,6 +11,7 @@ from app.models.signup import Signup
 from app.repositories.feedbacks import ActivityFeedbackRepository
 from app.repositories.signups import SignupRepository
 from app.schemas.feedback import ActivityFeedbackRead, ActivityFeedbackSubmit
+from app.services.report_cache import invalidate_reports
 
 
 class ActivityFeedbackService:
@@ -43,6 +44,7 @@ class ActivityFeedbackService:
             }
         )
         self.session.commit()
+        invalidate_reports(activity_id)
         self.session.refresh(feedback)
         return ActivityFeedbackRead.model_validate(feedback, from_attributes=True)
 
@@ -74,6 +76,7 @@ class ActivityFeedbackService:
             return False
         self.repo.delete(feedback)
         self.session.commit()
+        invalidate_reports(activity_id)
         return True
 
     def aggregate(self, activity_id: int) -> dict[str, float | int | None]:
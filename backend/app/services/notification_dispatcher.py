@@ -0,0 +1,103 @@
+"""Parallel notification dispatch.
+
+``NotificationDispatcher`` runs ``notification_dispatch_workers`` threads, each
+with its own session, that repeatedly claim a batch with
+``NotificationService.dispatch_pending`` until nothing due is left.  Claims are
+atomic (see ``NotificationRepository.claim_batch``), so workers never send the
+same notification twice, and any number of dispatchers may run side by side.
+
+``BackgroundNotificationDispatcher`` keeps one running in a daemon thread for
+the deferred delivery mode: it drains whenever a deferred notification is
+committed in this process and at least every
+``notification_dispatch_latency_seconds``.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import get_settings
+from app.models.enums import NotificationChannel
+from app.services.notification_senders import NotificationSender
+from app.services.notifications import NotificationService, delivery_requested
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationDispatcher:
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        *,
+        workers: int | None = None,
+        batch_size: int | None = None,
+        senders: dict[NotificationChannel, NotificationSender] | None = None,
+    ) -> None:
+        settings = get_settings()
+        self.session_factory = session_factory
+        self.workers = max(1, workers or settings.notification_dispatch_workers)
+        self.batch_size = max(1, batch_size or settings.notification_dispatch_batch_size)
+        self.senders = senders
+
+    def run(self, *, max_batches: int | None = None) -> int:
+        """Drain due notifications; returns how many were dispatched.
+
+        ``max_batches`` caps the batches claimed per worker.
+        """
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="notification-dispatch") as pool:
+            futures = [pool.submit(self._work, max_batches) for _ in range(self.workers)]
+            return sum(future.result() for future in futures)
+
+    def _work(self, max_batches: int | None) -> int:
+        dispatched = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            session = self.session_factory()
+            try:
+                count = NotificationService(session, senders=self.senders).dispatch_pending(limit=self.batch_size)
+            except Exception:
+                session.rollback()
+                logger.exception("notification dispatch batch failed")
+                raise
+            finally:
+                session.close()
+            if not count:
+                break
+            dispatched += count
+            batches += 1
+        return dispatched
+
+
+class BackgroundNotificationDispatcher:
+    def __init__(self, dispatcher: NotificationDispatcher, *, latency_seconds: float | None = None) -> None:
+        self.dispatcher = dispatcher
+        self.latency_seconds = latency_seconds or get_settings().notification_dispatch_latency_seconds
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._loop, name="notification-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, *, timeout: float | None = 10.0) -> None:
+        self._stopping.set()
+        delivery_requested.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stopping.is_set():
+            delivery_requested.clear()
+            try:
+                self.dispatcher.run()
+            except Exception:
+                logger.exception("background notification dispatch failed")
+            delivery_requested.wait(self.latency_seconds)
@@ -1,13 +1,37 @@
-"""Notification sender interfaces, implementations, and factory."""
+"""Notification sender interfaces, implementations, and factory.
+
+Senders implement ``send``; batch-capable senders also implement
+``send_many``, which the dispatcher uses through the module-level
+``send_many`` helper (plain senders are called one by one).
+
+``HttpNotificationSender`` posts each notification as JSON to a provider
+gateway.  Its requests run on one event loop thread shared by all HTTP
+senders, with a single pooled ``httpx.AsyncClient`` (at most
+``notification_http_max_connections`` connections), so a batch is sent
+concurrently and connections are reused across batches and dispatcher
+workers.  Each sender allows at most ``concurrency`` requests in flight, and
+each request is bounded by ``timeout``.  ``create_sender`` returns the
+runtime's sender for any ``http://`` / ``https://`` URL configured as a
+channel's sender: there is one per URL, so the services and dispatcher
+batches created per request all share its limit.
+"""
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import asyncio
 import logging
-from typing import Protocol
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Awaitable, Protocol, Sequence, TypeVar
+
+import httpx
 
+from app.core.config import get_settings
 from app.models.enums import NotificationChannel, NotificationEvent
 
+T = TypeVar("T")
+
 
 @dataclass
 class NotificationContext:
@@ -51,8 +75,151 @@ class LoggingNotificationSender:
         )
 
 
+class AsyncSenderRuntime:
+    """Event loop thread owning the pooled ``httpx.AsyncClient`` shared by HTTP senders."""
+
+    def __init__(self, *, max_connections: int) -> None:
+        self.max_connections = max_connections
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._client: httpx.AsyncClient | None = None
+        self._senders: dict[str, HttpNotificationSender] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # only used from coroutines running on the runtime loop
+        if self._client is None:
+            limits = httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+            self._client = httpx.AsyncClient(limits=limits)
+        return self._client
+
+    def http_sender(self, url: str, *, concurrency: int, timeout: float) -> HttpNotificationSender:
+        """The sender for ``url``, created on first use; callers share its concurrency limit."""
+        with self._lock:
+            sender = self._senders.get(url)
+            if sender is None:
+                sender = HttpNotificationSender(url, concurrency=concurrency, timeout=timeout, runtime=self)
+                self._senders[url] = sender
+            return sender
+
+    def run(self, coro: Awaitable[T]) -> T:
+        """Run ``coro`` on the runtime loop and wait for its result (called from worker threads)."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="notification-senders", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def close(self) -> None:
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        if self._client is not None:
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), loop).result()
+            self._client = None
+        loop.call_soon_threadsafe(loop.stop)
+
+
+@lru_cache
+def get_sender_runtime() -> AsyncSenderRuntime:
+    return AsyncSenderRuntime(max_connections=get_settings().notification_http_max_connections)
+
+
+class HttpNotificationSender:
+    """Post notifications as JSON to ``url``; any non-2xx response is a failure."""
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        concurrency: int = 10,
+        timeout: float = 5.0,
+        headers: dict[str, str] | None = None,
+        runtime: AsyncSenderRuntime | None = None,
+    ) -> None:
+        self.url = url
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.headers = headers or {}
+        self.runtime = runtime or get_sender_runtime()
+        # a semaphore is bound to the loop it is used on; closing the runtime starts a new loop
+        self._semaphore: tuple[asyncio.AbstractEventLoop, asyncio.Semaphore] | None = None
+
+    def send(self, context: NotificationContext) -> None:
+        self.runtime.run(self.send_async(context))
+
+    def send_many(self, contexts: Sequence[NotificationContext]) -> list[str | None]:
+        return self.runtime.run(self._send_all(contexts))
+
+    async def send_async(self, context: NotificationContext) -> None:
+        async with self._loop_semaphore():
+            response = await self.runtime.client.post(
+                self.url, json=_request_body(context), headers=self.headers, timeout=self.timeout
+            )
+        response.raise_for_status()
+
+    def _loop_semaphore(self) -> asyncio.Semaphore:
+        # only called on the runtime loop, so no lock is needed
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore[0] is not loop:
+            self._semaphore = (loop, asyncio.Semaphore(self.concurrency))
+        return self._semaphore[1]
+
+    async def _send_all(self, contexts: Sequence[NotificationContext]) -> list[str | None]:
+        results = await asyncio.gather(*(self.send_async(context) for context in contexts), return_exceptions=True)
+        return [_error_message(result) if isinstance(result, BaseException) else None for result in results]
+
+
+def _request_body(context: NotificationContext) -> dict[str, Any]:
+    return {
+        "channel": context.channel.value,
+        "event": context.event.value,
+        "user_id": context.user_id,
+        "activity_id": context.activity_id,
+        "signup_id": context.signup_id,
+        "payload": context.payload,
+    }
+
+
+def _error_message(exc: BaseException) -> str:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return f"http_{exc.response.status_code}"
+    if isinstance(exc, httpx.TimeoutException):
+        return "timeout"
+    return (str(exc) or type(exc).__name__)[:255]
+
+
+def send_many(sender: NotificationSender, contexts: Sequence[NotificationContext]) -> list[str | None]:
+    """Send ``contexts`` with ``sender``; returns the error message of each (None when sent)."""
+    batch = getattr(sender, "send_many", None)
+    if batch is not None:
+        return batch(contexts)
+    errors: list[str | None] = []
+    for context in contexts:
+        try:
+            sender.send(context)
+        except Exception as exc:
+            errors.append(_error_message(exc))
+        else:
+            errors.append(None)
+    return errors
+
+
 def create_sender(kind: str) -> NotificationSender:
-    kind = (kind or "mock").strip().lower()
+    kind = (kind or "mock").strip()
+    if kind.startswith(("http://", "https://")):
+        settings = get_settings()
+        return get_sender_runtime().http_sender(
+            kind,
+            concurrency=settings.notification_channel_concurrency,
+            timeout=settings.notification_http_timeout_seconds,
+        )
+    kind = kind.lower()
     if kind == "mock":
         return MockNotificationSender()
     if kind in {"log", "logging"}:
@@ -1,10 +1,43 @@
-"""Notification service for logging delivery events and dispatching."""
+"""Notification service for logging delivery events and dispatching.
+
+With ``notification_delivery_mode = "deferred"``, ``enqueue`` only inserts the
+``NotificationLog`` (a transactional outbox): nothing is sent and no status or
+audit rows are written in the request.  Committing a session that enqueued a
+notification sets ``delivery_requested``, which wakes the in-process
+background dispatcher (``app.services.notification_dispatcher``); it also polls
+every ``notification_dispatch_latency_seconds`` for rows enqueued by other
+processes or scheduled for later.
+
+A failed send is retried: the row is left FAILED with ``scheduled_send_at``
+set to an exponential backoff with jitter (``retry_delay``), which makes it
+claimable again once due.  After ``notification_max_attempts`` failures it is
+moved to DEAD_LETTER and no longer retried.  Sends of each channel are paced
+by a token bucket when ``notification_rate_limit_<channel>`` is set; the
+buckets are per process, so the provider quota is shared by dividing it
+across dispatching processes.
+
+With ``notification_coalesce_window_seconds`` set, a user's notifications on
+one channel are coalesced: the first one opens a DIGEST log due at the end of
+the window and it and every later one enqueued before then point at it
+(``digest_id``).  Dispatch sends the digest as one provider call carrying all
+its pending members, writes one audit row for it, and gives the members the
+digest's outcome in one UPDATE.  The members stay in the user's inbox as
+usual; the digest itself has no user and is not shown there.  Coalescing
+only applies in deferred mode: in inline mode no dispatcher runs to send the
+digest when its window closes, so every notification is sent on its own.
+"""
 
 from __future__ import annotations
 
-from datetime import datetime, timezone
-from typing import Any, Optional
+import random
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Optional, Sequence
+from uuid import uuid4
 
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 
 from app.core.config import get_settings
@@ -14,8 +47,14 @@ from app.models.notification import NotificationLog
 from app.models.signup import Signup
 from app.models.user import UserProfile
 from app.repositories.notifications import NotificationRepository
-from app.services.notification_senders import NotificationContext, NotificationSender, create_sender
+from app.repositories.pagination import decode_keyset_cursor, encode_keyset_cursor
+from app.services.notification_senders import NotificationContext, NotificationSender, create_sender, send_many
 from app.services.audit import AuditLogService
+from app.utils.token_bucket import TokenBucket
+
+# set after a session that enqueued a deferred notification commits
+delivery_requested = threading.Event()
+_DEFERRED_ENQUEUED = "notifications_deferred_enqueued"
 
 
 class NotificationService:
@@ -57,23 +96,16 @@ class NotificationService:
 
         self.repo.mark_status(log, NotificationStatus.SENDING)
 
-        context = NotificationContext(
-            channel=log.channel,
-            event=log.event,
-            user_id=log.user_id,
-            activity_id=log.activity_id,
-            signup_id=log.signup_id,
-            payload=log.payload,
-        )
-        sender = self._get_sender(log.channel)
-        try:
-            sender.send(context)
-        except Exception as exc:  # pragma: no cover - unexpected sender failure
-            self.mark_failed(log, str(exc))
-            return log
-        else:
+        error = self._send(log)
+        if error is None:
             self.mark_sent(log)
-            return log
+        else:
+            self.mark_failed(log, error)
+        return log
+
+    def _send(self, log: NotificationLog) -> str | None:
+        """Hand ``log`` to its channel's sender; returns the error message on failure."""
+        return send_many(self._get_sender(log.channel), [_context(log)])[0]
 
     def enqueue(
         self,
@@ -96,50 +128,73 @@ class NotificationService:
             "scheduled_send_at": scheduled_send_at,
             "status": NotificationStatus.PENDING,
         }
+        deferred = self.settings.notification_delivery_mode == "deferred"
+        window = self.settings.notification_coalesce_window_seconds
+        if deferred and window > 0 and user_id is not None and scheduled_send_at is None:
+            data["digest_id"] = self._open_digest(user_id, channel, window)
         log = self.repo.create(data)
-        if self._should_send_now(log):
+        if deferred:
+            self.session.info[_DEFERRED_ENQUEUED] = True
+        elif log.digest_id is None and self._should_send_now(log):
             self._deliver(log)
         return log
 
+    def _open_digest(self, user_id: int, channel: NotificationChannel, window: float) -> int:
+        """The digest collecting ``user_id``'s notifications on ``channel``, opening one if none is."""
+        now = datetime.now(timezone.utc)
+        digest_id = self.repo.find_open_digest(user_id=user_id, channel=channel, now=now)
+        if digest_id is None:
+            digest = self.repo.create(
+                {
+                    "channel": channel,
+                    "event": NotificationEvent.DIGEST,
+                    "status": NotificationStatus.PENDING,
+                    "scheduled_send_at": now + timedelta(seconds=window),
+                }
+            )
+            digest_id = digest.id
+        return digest_id
+
     def mark_sent(self, log: NotificationLog) -> NotificationLog:
         log.sent_at = datetime.now(timezone.utc)
         log = self.repo.mark_status(log, NotificationStatus.SENT)
-        self.audit.record(
-            action=AuditAction.NOTIFICATION_SENT,
-            entity_type=AuditEntity.NOTIFICATION,
-            entity_id=log.id,
-            actor_admin_id=None,
-            actor_user_id=log.user_id,
-            context={
-                "channel": log.channel.value,
-                "event": log.event.value,
-                "status": log.status.value,
-            },
-        )
+        self.audit.record(**_delivery_audit(log, NotificationStatus.SENT))
         return log
 
     def mark_failed(self, log: NotificationLog, error: str) -> NotificationLog:
         log.sent_at = None
         log.retry_count += 1
-        log = self.repo.mark_status(log, NotificationStatus.FAILED, error=error)
-        self.audit.record(
-            action=AuditAction.NOTIFICATION_SENT,
-            entity_type=AuditEntity.NOTIFICATION,
-            entity_id=log.id,
-            actor_admin_id=None,
-            actor_user_id=log.user_id,
-            context={
-                "channel": log.channel.value,
-                "event": log.event.value,
-                "status": log.status.value,
-                "error": error,
-            },
-        )
+        status, log.scheduled_send_at = self._next_attempt(log.retry_count, datetime.now(timezone.utc))
+        log = self.repo.mark_status(log, status, error=error)
+        self.audit.record(**_delivery_audit(log, status, error))
         return log
 
+    def _next_attempt(self, failures: int, now: datetime) -> tuple[NotificationStatus, datetime | None]:
+        """Status and retry time after the ``failures``-th failed attempt."""
+        if failures >= self.settings.notification_max_attempts:
+            return NotificationStatus.DEAD_LETTER, None
+        delay = retry_delay(
+            failures,
+            base_seconds=self.settings.notification_retry_base_seconds,
+            max_seconds=self.settings.notification_retry_max_seconds,
+        )
+        return NotificationStatus.FAILED, now + timedelta(seconds=delay)
+
     def list_logs(self, *, user_id: Optional[int] = None, limit: Optional[int] = None) -> list[NotificationLog]:
         return list(self.repo.list(user_id=user_id, limit=limit))
 
+    def list_inbox(
+        self, user_id: int, *, limit: int = 50, cursor: Optional[str] = None
+    ) -> tuple[list[NotificationLog], Optional[str]]:
+        """One page of the user's notifications, newest first, and the cursor of the next page (None on the last)."""
+        after = decode_keyset_cursor(cursor) if cursor else None
+        logs = list(self.repo.list(user_id=user_id, limit=limit, after=after))
+        next_cursor = encode_keyset_cursor(logs[-1].created_at, logs[-1].id) if len(logs) == limit else None
+        return logs, next_cursor
+
+    def unread_count(self, user_id: int) -> int:
+        return self.repo.unread_count(user_id)
+
     def preview(
         self,
         *,
@@ -189,22 +244,217 @@ class NotificationService:
         }
 
     def delete_notification(self, notification_id: int, *, user_id: int) -> bool:
-        return self.repo.delete_one(notification_id, user_id=user_id)
+        deleted = self.repo.delete_one(notification_id, user_id=user_id)
+        self.session.commit()
+        return deleted
 
     def batch_delete(self, notification_ids: list[int], *, user_id: int) -> int:
-        return self.repo.delete_batch(notification_ids, user_id=user_id)
+        deleted = self.repo.delete_batch(notification_ids, user_id=user_id)
+        self.session.commit()
+        return deleted
 
     def delete_all_for_user(self, user_id: int) -> int:
-        return self.repo.delete_all_for_user(user_id)
+        deleted = self.repo.delete_all_for_user(user_id)
+        self.session.commit()
+        return deleted
 
     def mark_all_read(self, user_id: int) -> int:
-        return self.repo.mark_all_read(user_id)
+        updated = self.repo.mark_all_read(user_id, now=datetime.now(timezone.utc))
+        self.session.commit()
+        return updated
 
     def dispatch_pending(self, *, limit: int = 50) -> int:
+        """Claim up to ``limit`` due notifications, send them and record the outcomes in bulk.
+
+        Each channel's share of the batch goes to its sender in ``send_many``
+        calls, so batch-capable (HTTP) senders deliver it concurrently.
+
+        The claim is committed before anything is sent, so several workers (or
+        processes) can run this concurrently without sending a row twice.  A
+        worker that dies mid-batch leaves its rows SENDING until the lease
+        (``notification_claim_lease_seconds``) expires; they are then claimed
+        again, so delivery is at-least-once for crashed batches.  Pacing by a
+        channel's rate limit can outlast the lease, so ``_send_paced`` renews it
+        before every slice and commits each slice's outcomes once it is sent.
+
+        A claimed digest is sent as one notification carrying its pending
+        members; a digest whose members were all deleted meanwhile is
+        closed without a send.
+        """
         now = datetime.now(timezone.utc)
-        logs = self.repo.list_pending(limit=limit, now=now)
-        dispatched = 0
+        token = uuid4().hex
+        lease_until = now + timedelta(seconds=self.settings.notification_claim_lease_seconds)
+        logs = self.repo.claim_batch(token=token, limit=limit, now=now, lease_until=lease_until)
+        by_channel: dict[NotificationChannel, list[int]] = defaultdict(list)
         for log in logs:
-            self._deliver(log)
-            dispatched += 1
-        return dispatched
+            by_channel[log.channel].append(log.id)
+        self.session.commit()
+        for channel, ids in by_channel.items():
+            self._send_paced(channel, ids, token=token)
+        return len(logs)
+
+    def _send_paced(self, channel: NotificationChannel, ids: list[int], *, token: str) -> None:
+        """Send the claimed ``ids`` in slices of whatever the channel's token bucket allows.
+
+        Before a slice is sent its lease is renewed under ``token``; rows whose
+        lease ran out meanwhile and were claimed by another worker are skipped.
+        """
+        sender = self._get_sender(channel)
+        bucket = channel_bucket(channel, self.settings)
+        lease = timedelta(seconds=self.settings.notification_claim_lease_seconds)
+        while ids:
+            size = bucket.acquire(len(ids)) if bucket else len(ids)
+            batch, ids = ids[:size], ids[size:]
+            self.repo.renew_claim(batch, token=token, lease_until=datetime.now(timezone.utc) + lease)
+            self.session.commit()
+            logs = self.repo.list_claimed(batch, token=token)
+            members = self.repo.digest_members([log.id for log in logs if log.event == NotificationEvent.DIGEST])
+            closed = [log for log in logs if log.id in members and not members[log.id]]
+            outgoing = [log for log in logs if log.id not in members or members[log.id]]
+            contexts = [
+                _digest_context(log, members[log.id]) if log.id in members else _context(log) for log in outgoing
+            ]
+            errors = send_many(sender, contexts) if contexts else []
+            self._record_outcomes(token, closed, list(zip(outgoing, errors)), members)
+            self.session.commit()
+
+    def _record_outcomes(
+        self,
+        token: str,
+        closed: list[NotificationLog],
+        results: list[tuple[NotificationLog, str | None]],
+        members: dict[int, list[NotificationLog]],
+    ) -> None:
+        """Finish a sent slice: successes, retries and dead letters in a few bulk statements."""
+        sent = list(closed)
+        failed: list[tuple[NotificationLog, str]] = []
+        audits = []
+        for log, error in results:
+            if error is None:
+                sent.append(log)
+                audits.append(_delivery_audit(log, NotificationStatus.SENT, members=members.get(log.id, ())))
+            else:
+                failed.append((log, error))
+
+        finished_at = datetime.now(timezone.utc)
+        self.repo.finish_claimed(
+            [log.id for log in sent], token=token, status=NotificationStatus.SENT, now=finished_at
+        )
+        self.repo.finish_digest_members(
+            _member_ids(sent, members), status=NotificationStatus.SENT, now=finished_at
+        )
+        retries: list[tuple[int, str, datetime]] = []
+        dead: dict[str, list[NotificationLog]] = defaultdict(list)
+        for log, error in failed:
+            status, retry_at = self._next_attempt(log.retry_count + 1, finished_at)
+            if status == NotificationStatus.DEAD_LETTER:
+                dead[error].append(log)
+            else:
+                retries.append((log.id, error, retry_at))
+            audits.append(_delivery_audit(log, status, error, members=members.get(log.id, ())))
+        self.repo.reschedule_claimed(retries, token=token)
+        for error, group in dead.items():
+            self.repo.finish_claimed(
+                [log.id for log in group],
+                token=token,
+                status=NotificationStatus.DEAD_LETTER,
+                now=finished_at,
+                error=error,
+            )
+            self.repo.finish_digest_members(
+                _member_ids(group, members), status=NotificationStatus.DEAD_LETTER, now=finished_at, error=error
+            )
+        self.audit.record_many(audits)
+
+
+def retry_delay(failures: int, *, base_seconds: float, max_seconds: float) -> float:
+    """Backoff before retry number ``failures``: ``base * 2**(failures - 1)``, capped, with equal jitter."""
+    delay = min(max_seconds, base_seconds * 2 ** (failures - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def channel_bucket(channel: NotificationChannel, settings) -> TokenBucket | None:
+    """Process-wide token bucket of ``channel``, or None when it is not rate limited."""
+    rate = getattr(settings, f"notification_rate_limit_{channel.value}", 0.0)
+    if not rate or rate <= 0:
+        return None
+    return _token_bucket(channel, float(rate), settings.notification_rate_burst)
+
+
+@lru_cache
+def _token_bucket(channel: NotificationChannel, rate: float, burst: int) -> TokenBucket:
+    return TokenBucket(rate, burst)
+
+
+def _context(log: NotificationLog) -> NotificationContext:
+    return NotificationContext(
+        channel=log.channel,
+        event=log.event,
+        user_id=log.user_id,
+        activity_id=log.activity_id,
+        signup_id=log.signup_id,
+        payload=log.payload,
+    )
+
+
+def _digest_context(digest: NotificationLog, members: list[NotificationLog]) -> NotificationContext:
+    return NotificationContext(
+        channel=digest.channel,
+        event=digest.event,
+        user_id=members[0].user_id,
+        activity_id=None,
+        signup_id=None,
+        payload={
+            "count": len(members),
+            "items": [
+                {
+                    "id": member.id,
+                    "event": member.event.value,
+                    "activity_id": member.activity_id,
+                    "signup_id": member.signup_id,
+                    "payload": member.payload,
+                }
+                for member in members
+            ],
+        },
+    )
+
+
+def _member_ids(digests: list[NotificationLog], members: dict[int, list[NotificationLog]]) -> list[int]:
+    return [member.id for digest in digests for member in members.get(digest.id, ())]
+
+
+def _delivery_audit(
+    log: NotificationLog,
+    status: NotificationStatus,
+    error: str | None = None,
+    *,
+    members: Sequence[NotificationLog] = (),
+) -> dict:
+    context = {"channel": log.channel.value, "event": log.event.value, "status": status.value}
+    if error is not None:
+        context["error"] = error
+    if members:
+        # one row covers the whole digest
+        context["notification_ids"] = [member.id for member in members]
+    return {
+        "action": AuditAction.NOTIFICATION_SENT,
+        "entity_type": AuditEntity.NOTIFICATION,
+        "entity_id": log.id,
+        "actor_admin_id": None,
+        "actor_user_id": members[0].user_id if members else log.user_id,
+        "context": context,
+    }
+
+
+def _signal_deferred_delivery(session: Session) -> None:
+    if session.info.pop(_DEFERRED_ENQUEUED, False):
+        delivery_requested.set()
+
+
+def _discard_deferred_signal(session: Session) -> None:
+    session.info.pop(_DEFERRED_ENQUEUED, None)
+
+
+event.listen(Session, "after_commit", _signal_deferred_delivery)
+event.listen(Session, "after_rollback", _discard_deferred_signal)
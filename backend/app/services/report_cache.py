@@ -0,0 +1,207 @@
+"""In-process result cache for report endpoints.
+
+Entries are keyed by ``(endpoint, activity_id, days)`` and live for
+``report_cache_ttl_seconds``.  Write paths call ``invalidate_reports`` after
+committing so dashboards see their own changes immediately.  With
+``report_cache_stale_seconds`` > 0 an expired (or invalidated) entry is still
+served for that grace period while a single background refresh recomputes it,
+so a slow recompute never blocks concurrent callers.  A key that has never been
+computed is filled by one caller while the others wait for that result instead
+of recomputing it themselves.
+
+At most ``report_cache_max_entries`` entries are kept; past that the least
+recently used one is evicted.  Entries past their stale grace period are
+dropped, with their fill locks, by a sweep that runs at most once per TTL.
+
+The cache is per process; with several workers each keeps its own copy and
+invalidations only reach the worker that handled the write, so keep the TTL short.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable
+
+from app.core.config import get_settings
+
+CacheKey = tuple[str, int | None, Any]
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expires_at: float
+    stale_until: float
+    generation: int
+
+
+class ReportCache:
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float,
+        stale_seconds: float = 0,
+        max_entries: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_entries = max(1, max_entries)
+        self._clock = clock
+        self._next_sweep = 0.0
+        self._entries: OrderedDict[CacheKey, _Entry] = OrderedDict()
+        self._generations: dict[CacheKey, int] = {}
+        self._locks: dict[CacheKey, threading.Lock] = {}
+        self._refreshing: set[CacheKey] = set()
+        self._mutex = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stale_hits": 0, "refreshes": 0, "invalidations": 0, "evictions": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def get_or_compute(
+        self,
+        key: CacheKey,
+        compute: Callable[[], Any],
+        *,
+        refresh: Callable[[], Any] | None = None,
+    ) -> Any:
+        """Return the cached value for ``key`` or compute it.
+
+        ``refresh`` is used for background revalidation and must not depend on
+        request-scoped resources (e.g. it should open its own DB session).
+        """
+        if not self.enabled:
+            return compute()
+        now = self._clock()
+        with self._mutex:
+            entry = self._entries.get(key)
+            if entry:
+                self._entries.move_to_end(key)
+            if entry and now < entry.expires_at:
+                self._stats["hits"] += 1
+                return entry.value
+            if entry and refresh is not None and self.stale_seconds > 0 and now < entry.stale_until:
+                self._stats["stale_hits"] += 1
+                self._start_refresh(key, refresh)
+                return entry.value
+            lock = self._locks.setdefault(key, threading.Lock())
+
+        with lock:
+            # another caller may have filled the key while we waited
+            with self._mutex:
+                entry = self._entries.get(key)
+                if entry and self._clock() < entry.expires_at:
+                    self._stats["hits"] += 1
+                    return entry.value
+                self._stats["misses"] += 1
+                generation = self._generations.get(key, 0)
+            value = compute()
+            self._store(key, value, generation)
+            return value
+
+    def invalidate(self, *, activity_id: int | None = None) -> None:
+        """Expire overview entries and, if given, the entries of ``activity_id`` (all entries otherwise)."""
+        now = self._clock()
+        with self._mutex:
+            self._stats["invalidations"] += 1
+            for key, entry in self._entries.items():
+                key_activity_id = key[1]
+                if activity_id is None or key_activity_id is None or key_activity_id == activity_id:
+                    entry.expires_at = min(entry.expires_at, now)
+                    self._generations[key] = self._generations.get(key, 0) + 1
+
+    def clear(self) -> None:
+        with self._mutex:
+            self._entries.clear()
+            self._generations.clear()
+            self._locks.clear()
+            self._refreshing.clear()
+            for name in self._stats:
+                self._stats[name] = 0
+
+    def stats(self) -> dict[str, int | float]:
+        with self._mutex:
+            lookups = self._stats["hits"] + self._stats["stale_hits"] + self._stats["misses"]
+            served = self._stats["hits"] + self._stats["stale_hits"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "hit_rate": round(served / lookups, 4) if lookups else 0.0,
+            }
+
+    def _store(self, key: CacheKey, value: Any, generation: int) -> None:
+        now = self._clock()
+        with self._mutex:
+            if self._generations.get(key, 0) != generation:
+                # invalidated while computing: keep it only as a stale fallback
+                expires_at = now
+            else:
+                expires_at = now + self.ttl_seconds
+            self._entries[key] = _Entry(
+                value=value,
+                expires_at=expires_at,
+                stale_until=now + self.ttl_seconds + self.stale_seconds,
+                generation=generation,
+            )
+            self._entries.move_to_end(key)
+            if now >= self._next_sweep:
+                self._sweep(now)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def _sweep(self, now: float) -> None:
+        # caller holds self._mutex
+        self._next_sweep = now + self.ttl_seconds
+        for key in [key for key, entry in self._entries.items() if now >= entry.stale_until]:
+            self._drop(key)
+        for key in [key for key, lock in self._locks.items() if key not in self._entries and not lock.locked()]:
+            del self._locks[key]
+
+    def _drop(self, key: CacheKey) -> None:
+        # caller holds self._mutex; a refresh still running for the key simply stores a new entry
+        self._entries.pop(key, None)
+        self._generations.pop(key, None)
+        self._locks.pop(key, None)
+
+    def _start_refresh(self, key: CacheKey, refresh: Callable[[], Any]) -> None:
+        # caller holds self._mutex
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        self._stats["refreshes"] += 1
+        generation = self._generations.get(key, 0)
+
+        def run() -> None:
+            try:
+                value = refresh()
+            except Exception:  # pragma: no cover - keep serving the stale value
+                pass
+            else:
+                self._store(key, value, generation)
+            finally:
+                with self._mutex:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, name=f"report-cache-refresh-{key[0]}", daemon=True).start()
+
+
+@lru_cache
+def get_report_cache() -> ReportCache:
+    settings = get_settings()
+    return ReportCache(
+        ttl_seconds=settings.report_cache_ttl_seconds,
+        stale_seconds=settings.report_cache_stale_seconds,
+        max_entries=settings.report_cache_max_entries,
+    )
+
+
+def invalidate_reports(activity_id: int | None = None) -> None:
+    """Invalidation hook for write paths that change report metrics."""
+    get_report_cache().invalidate(activity_id=activity_id)
@@ -0,0 +1,212 @@
+"""Incremental maintenance of the ``activity_daily_metrics`` rollup table.
+
+Importing this module installs ``before_flush``/``after_flush`` listeners on
+the application's ``SessionLocal`` factory (``track_daily_metrics`` installs
+them on other factories): every flush that inserts, updates or deletes a
+signup, feedback or engagement row turns the change into per-(activity, day)
+counter deltas and applies them with an atomic upsert on the same connection,
+so the rollup commits or rolls back together with the change that caused it.
+Flushes that touch none of those rows return straight away.  Rows changed with
+bulk SQL statements or through untracked sessions bypass the listeners; use
+``rebuild_daily_metrics`` (or ``scripts/rebuild_daily_metrics.py``) to
+backfill or repair the table.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, datetime, time, timezone
+from typing import Sequence
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.activity import Activity
+from app.repositories.daily_metrics import METRIC_COLUMNS, DailyMetricsRepository, apply_metric_deltas
+from app.services.report_timeseries import (
+    METRIC_SOURCES,
+    bucket_key,
+    bucket_start,
+    count_by_activity_day,
+    empty_buckets,
+    series_window,
+)
+
+_PENDING_KEY = "activity_daily_metric_deltas"
+
+# model -> [(metric, timestamp attribute)]
+_TRACKED: dict[type, list[tuple[str, str]]] = defaultdict(list)
+for _metric, (_model, _column) in METRIC_SOURCES.items():
+    _TRACKED[_model].append((_metric, _column.key))
+
+
+def _to_day(value: datetime | None) -> date | None:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.date()
+    return value.astimezone(timezone.utc).date()
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def _previous_value(session: Session, obj, attr: str):
+    """Value of ``attr`` as currently stored, used when the old value was never loaded."""
+    model = type(obj)
+    return session.execute(
+        select(getattr(model, attr)).where(model.id == inspect(obj).identity[0])
+    ).scalar_one_or_none()
+
+
+def _touches_tracked(objects) -> bool:
+    return any(type(obj) in _TRACKED for obj in objects)
+
+
+def _collect_before_flush(session: Session, flush_context, instances) -> None:
+    if not (
+        _touches_tracked(session.new) or _touches_tracked(session.dirty) or _touches_tracked(session.deleted)
+    ):
+        session.info.pop(_PENDING_KEY, None)
+        return
+    deltas: dict[tuple[int, date], dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    skipped: set[int] = {obj.id for obj in session.deleted if isinstance(obj, Activity) and obj.id is not None}
+
+    for obj in session.deleted:
+        for metric, attr in _TRACKED.get(type(obj), ()):
+            day = _to_day(getattr(obj, attr))
+            if day is not None:
+                deltas[(obj.activity_id, day)][metric] -= 1
+
+    for obj in session.dirty:
+        tracked = _TRACKED.get(type(obj))
+        if not tracked or not session.is_modified(obj):
+            continue
+        state = inspect(obj)
+        activity_history = state.attrs.activity_id.history
+        old_activity_id = (
+            activity_history.deleted[0] if activity_history.deleted else obj.activity_id
+        )
+        new_activity_id = obj.activity_id
+        for metric, attr in tracked:
+            history = state.attrs[attr].history
+            if not history.added and not activity_history.added:
+                continue
+            new_day = _to_day(getattr(obj, attr))
+            if history.deleted:
+                old_day = _to_day(history.deleted[0])
+            elif history.added:
+                old_day = _to_day(_previous_value(session, obj, attr))
+            else:
+                old_day = new_day
+            if (old_activity_id, old_day) == (new_activity_id, new_day):
+                continue
+            if old_day is not None and old_activity_id is not None:
+                deltas[(old_activity_id, old_day)][metric] -= 1
+            if new_day is not None and new_activity_id is not None:
+                deltas[(new_activity_id, new_day)][metric] += 1
+
+    session.info[_PENDING_KEY] = (deltas, skipped)
+
+
+def _apply_after_flush(session: Session, flush_context) -> None:
+    pending_state = session.info.pop(_PENDING_KEY, None)
+    if pending_state is None and not _touches_tracked(session.new):
+        return
+    deltas, skipped = pending_state or (defaultdict(lambda: defaultdict(int)), set())
+    for obj in session.new:
+        tracked = _TRACKED.get(type(obj))
+        if not tracked:
+            continue
+        values = inspect(obj).dict
+        activity_id = values.get("activity_id")
+        if activity_id is None:
+            continue
+        for metric, attr in tracked:
+            if attr == "created_at":
+                # server default: the row was stamped with the database clock just now
+                day = _to_day(values.get(attr)) or _today()
+            else:
+                day = _to_day(values.get(attr))
+            if day is not None:
+                deltas[(activity_id, day)][metric] += 1
+
+    pending = {key: metrics for key, metrics in deltas.items() if key[0] not in skipped}
+    if pending:
+        apply_metric_deltas(session.connection(), pending)
+
+
+def track_daily_metrics(target) -> None:
+    """Keep the rollup in step with flushes of sessions created by ``target`` (a ``sessionmaker``)."""
+    if not event.contains(target, "before_flush", _collect_before_flush):
+        event.listen(target, "before_flush", _collect_before_flush)
+        event.listen(target, "after_flush", _apply_after_flush)
+
+
+track_daily_metrics(SessionLocal)
+
+
+def rebuild_daily_metrics(session: Session, *, activity_id: int | None = None) -> int:
+    """Recompute rollup rows from the raw event tables; returns the number of rows written."""
+    repo = DailyMetricsRepository(session)
+    repo.delete_for(activity_id=activity_id)
+    totals: dict[tuple[int, date], dict[str, int]] = defaultdict(lambda: {name: 0 for name in METRIC_COLUMNS})
+    for metric, (model, column) in METRIC_SOURCES.items():
+        for key, count in count_by_activity_day(session, model, column, activity_id=activity_id).items():
+            totals[key][metric] += count
+    rows = [
+        {"activity_id": row_activity_id, "metric_date": metric_date, **metrics}
+        for (row_activity_id, metric_date), metrics in sorted(totals.items())
+    ]
+    repo.bulk_insert(rows)
+    session.flush()
+    return len(rows)
+
+
+def _fold_rollup_rows(buckets: dict[str, dict[str, int]], rows: dict[date, dict[str, int]], granularity: str) -> list[dict]:
+    for metric_date, metrics in rows.items():
+        key = bucket_key(bucket_start(datetime.combine(metric_date, time.min), granularity), granularity)
+        if key in buckets:
+            for name, value in metrics.items():
+                buckets[key][name] += value
+    return [{"date": key, **metrics} for key, metrics in sorted(buckets.items())]
+
+
+def rollup_series(
+    session: Session,
+    *,
+    days: int,
+    activity_id: int | None = None,
+    granularity: str = "day",
+) -> list[dict]:
+    """Same output as ``report_timeseries.time_series`` for UTC day/week/month buckets, read from the rollup table."""
+    if granularity == "hour":
+        raise ValueError("rollups_have_daily_resolution")
+    start_date, end_date = series_window(days)
+    rows = DailyMetricsRepository(session).series(start_date=start_date, end_date=end_date, activity_id=activity_id)
+    return _fold_rollup_rows(empty_buckets(start_date, end_date, granularity), rows, granularity)
+
+
+def rollup_series_by_activity(
+    session: Session,
+    *,
+    activity_ids: Sequence[int],
+    days: int,
+    granularity: str = "day",
+) -> dict[int, list[dict]]:
+    """``rollup_series`` for several activities from a single rollup-table read."""
+    if granularity == "hour":
+        raise ValueError("rollups_have_daily_resolution")
+    start_date, end_date = series_window(days)
+    rows = DailyMetricsRepository(session).series_by_activity(
+        activity_ids=activity_ids, start_date=start_date, end_date=end_date
+    )
+    per_activity: dict[int, dict[date, dict[str, int]]] = {activity_id: {} for activity_id in activity_ids}
+    for (activity_id, metric_date), metrics in rows.items():
+        per_activity[activity_id][metric_date] = metrics
+    return {
+        activity_id: _fold_rollup_rows(empty_buckets(start_date, end_date, granularity), activity_rows, granularity)
+        for activity_id, activity_rows in per_activity.items()
+    }
@@ -0,0 +1,66 @@
+"""Vectorised summary statistics for report latency distributions.
+
+NumPy is used when it is installed; otherwise a pure-Python implementation with
+the same linear interpolation (NumPy's default ``percentile`` method) is used,
+so results do not depend on which path ran.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Iterable, Sequence
+
+PERCENTILES: tuple[int, ...] = (50, 90, 99)
+
+
+def _numpy():
+    try:
+        import numpy  # type: ignore
+
+        return numpy
+    except Exception:
+        return None
+
+
+def percentiles(values: Sequence[float], points: Iterable[float] = PERCENTILES) -> dict[str, float | None]:
+    """Return ``{"p50": ..., ...}`` for ``values`` (``None`` when empty)."""
+    points = tuple(points)
+    if len(values) == 0:
+        return {f"p{point:g}": None for point in points}
+    np = _numpy()
+    if np is not None:
+        computed = np.percentile(np.asarray(values, dtype=float), points)
+        return {f"p{point:g}": float(value) for point, value in zip(points, computed)}
+    ordered = sorted(values)
+    return {f"p{point:g}": _interpolate(ordered, point) for point in points}
+
+
+def _interpolate(ordered: Sequence[float], point: float) -> float:
+    rank = (len(ordered) - 1) * point / 100
+    lower = math.floor(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    weight = rank - lower
+    return float(ordered[lower] + (ordered[upper] - ordered[lower]) * weight)
+
+
+def latency_summary(seconds: Sequence[float]) -> dict[str, float | int | None]:
+    """Count, mean, min/max and percentiles of a latency sample in seconds."""
+    np = _numpy()
+    if len(seconds) == 0:
+        return {"count": 0, "mean": None, "min": None, "max": None, **percentiles(())}
+    if np is not None:
+        array = np.asarray(seconds, dtype=float)
+        summary = {
+            "count": int(array.size),
+            "mean": float(array.mean()),
+            "min": float(array.min()),
+            "max": float(array.max()),
+        }
+        return {**summary, **percentiles(array)}
+    return {
+        "count": len(seconds),
+        "mean": math.fsum(seconds) / len(seconds),
+        "min": float(min(seconds)),
+        "max": float(max(seconds)),
+        **percentiles(seconds),
+    }
@@ -0,0 +1,351 @@
+"""Database-side time-series bucketing used by reporting services.
+
+Events are counted per bucket (hour, day, week or month) with ``GROUP BY`` in
+the database, restricted to the requested window, so a report never loads raw
+rows into Python.  Buckets are computed in a report time zone by shifting the
+stored UTC timestamps by that zone's UTC offset before truncating them.  The
+offset is taken at the end of the window, so for zones that observe DST events
+within an hour of a transition may land in the neighbouring bucket.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Sequence
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import Date, cast, func, select, text
+from sqlalchemy.orm import Session
+
+from app.models.activity_engagement import ActivityComment, ActivityFavorite, ActivityLike, ActivityShare
+from app.models.activity_feedback import ActivityFeedback
+from app.models.signup import Signup
+
+SERIES_METRICS: tuple[str, ...] = (
+    "signups",
+    "approvals",
+    "checkins",
+    "feedbacks",
+    "favorites",
+    "likes",
+    "shares",
+    "comments",
+)
+
+GRANULARITIES: tuple[str, ...] = ("hour", "day", "week", "month")
+
+_LABEL_FORMATS = {
+    "hour": "%Y-%m-%d %H:00",
+    "day": "%Y-%m-%d",
+    "week": "%Y-%m-%d",
+    "month": "%Y-%m",
+}
+
+# hour buckets are meant for a check-in day or week, not for year-long windows
+MAX_HOURLY_DAYS = 31
+
+# metric -> (model, timestamp column) counted into that metric
+METRIC_SOURCES = {
+    "signups": (Signup, Signup.created_at),
+    "approvals": (Signup, Signup.approved_at),
+    "checkins": (Signup, Signup.checkin_time),
+    "feedbacks": (ActivityFeedback, ActivityFeedback.created_at),
+    "favorites": (ActivityFavorite, ActivityFavorite.created_at),
+    "likes": (ActivityLike, ActivityLike.created_at),
+    "shares": (ActivityShare, ActivityShare.created_at),
+    "comments": (ActivityComment, ActivityComment.created_at),
+}
+
+
+def validate_series_params(*, days: int, granularity: str, tz: str | None) -> int:
+    """Check series parameters and return the UTC offset of ``tz`` in minutes.
+
+    Raises ``ValueError`` for an unknown granularity or time zone, or an hourly
+    window longer than ``MAX_HOURLY_DAYS``.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"invalid_granularity:{granularity}")
+    if granularity == "hour" and days > MAX_HOURLY_DAYS:
+        raise ValueError(f"hourly_series_limited_to_{MAX_HOURLY_DAYS}_days")
+    return utc_offset_minutes(tz)
+
+
+def utc_offset_minutes(tz: str | None, *, at: datetime | None = None) -> int:
+    if not tz or tz.upper() == "UTC":
+        return 0
+    try:
+        zone = ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError) as exc:
+        raise ValueError(f"invalid_timezone:{tz}") from exc
+    offset = (at or datetime.now(timezone.utc)).astimezone(zone).utcoffset() or timedelta(0)
+    return int(offset.total_seconds() // 60)
+
+
+def series_window(days: int, *, today: date | None = None, offset_minutes: int = 0) -> tuple[date, date]:
+    """Return the inclusive local ``[start_date, today]`` window covering ``days`` days."""
+    if today is None:
+        today = (datetime.now(timezone.utc) + timedelta(minutes=offset_minutes)).date()
+    return today - timedelta(days=days - 1), today
+
+
+def day_bucket(column, dialect_name: str):
+    """SQL expression truncating a timestamp column to its day."""
+    if dialect_name in {"sqlite", "mysql", "mariadb"}:
+        return func.date(column)
+    return cast(column, Date)
+
+
+def _shifted(column, dialect_name: str, offset_minutes: int):
+    if not offset_minutes:
+        return column
+    if dialect_name == "sqlite":
+        return func.datetime(column, f"{offset_minutes:+d} minutes")
+    if dialect_name in {"mysql", "mariadb"}:
+        return func.date_add(column, text(f"INTERVAL {int(offset_minutes)} MINUTE"))
+    return column + timedelta(minutes=offset_minutes)
+
+
+def bucket_expression(column, dialect_name: str, granularity: str, offset_minutes: int = 0):
+    """SQL expression mapping a UTC timestamp column to its local bucket."""
+    local = _shifted(column, dialect_name, offset_minutes)
+    if dialect_name == "sqlite":
+        return {
+            "hour": func.strftime("%Y-%m-%d %H:00", local),
+            "day": func.date(local),
+            # 'weekday 0' moves forward to Sunday, so step back to that week's Monday
+            "week": func.date(local, "weekday 0", "-6 days"),
+            "month": func.strftime("%Y-%m", local),
+        }[granularity]
+    if dialect_name in {"mysql", "mariadb"}:
+        return {
+            "hour": func.date_format(local, "%Y-%m-%d %H:00"),
+            "day": func.date(local),
+            "week": func.subdate(func.date(local), func.weekday(local)),
+            "month": func.date_format(local, "%Y-%m"),
+        }[granularity]
+    return func.date_trunc(granularity, local)
+
+
+def bucket_key(value, granularity: str = "day") -> str:
+    """Normalise a bucket value returned by the driver to the bucket label format."""
+    if isinstance(value, datetime):
+        return _label(value, granularity)
+    if isinstance(value, date):
+        return _label(datetime.combine(value, time.min), granularity)
+    text_value = str(value)
+    return text_value[:7] if granularity == "month" else text_value[: 16 if granularity == "hour" else 10]
+
+
+def bucket_start(value: datetime, granularity: str) -> datetime:
+    """Truncate a (local, naive) datetime to the start of its bucket."""
+    if granularity == "hour":
+        return value.replace(minute=0, second=0, microsecond=0)
+    day = value.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _label(value: datetime, granularity: str) -> str:
+    return value.strftime(_LABEL_FORMATS[granularity])
+
+
+def bucket_labels(start_date: date, end_date: date, granularity: str = "day") -> list[str]:
+    """All bucket labels overlapping the local ``[start_date, end_date]`` window, oldest first."""
+    current = bucket_start(datetime.combine(start_date, time.min), granularity)
+    end = datetime.combine(end_date + timedelta(days=1), time.min)
+    labels = []
+    while current < end:
+        labels.append(_label(current, granularity))
+        if granularity == "hour":
+            current += timedelta(hours=1)
+        elif granularity == "day":
+            current += timedelta(days=1)
+        elif granularity == "week":
+            current += timedelta(weeks=1)
+        else:
+            current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return labels
+
+
+def _utc_bounds(start_date: date, end_date: date, offset_minutes: int) -> tuple[datetime, datetime]:
+    local_tz = timezone(timedelta(minutes=offset_minutes))
+    start = datetime.combine(start_date, time.min, tzinfo=local_tz).astimezone(timezone.utc)
+    end = datetime.combine(end_date + timedelta(days=1), time.min, tzinfo=local_tz).astimezone(timezone.utc)
+    return start, end
+
+
+def count_by_bucket(
+    session: Session,
+    model,
+    column,
+    *,
+    start_date: date,
+    end_date: date,
+    granularity: str = "day",
+    offset_minutes: int = 0,
+    activity_id: int | None = None,
+) -> dict[str, int]:
+    """Count rows of ``model`` per local bucket of ``column`` within the local ``[start_date, end_date]``."""
+    start, end = _utc_bounds(start_date, end_date, offset_minutes)
+    bucket = bucket_expression(column, session.get_bind().dialect.name, granularity, offset_minutes)
+    query = (
+        select(bucket, func.count())
+        .select_from(model)
+        .where(column >= start, column < end)
+        .group_by(bucket)
+    )
+    if activity_id is not None:
+        query = query.where(model.activity_id == activity_id)
+    counts: dict[str, int] = {}
+    for value, count in session.execute(query).all():
+        if value is not None:
+            key = bucket_key(value, granularity)
+            counts[key] = counts.get(key, 0) + int(count)
+    return counts
+
+
+def count_by_activity_bucket(
+    session: Session,
+    model,
+    column,
+    *,
+    activity_ids: Sequence[int],
+    start_date: date,
+    end_date: date,
+    granularity: str = "day",
+    offset_minutes: int = 0,
+) -> dict[tuple[int, str], int]:
+    """Like ``count_by_bucket`` but grouped by ``(activity_id, bucket)`` for several activities."""
+    start, end = _utc_bounds(start_date, end_date, offset_minutes)
+    bucket = bucket_expression(column, session.get_bind().dialect.name, granularity, offset_minutes)
+    query = (
+        select(model.activity_id, bucket, func.count())
+        .select_from(model)
+        .where(model.activity_id.in_(list(activity_ids)), column >= start, column < end)
+        .group_by(model.activity_id, bucket)
+    )
+    counts: dict[tuple[int, str], int] = {}
+    for activity_id, value, count in session.execute(query).all():
+        if value is not None:
+            key = (activity_id, bucket_key(value, granularity))
+            counts[key] = counts.get(key, 0) + int(count)
+    return counts
+
+
+def count_by_day(
+    session: Session,
+    model,
+    column,
+    *,
+    start_date: date,
+    end_date: date,
+    activity_id: int | None = None,
+) -> dict[str, int]:
+    """Count rows of ``model`` per UTC day of ``column`` within ``[start_date, end_date]``."""
+    return count_by_bucket(
+        session, model, column, start_date=start_date, end_date=end_date, activity_id=activity_id
+    )
+
+
+def count_by_activity_day(
+    session: Session,
+    model,
+    column,
+    *,
+    activity_id: int | None = None,
+) -> dict[tuple[int, date], int]:
+    """Count all rows of ``model`` per (activity_id, day of ``column``); used to backfill rollups."""
+    bucket = day_bucket(column, session.get_bind().dialect.name)
+    query = (
+        select(model.activity_id, bucket, func.count())
+        .select_from(model)
+        .where(column.is_not(None))
+        .group_by(model.activity_id, bucket)
+    )
+    if activity_id is not None:
+        query = query.where(model.activity_id == activity_id)
+    return {
+        (row_activity_id, date.fromisoformat(bucket_key(day))): int(count)
+        for row_activity_id, day, count in session.execute(query).all()
+        if day is not None
+    }
+
+
+def empty_buckets(start_date: date, end_date: date, granularity: str = "day") -> dict[str, dict[str, int]]:
+    return {label: {metric: 0 for metric in SERIES_METRICS} for label in bucket_labels(start_date, end_date, granularity)}
+
+
+def time_series(
+    session: Session,
+    *,
+    days: int,
+    granularity: str = "day",
+    offset_minutes: int = 0,
+    activity_id: int | None = None,
+    today: date | None = None,
+) -> list[dict]:
+    """Build the metrics series for the last ``days`` local days in ``granularity`` buckets (oldest first)."""
+    start_date, end_date = series_window(days, today=today, offset_minutes=offset_minutes)
+    buckets = empty_buckets(start_date, end_date, granularity)
+    for metric, (model, column) in METRIC_SOURCES.items():
+        counts = count_by_bucket(
+            session,
+            model,
+            column,
+            start_date=start_date,
+            end_date=end_date,
+            granularity=granularity,
+            offset_minutes=offset_minutes,
+            activity_id=activity_id,
+        )
+        for key, count in counts.items():
+            if key in buckets:
+                buckets[key][metric] += count
+    return [{"date": key, **metrics} for key, metrics in sorted(buckets.items())]
+
+
+def time_series_by_activity(
+    session: Session,
+    *,
+    activity_ids: Sequence[int],
+    days: int,
+    granularity: str = "day",
+    offset_minutes: int = 0,
+    today: date | None = None,
+) -> dict[int, list[dict]]:
+    """``time_series`` for several activities with one grouped query per metric."""
+    start_date, end_date = series_window(days, today=today, offset_minutes=offset_minutes)
+    buckets = {activity_id: empty_buckets(start_date, end_date, granularity) for activity_id in activity_ids}
+    if activity_ids:
+        for metric, (model, column) in METRIC_SOURCES.items():
+            counts = count_by_activity_bucket(
+                session,
+                model,
+                column,
+                activity_ids=activity_ids,
+                start_date=start_date,
+                end_date=end_date,
+                granularity=granularity,
+                offset_minutes=offset_minutes,
+            )
+            for (activity_id, key), count in counts.items():
+                if key in buckets[activity_id]:
+                    buckets[activity_id][key][metric] += count
+    return {
+        activity_id: [{"date": key, **metrics} for key, metrics in sorted(activity_buckets.items())]
+        for activity_id, activity_buckets in buckets.items()
+    }
+
+
+def daily_series(
+    session: Session,
+    *,
+    days: int,
+    activity_id: int | None = None,
+    today: date | None = None,
+) -> list[dict]:
+    """Build the per-UTC-day metrics series for the last ``days`` days (oldest first)."""
+    return time_series(session, days=days, activity_id=activity_id, today=today)
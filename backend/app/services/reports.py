@@ -2,38 +2,65 @@
 
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
-from collections import defaultdict
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Sequence
 
 from sqlalchemy import select, func
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.repositories.signups import SignupRepository
 from app.repositories.feedbacks import ActivityFeedbackRepository
 from app.repositories.engagements import ActivityEngagementRepository
-from app.models.signup import Signup
-from app.models.activity_feedback import ActivityFeedback
-from app.models.activity_engagement import ActivityFavorite, ActivityLike, ActivityShare, ActivityComment
 from app.models.audit import AuditLog
+from app.models.signup import Signup
 from app.models.badge_rule import BadgeRule
-from app.models.enums import AuditAction, AuditEntity
+from app.models.enums import AuditAction, AuditEntity, CheckinStatus, SignupStatus
+from app.core.config import get_settings
+from app.services.report_cache import get_report_cache
+from app.services.report_engagers import unique_engagers
+from app.services.report_rollups import rollup_series, rollup_series_by_activity
+from app.services.report_stats import latency_summary
+from app.services.report_timeseries import series_window, time_series, time_series_by_activity, validate_series_params
 
 
 class ReportService:
-    def __init__(self, session: Session) -> None:
+    def __init__(self, session: Session, *, session_factory: sessionmaker | None = None) -> None:
         self.session = session
+        self.session_factory = session_factory or sessionmaker(bind=session.get_bind(), autoflush=False, future=True)
         self.signups = SignupRepository(session)
         self.feedbacks = ActivityFeedbackRepository(session)
         self.engagements = ActivityEngagementRepository(session)
+        self.settings = get_settings()
 
-    def overview(self, *, days: int | None = None) -> dict:
+    def overview(self, *, days: int | None = None, granularity: str = "day", tz: str | None = None) -> dict:
         since = None
         if days:
             since = datetime.now(timezone.utc) - timedelta(days=days)
-        counts = self.signups.overall_counts(since=since)
-        feedback = self.feedbacks.aggregate_overall(since=since)
-        engagement_counts = self.engagements.overall_counts()
+            offset_minutes = validate_series_params(days=days, granularity=granularity, tz=tz)
+
+        queries = {
+            "signups": lambda service: service.signups.overall_counts(since=since),
+            "feedbacks": lambda service: service.feedbacks.aggregate_overall(since=since),
+            "engagements": lambda service: service.engagements.overall_counts(),
+        }
+        if days and days > 0:
+            queries["time_series"] = lambda service: service._time_series(
+                days=days, granularity=granularity, offset_minutes=offset_minutes
+            )
+            queries["badge_rule_issuance"] = lambda service: service._badge_rule_issuance(since=since)
+
+        if self.settings.report_concurrent_enabled:
+            results, timings = self._run_concurrently(queries)
+        else:
+            results, timings = self._run_sequentially(queries)
+
+        counts = results["signups"]
+        feedback = results["feedbacks"]
+        engagement_counts = results["engagements"]
 
         approval_rate = _safe_ratio(counts["approved"], counts["total"])
         checkin_rate = _safe_ratio(counts["checked_in"], counts["total"])
@@ -51,122 +78,245 @@ class ReportService:
             "total_likes": engagement_counts["likes"],
             "total_shares": engagement_counts["shares"],
             "total_comments": engagement_counts["comments"],
+            "query_timings_ms": timings,
         }
 
         if days and days > 0:
-            data["time_series"] = self._time_series(days=days)
-            data["badge_rule_issuance"] = self._badge_rule_issuance(since=since)
+            data["time_series"] = results["time_series"]
+            data["granularity"] = granularity
+            data["timezone"] = tz or "UTC"
+            data["badge_rule_issuance"] = results["badge_rule_issuance"]
         return data
 
-    def activity_report(self, activity_id: int, *, days: int | None = None) -> dict:
+    def _run_sequentially(self, queries: dict) -> tuple[dict, dict[str, float]]:
+        results: dict = {}
+        timings: dict[str, float] = {}
+        for name, query in queries.items():
+            results[name], timings[name] = _timed(query, self)
+        return results, timings
+
+    def _run_concurrently(self, queries: dict) -> tuple[dict, dict[str, float]]:
+        """Fan the independent reads out over the shared pool, one short-lived session each."""
+        executor = _overview_executor(self.settings.report_concurrent_workers)
+        futures = {
+            name: executor.submit(self._in_new_session, lambda service, query=query: _timed(query, service))
+            for name, query in queries.items()
+        }
+        results: dict = {}
+        timings: dict[str, float] = {}
+        for name, future in futures.items():
+            results[name], timings[name] = future.result()
+        return results, timings
+
+    def cached_overview(self, *, days: int | None = None, granularity: str = "day", tz: str | None = None) -> dict:
+        options = {"days": days, "granularity": granularity, "tz": tz}
+        return get_report_cache().get_or_compute(
+            ("overview", None, (days, granularity, tz)),
+            lambda: self.overview(**options),
+            refresh=lambda: self._in_new_session(lambda service: service.overview(**options)),
+        )
+
+    def cached_activity_report(
+        self,
+        activity_id: int,
+        *,
+        days: int | None = None,
+        granularity: str = "day",
+        tz: str | None = None,
+    ) -> dict:
+        options = {"days": days, "granularity": granularity, "tz": tz}
+        return get_report_cache().get_or_compute(
+            ("activity", activity_id, (days, granularity, tz)),
+            lambda: self.activity_report(activity_id, **options),
+            refresh=lambda: self._in_new_session(lambda service: service.activity_report(activity_id, **options)),
+        )
+
+    def _in_new_session(self, func):
+        session = self.session_factory()
+        try:
+            return func(ReportService(session, session_factory=self.session_factory))
+        finally:
+            session.close()
+
+    def activity_report(
+        self,
+        activity_id: int,
+        *,
+        days: int | None = None,
+        granularity: str = "day",
+        tz: str | None = None,
+    ) -> dict:
         since = None
         if days:
             since = datetime.now(timezone.utc) - timedelta(days=days)
+            offset_minutes = validate_series_params(days=days, granularity=granularity, tz=tz)
 
-        # signups
-        activity_signups = self.session.execute(
-            select(Signup).where(Signup.activity_id == activity_id)
-        ).scalars().all()
-        total = len(activity_signups)
-        approved = sum(1 for s in activity_signups if s.status.name.lower() == "approved")
-        checked_in = sum(1 for s in activity_signups if s.checkin_time is not None)
+        data = _activity_report_data(
+            activity_id,
+            counts=self.signups.status_counts(activity_id=activity_id),
+            feedback_totals=self.feedbacks.aggregate_for_activity(activity_id),
+            engagement_summary=self.engagements.engagement_summary(activity_id),
+        )
 
-        # feedback and engagements
-        feedback_totals = self.feedbacks.aggregate_for_activity(activity_id)
-        engagement_summary = self.engagements.engagement_summary(activity_id)
+        if days and days > 0:
+            data["time_series"] = self._time_series(
+                days=days, activity_id=activity_id, granularity=granularity, offset_minutes=offset_minutes
+            )
+            data["granularity"] = granularity
+            data["timezone"] = tz or "UTC"
+        return data
 
-        data = {
+    def batch_activity_reports(
+        self,
+        activity_ids: Sequence[int],
+        *,
+        days: int | None = None,
+        granularity: str = "day",
+        tz: str | None = None,
+    ) -> list[dict]:
+        """``activity_report`` for several activities using a fixed number of grouped queries."""
+        activity_ids = list(dict.fromkeys(activity_ids))
+        if days:
+            offset_minutes = validate_series_params(days=days, granularity=granularity, tz=tz)
+        counts = self.signups.status_counts_by_activity(activity_ids)
+        feedback_totals = self.feedbacks.aggregate_by_activity(activity_ids)
+        engagement_summaries = self.engagements.engagement_summary_by_activity(activity_ids)
+        series = None
+        if days and days > 0:
+            series = self._time_series_by_activity(
+                activity_ids, days=days, granularity=granularity, offset_minutes=offset_minutes
+            )
+
+        reports = []
+        for activity_id in activity_ids:
+            data = _activity_report_data(
+                activity_id,
+                counts=counts[activity_id],
+                feedback_totals=feedback_totals[activity_id],
+                engagement_summary=engagement_summaries[activity_id],
+            )
+            if series is not None:
+                data["time_series"] = series[activity_id]
+                data["granularity"] = granularity
+                data["timezone"] = tz or "UTC"
+            reports.append(data)
+        return reports
+
+    def cached_batch_activity_reports(
+        self,
+        activity_ids: Sequence[int],
+        *,
+        days: int | None = None,
+        granularity: str = "day",
+        tz: str | None = None,
+    ) -> list[dict]:
+        options = {"days": days, "granularity": granularity, "tz": tz}
+        # one entry per set of ids, whatever the order or repeats in the request; large
+        # batches would mostly fill the cache with one-off keys, so they are not cached
+        ids = tuple(sorted(set(activity_ids)))
+        if len(ids) > self.settings.report_cache_batch_max_ids:
+            return self.batch_activity_reports(activity_ids, **options)
+        # keyed without an activity id so any report invalidation expires it
+        reports = get_report_cache().get_or_compute(
+            ("activity_batch", None, (ids, days, granularity, tz)),
+            lambda: self.batch_activity_reports(ids, **options),
+            refresh=lambda: self._in_new_session(lambda service: service.batch_activity_reports(ids, **options)),
+        )
+        by_id = {report["activity_id"]: report for report in reports}
+        return [by_id[activity_id] for activity_id in dict.fromkeys(activity_ids)]
+
+    def funnel_report(self, activity_id: int) -> dict:
+        """Signup → approved → checked-in → feedback funnel plus review latency percentiles."""
+        counts = self.signups.status_counts(activity_id=activity_id)
+        feedback_totals = self.feedbacks.aggregate_for_activity(activity_id)
+        stage_counts = [
+            ("signed_up", counts["total"]),
+            ("approved", counts["status"][SignupStatus.APPROVED]),
+            ("checked_in", counts["checkin"][CheckinStatus.CHECKED_IN]),
+            ("feedback", feedback_totals["total_feedbacks"]),
+        ]
+        stages = []
+        previous = counts["total"]
+        for stage, count in stage_counts:
+            stages.append(
+                {
+                    "stage": stage,
+                    "count": count,
+                    "rate_from_previous": _safe_ratio(count, previous),
+                    "rate_from_signup": _safe_ratio(count, counts["total"]),
+                }
+            )
+            previous = count
+        return {
             "activity_id": activity_id,
             "generated_at": datetime.now(timezone.utc).isoformat(),
-            "total_signups": total,
-            "approved_signups": approved,
-            "checked_in_signups": checked_in,
-            "average_rating": feedback_totals["average_rating"],
-            "total_feedbacks": feedback_totals["total_feedbacks"],
-            "total_favorites": engagement_summary["favorites"],
-            "total_likes": engagement_summary["likes"],
-            "total_shares": engagement_summary["shares"],
-            "total_comments": engagement_summary["comments"],
+            "stages": stages,
+            "approval_latency": latency_summary(self.signups.latency_seconds(Signup.approved_at, activity_id=activity_id)),
+            "review_latency": latency_summary(self.signups.latency_seconds(Signup.reviewed_at, activity_id=activity_id)),
         }
 
-        if days and days > 0:
-            data["time_series"] = self._time_series(days=days, activity_id=activity_id)
-        return data
+    def unique_engagers(
+        self,
+        *,
+        activity_id: int | None = None,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        days: int = 30,
+    ) -> dict:
+        """Approximate distinct users who engaged in ``[start_date, end_date]`` (defaults to the last ``days`` days)."""
+        if start_date is None or end_date is None:
+            default_start, default_end = series_window(days)
+            start_date = start_date or default_start
+            end_date = end_date or default_end
+        if start_date > end_date:
+            raise ValueError("start_date_after_end_date")
+        return unique_engagers(self.session, start_date=start_date, end_date=end_date, activity_id=activity_id)
 
-    def _time_series(self, *, days: int, activity_id: int | None = None) -> list[dict]:
-        def bucket_key(dt: datetime | None) -> str | None:
-            if not dt:
-                return None
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=timezone.utc)
-            return dt.astimezone(timezone.utc).strftime("%Y-%m-%d")
-
-        # Build buckets from since..today
-        today = datetime.now(timezone.utc).date()
-        # inclusive range: [today-(days-1), today]
-        start_date = (today - timedelta(days=days - 1))
-        buckets: dict[str, dict[str, int]] = {
-            (start_date + timedelta(days=i)).strftime("%Y-%m-%d"): {
-                "signups": 0,
-                "approvals": 0,
-                "checkins": 0,
-                "feedbacks": 0,
-                "favorites": 0,
-                "likes": 0,
-                "shares": 0,
-                "comments": 0,
-            }
-            for i in range(days)
-        }
+    def cached_funnel_report(self, activity_id: int) -> dict:
+        return get_report_cache().get_or_compute(
+            ("funnel", activity_id, None),
+            lambda: self.funnel_report(activity_id),
+            refresh=lambda: self._in_new_session(lambda service: service.funnel_report(activity_id)),
+        )
 
-        # Query and aggregate
-        signup_query = select(Signup)
-        if activity_id is not None:
-            signup_query = signup_query.where(Signup.activity_id == activity_id)
-        signups = self.session.execute(signup_query).scalars().all()
-        for s in signups:
-            k = bucket_key(s.created_at)
-            if k and k in buckets:
-                buckets[k]["signups"] += 1
-            k2 = bucket_key(s.approved_at)
-            if k2 and k2 in buckets:
-                buckets[k2]["approvals"] += 1
-            k3 = bucket_key(s.checkin_time)
-            if k3 and k3 in buckets:
-                buckets[k3]["checkins"] += 1
-
-        fb_query = select(ActivityFeedback)
-        if activity_id is not None:
-            fb_query = fb_query.where(ActivityFeedback.activity_id == activity_id)
-        fbs = self.session.execute(fb_query).scalars().all()
-        for f in fbs:
-            k = bucket_key(f.created_at)
-            if k and k in buckets:
-                buckets[k]["feedbacks"] += 1
-
-        def _agg(model, key: str):
-            q = select(model)
-            if activity_id is not None and hasattr(model, "activity_id"):
-                q = q.where(getattr(model, "activity_id") == activity_id)
-            rows = self.session.execute(q).scalars().all()
-            for r in rows:
-                k = bucket_key(getattr(r, "created_at", None))
-                if k and k in buckets:
-                    buckets[k][key] += 1
-
-        _agg(ActivityFavorite, "favorites")
-        _agg(ActivityLike, "likes")
-        _agg(ActivityShare, "shares")
-        _agg(ActivityComment, "comments")
-
-        # Convert to list in chronological order
-        return [
-            {
-                "date": date,
-                **metrics,
-            }
-            for date, metrics in sorted(buckets.items(), key=lambda item: item[0])
-        ]
+    def _time_series(
+        self,
+        *,
+        days: int,
+        activity_id: int | None = None,
+        granularity: str = "day",
+        offset_minutes: int = 0,
+    ) -> list[dict]:
+        # the rollup table holds UTC days, so it can only serve UTC day/week/month series
+        if self.settings.report_daily_metrics_enabled and granularity != "hour" and offset_minutes == 0:
+            return rollup_series(self.session, days=days, activity_id=activity_id, granularity=granularity)
+        return time_series(
+            self.session,
+            days=days,
+            activity_id=activity_id,
+            granularity=granularity,
+            offset_minutes=offset_minutes,
+        )
+
+    def _time_series_by_activity(
+        self,
+        activity_ids: Sequence[int],
+        *,
+        days: int,
+        granularity: str = "day",
+        offset_minutes: int = 0,
+    ) -> dict[int, list[dict]]:
+        if self.settings.report_daily_metrics_enabled and granularity != "hour" and offset_minutes == 0:
+            return rollup_series_by_activity(
+                self.session, activity_ids=activity_ids, days=days, granularity=granularity
+            )
+        return time_series_by_activity(
+            self.session,
+            activity_ids=activity_ids,
+            days=days,
+            granularity=granularity,
+            offset_minutes=offset_minutes,
+        )
 
     def _badge_rule_issuance(self, *, since: datetime) -> dict[str, int]:
         # Count audit logs of BADGE_RULE_TRIGGERED grouped by BadgeRule.rule_type
@@ -180,6 +330,40 @@ class ReportService:
         return {str(rule_type): count for rule_type, count in rows}
 
 
+def _activity_report_data(
+    activity_id: int,
+    *,
+    counts: dict,
+    feedback_totals: dict,
+    engagement_summary: dict,
+) -> dict:
+    return {
+        "activity_id": activity_id,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "total_signups": counts["total"],
+        "approved_signups": counts["status"][SignupStatus.APPROVED],
+        "checked_in_signups": counts["with_checkin_time"],
+        "average_rating": feedback_totals["average_rating"],
+        "total_feedbacks": feedback_totals["total_feedbacks"],
+        "total_favorites": engagement_summary["favorites"],
+        "total_likes": engagement_summary["likes"],
+        "total_shares": engagement_summary["shares"],
+        "total_comments": engagement_summary["comments"],
+    }
+
+
+@lru_cache
+def _overview_executor(max_workers: int) -> ThreadPoolExecutor:
+    # shared by all requests so the number of extra DB connections stays bounded
+    return ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="report-overview")
+
+
+def _timed(query, service: ReportService) -> tuple[object, float]:
+    started = time.perf_counter()
+    result = query(service)
+    return result, round((time.perf_counter() - started) * 1000, 3)
+
+
 def _safe_ratio(value: int, total: int) -> float:
     if total == 0:
         return 0.0
@@ -15,7 +15,9 @@ from sqlalchemy.orm import Session
 
 from app.models.enums import AuditAction, AuditEntity
 from app.services.audit import AuditLogService
+from app.services.export_jobs import ExportJobService
 from app.services.notifications import NotificationService
+from app.services.report_engagers import compact_engager_sketches
 
 
 TaskFunc = Callable[[], int | None]
@@ -57,6 +59,22 @@ class SchedulerService:
             func=lambda: notif.dispatch_pending(limit=100),
             interval_seconds=60,
         )
+        self.register(
+            name="engager_sketches_compact",
+            func=lambda: compact_engager_sketches(self.session),
+            interval_seconds=300,
+        )
+        export_jobs = ExportJobService(self.session)
+        self.register(
+            name="export_artifacts_cleanup",
+            func=lambda: export_jobs.cleanup_expired(),
+            interval_seconds=3600,
+        )
+        self.register(
+            name="export_jobs_recover",
+            func=lambda: export_jobs.recover_stale(),
+            interval_seconds=3600,
+        )
 
     def due_tasks(self, *, now: Optional[datetime] = None) -> list[ScheduledTask]:
         now = now or datetime.now(timezone.utc)
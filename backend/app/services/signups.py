@@ -17,6 +17,7 @@ from app.services.audit import AuditLogService
 from app.services.badge_rules import BadgeRuleService
 from app.services.badges import BadgeService
 from app.services.notifications import NotificationService
+from app.services.report_cache import invalidate_reports
 from app.services.signup_badge_helpers import auto_award_on_approval
 from app.services.signup_review_helpers import apply_review_decision, perform_bulk_review
 from app.services.signup_schema_helpers import build_activity_stats, build_recent_signups, build_signup_schema
@@ -81,6 +82,7 @@ class SignupService:
             event=NotificationEvent.SIGNUP_SUBMITTED,
         )
         self.session.commit()
+        invalidate_reports(payload.activity_id)
         self.session.refresh(signup)
         return build_signup_schema(signup)
 
@@ -100,6 +102,7 @@ class SignupService:
                 ],
             )
         self.session.commit()
+        invalidate_reports(signup.activity_id)
         self.session.refresh(signup)
         return build_signup_schema(signup)
 
@@ -107,12 +110,17 @@ class SignupService:
         signup = self.repo.get(signup_id)
         if not signup:
             return False
+        activity_id = signup.activity_id
         self.repo.delete(signup)
         self.session.commit()
+        invalidate_reports(activity_id)
         return True
 
     def bulk_delete(self, ids: list[int]) -> int:
-        return self.repo.delete_many(ids)
+        deleted = self.repo.delete_many(ids)
+        if deleted:
+            invalidate_reports()
+        return deleted
 
     def review(self, signup_id: int, admin: AdminUser, payload: SignupReviewRequest) -> Optional[SignupRead]:
         signup = self.repo.get(signup_id)
@@ -140,6 +148,7 @@ class SignupService:
             self._auto_award_on_approval(signup)
 
         self.session.commit()
+        invalidate_reports(signup.activity_id)
         self.session.refresh(signup)
         return build_signup_schema(signup)
 
@@ -168,7 +177,7 @@ class SignupService:
         return build_signup_schema(signup)
 
     def bulk_review(self, admin: AdminUser, payload: BulkReviewRequest) -> BulkReviewResult:
-        return perform_bulk_review(
+        result = perform_bulk_review(
             repo=self.repo,
             notifications=self.notifications,
             audit=self.audit,
@@ -177,6 +186,9 @@ class SignupService:
             admin=admin,
             payload=payload,
         )
+        if result.success:
+            invalidate_reports()
+        return result
 
     def checkin(self, signup_id: int, token: str, *, force: bool = False) -> Optional[SignupRead]:
         signup = self.repo.get(signup_id)
@@ -198,6 +210,7 @@ class SignupService:
         signup.checkin_time = datetime.now(timezone.utc)
         self.session.add(signup)
         self.session.commit()
+        invalidate_reports(signup.activity_id)
         self.session.refresh(signup)
         return build_signup_schema(signup)
 
@@ -0,0 +1,88 @@
+"""A small, mergeable HyperLogLog sketch for approximate distinct counts.
+
+With ``precision`` p the sketch keeps ``m = 2**p`` one-byte registers.  The
+standard error of the estimate is about ``1.04 / sqrt(m)``: 3.25 % for the
+default p=10 (1 KiB per sketch), so roughly 95 % of estimates fall within
+±6.5 % of the true count.  Small cardinalities (below ``2.5 * m``) use linear
+counting and are close to exact.  Merging two sketches (register-wise max) gives
+exactly the sketch of the union, so per-day sketches can be combined for any
+date range without double counting users active on several days.
+
+Values are hashed with BLAKE2b, which is stable across processes, so sketches
+persisted by different workers are compatible.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+from typing import Iterable
+
+DEFAULT_PRECISION = 10
+
+
+class HyperLogLog:
+    __slots__ = ("precision", "registers")
+
+    def __init__(self, precision: int = DEFAULT_PRECISION, registers: bytes | bytearray | None = None) -> None:
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.precision = precision
+        size = 1 << precision
+        if registers is None:
+            self.registers = bytearray(size)
+        else:
+            if len(registers) != size:
+                raise ValueError(f"expected {size} registers, got {len(registers)}")
+            self.registers = bytearray(registers)
+
+    @property
+    def size(self) -> int:
+        return len(self.registers)
+
+    @property
+    def standard_error(self) -> float:
+        return 1.04 / math.sqrt(self.size)
+
+    def add(self, value: object) -> bool:
+        """Add ``value``; returns True when a register changed (the sketch must be saved)."""
+        digest = hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).digest()
+        hashed = int.from_bytes(digest, "big")
+        index = hashed >> (64 - self.precision)
+        remaining_bits = 64 - self.precision
+        rest = hashed & ((1 << remaining_bits) - 1)
+        rank = remaining_bits - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            return True
+        return False
+
+    def update(self, values: Iterable[object]) -> bool:
+        changed = False
+        for value in values:
+            changed = self.add(value) or changed
+        return changed
+
+    def merge(self, other: HyperLogLog) -> HyperLogLog:
+        """Merge ``other`` into this sketch in place (union of the counted sets)."""
+        if other.precision != self.precision:
+            raise ValueError("cannot merge sketches with different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self) -> int:
+        m = self.size
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        estimate = alpha * m * m / math.fsum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # linear counting is more accurate for small cardinalities
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.registers)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, precision: int = DEFAULT_PRECISION) -> HyperLogLog:
+        return cls(precision, data)
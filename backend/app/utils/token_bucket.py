@@ -0,0 +1,50 @@
+"""A thread-safe token bucket for pacing calls to rate-limited providers.
+
+The bucket holds at most ``capacity`` tokens and refills at ``rate`` tokens per
+second; ``capacity`` is the burst allowed after an idle period.  ``acquire``
+blocks until at least one token is available and then takes up to the number
+requested, so callers can send whatever the bucket allows in one batch
+instead of one call per token.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable
+
+
+class TokenBucket:
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, count: int = 1) -> int:
+        """Wait until a token is available, then take up to ``count``; returns how many were taken."""
+        while True:
+            with self._lock:
+                self._refill(self._clock())
+                if self._tokens >= 1:
+                    taken = min(count, int(self._tokens))
+                    self._tokens -= taken
+                    return taken
+                wait = (1 - self._tokens) / self.rate
+            self._sleep(wait)
@@ -0,0 +1,33 @@
+"""Rebuild the activity_daily_metrics rollup table from raw event tables."""
+
+from __future__ import annotations
+
+import argparse
+
+from app.core.config import get_settings
+from app.db.session import SessionLocal
+from app.services.report_rollups import rebuild_daily_metrics
+
+settings = get_settings()
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--activity-id", type=int, default=None, help="仅重建指定活动（默认全部）")
+    args = parser.parse_args(argv)
+
+    print(f"Using database: {settings.database_url}")
+    session = SessionLocal()
+    try:
+        written = rebuild_daily_metrics(session, activity_id=args.activity_id)
+        session.commit()
+        print(f"Rebuilt {written} daily metric rows.")
+    except Exception:  # pragma: no cover - manual script
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
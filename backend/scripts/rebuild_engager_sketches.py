@@ -0,0 +1,33 @@
+"""Rebuild the activity_engager_sketches table from signup and engagement tables."""
+
+from __future__ import annotations
+
+import argparse
+
+from app.core.config import get_settings
+from app.db.session import SessionLocal
+from app.services.report_engagers import rebuild_engager_sketches
+
+settings = get_settings()
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--activity-id", type=int, default=None, help="仅重建指定活动（默认全部）")
+    args = parser.parse_args(argv)
+
+    print(f"Using database: {settings.database_url}")
+    session = SessionLocal()
+    try:
+        written = rebuild_engager_sketches(session, activity_id=args.activity_id)
+        session.commit()
+        print(f"Rebuilt {written} engager sketches.")
+    except Exception:  # pragma: no cover - manual script
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
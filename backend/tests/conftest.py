@@ -11,6 +11,7 @@ if str(ROOT_DIR) not in sys.path:
 
 from app.db.base import Base
 from app.services.auth import AuthService
+from app.services.report_rollups import track_daily_metrics
 
 
 @pytest.fixture()
@@ -18,6 +19,7 @@ def session():
     engine = create_engine("sqlite:///:memory:", future=True)
     Base.metadata.create_all(engine)
     TestingSession = sessionmaker(bind=engine, autocommit=False, autoflush=False, future=True)
+    track_daily_metrics(TestingSession)
     session = TestingSession()
     try:
         yield session
@@ -32,3 +34,21 @@ def session():
 def admin_user(session):
     service = AuthService(session)
     return service.ensure_default_admin("admin", "Admin@123")
+
+
+@pytest.fixture()
+def query_counter(session):
+    """Collect the SQL statements executed on the session's engine."""
+    from sqlalchemy import event
+
+    statements: list[str] = []
+    engine = session.get_bind()
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
@@ -1,3 +1,5 @@
+import pytest
+
 from sqlalchemy import select
 
 from app.models.audit import AuditLog
@@ -27,3 +29,89 @@ def test_record_and_list_audit_logs(session):
 
     stored = session.execute(select(AuditLog)).scalars().one()
     assert stored.context == {"title": "测试活动"}
+
+
+def _record(service, entity_id):
+    service.record(action=AuditAction.TASK_RUN, entity_type=AuditEntity.ACTIVITY, entity_id=entity_id)
+
+
+def test_buffered_records_are_inserted_together_at_commit(session, query_counter, monkeypatch):
+    service = AuditLogService(session)
+    monkeypatch.setattr(service.settings, "audit_write_mode", "buffered")
+
+    query_counter.clear()
+    for entity_id in range(5):
+        _record(service, entity_id)
+    service.record_many([{"action": AuditAction.TASK_RUN, "entity_type": AuditEntity.ACTIVITY, "entity_id": 5}])
+    assert query_counter == []
+    session.commit()
+    assert [statement.split()[0] for statement in query_counter] == ["INSERT"]
+    assert session.execute(select(AuditLog.entity_id).order_by(AuditLog.id)).scalars().all() == list(range(6))
+
+    # records of a rolled back transaction are dropped with it
+    _record(service, 99)
+    session.rollback()
+    session.commit()
+    assert session.execute(select(AuditLog.entity_id).where(AuditLog.entity_id == 99)).first() is None
+
+
+@pytest.mark.parametrize("mode", ["buffered", "async"])
+def test_records_of_a_session_closed_without_commit_are_dropped(session, monkeypatch, mode):
+    from app.services import audit_writer
+
+    submitted = []
+
+    class FakeWriter:
+        def submit(self, payloads):
+            submitted.extend(payloads)
+
+    monkeypatch.setattr(audit_writer, "get_audit_writer", lambda: FakeWriter())
+    service = AuditLogService(session)
+    monkeypatch.setattr(service.settings, "audit_write_mode", mode)
+
+    _record(service, 1)
+    session.close()
+    # the same Session object is used again: its next commit must not write the abandoned record
+    session.commit()
+    assert session.execute(select(AuditLog.entity_id)).scalars().all() == []
+    assert submitted == []
+
+    _record(service, 2)
+    session.commit()
+    if mode == "buffered":
+        assert session.execute(select(AuditLog.entity_id)).scalars().all() == [2]
+    else:
+        assert [payload["entity_id"] for payload in submitted] == [2]
+
+
+def test_async_records_are_written_by_the_writer_after_commit(tmp_path, monkeypatch):
+    from sqlalchemy import create_engine, func
+    from sqlalchemy.orm import sessionmaker
+
+    from app.db.base import Base
+    from app.services import audit_writer
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'audit.db'}", future=True)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, autoflush=False, future=True)
+    # a tiny queue: producers have to wait for the writer instead of dropping records
+    writer = audit_writer.AuditWriter(factory, queue_size=2, batch_size=3)
+    monkeypatch.setattr(audit_writer, "get_audit_writer", lambda: writer)
+
+    session = factory()
+    try:
+        service = AuditLogService(session)
+        monkeypatch.setattr(service.settings, "audit_write_mode", "async")
+        _record(service, 0)
+        session.rollback()
+        for entity_id in range(1, 41):
+            _record(service, entity_id)
+        session.commit()
+        writer.close()
+
+        stored = session.execute(select(AuditLog.entity_id).order_by(AuditLog.id)).scalars().all()
+        assert stored == list(range(1, 41))
+        assert session.execute(select(func.count()).where(AuditLog.created_at.is_(None))).scalar_one() == 0
+    finally:
+        session.close()
+        engine.dispose()
@@ -0,0 +1,86 @@
+import csv
+import io
+import zipfile
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.models.activity import Activity
+from app.models.audit import AuditLog
+from app.models.enums import ActivityStatus, AuditAction, SignupStatus
+from app.models.signup import Signup
+from app.models.user import UserProfile
+from app.schemas.engagement import ActivityCommentCreate
+from app.services.engagements import ActivityEngagementService
+from app.services.export_bundles import ExportBundleService
+
+
+@pytest.fixture()
+def factory(tmp_path):
+    # entries are built on worker threads with their own sessions: use a file database
+    engine = create_engine(f"sqlite:///{tmp_path / 'bundles.db'}", future=True)
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine, autoflush=False, future=True)
+    engine.dispose()
+
+
+def seed_activities(session, count):
+    activities = []
+    for index in range(count):
+        activity = Activity(title=f"打包活动{index}", status=ActivityStatus.PUBLISHED)
+        session.add(activity)
+        session.flush()
+        for number in range(index + 1):
+            user = UserProfile(openid=f"bundle-{index}-{number}", name=f"打包用户{index}-{number}")
+            session.add_all([user, Signup(activity=activity, user=user, status=SignupStatus.PENDING)])
+            session.flush()
+            ActivityEngagementService(session).create_comment(
+                activity_id=activity.id, user_id=user.id, payload=ActivityCommentCreate(content=f"评论{number}")
+            )
+        activities.append(activity)
+    session.commit()
+    return activities
+
+
+def test_bundle_streams_one_entry_per_activity_and_kind(factory, monkeypatch):
+    session = factory()
+    try:
+        activities = seed_activities(session, 3)
+        service = ExportBundleService(session, session_factory=factory)
+        monkeypatch.setattr(service.settings, "export_bundle_workers", 2)
+        ids = [activity.id for activity in activities]
+
+        filename, stream = service.stream_bundle(ids, ["signups", "comments"], actor_admin_id=None)
+        blocks = list(stream)
+        assert filename.endswith(".zip")
+        assert len(blocks) > 1
+
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(blocks)))
+        assert archive.testzip() is None
+        expected = [f"activity_{activity_id}_{kind}.csv" for activity_id in ids for kind in ("signups", "comments")]
+        assert archive.namelist() == expected
+        for index, activity_id in enumerate(ids):
+            content = archive.read(f"activity_{activity_id}_signups.csv").decode("utf-8-sig")
+            assert len(list(csv.DictReader(io.StringIO(content)))) == index + 1
+
+        session.expire_all()
+        logs = session.execute(select(AuditLog)).scalars().all()
+        assert [log.action for log in logs] == [AuditAction.EXPORT_BUNDLE]
+        assert logs[0].context["activity_ids"] == ids
+    finally:
+        session.close()
+
+
+def test_bundle_rejects_unknown_kinds_and_missing_activities(factory):
+    session = factory()
+    try:
+        activities = seed_activities(session, 1)
+        service = ExportBundleService(session, session_factory=factory)
+        with pytest.raises(ValueError):
+            service.stream_bundle([activities[0].id], ["badges"])
+        assert service.stream_bundle([activities[0].id, 9999], ["signups"]) is None
+        assert session.execute(select(AuditLog)).scalars().all() == []
+    finally:
+        session.close()
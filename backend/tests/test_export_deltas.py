@@ -0,0 +1,155 @@
+import csv
+import io
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select, text
+
+from app.models.activity import Activity
+from app.models.enums import ActivityStatus, SignupStatus
+from app.models.export_tombstone import ExportTombstone
+from app.models.payment import Payment
+from app.models.signup import Signup
+from app.models.user import UserProfile
+from app.services.export_deltas import decode_cursor, delta_until, encode_cursor
+from app.services.exports import ExportService
+
+BASE = datetime(2026, 1, 1, 10, 0, 0)
+
+
+def read_delta(service, kind, **options):
+    filename, stream, cursor = service.stream_delta_export(kind, **options)
+    rows = list(csv.DictReader(io.StringIO(b"".join(stream).decode("utf-8-sig"))))
+    return rows, cursor
+
+
+def add_signup(session, activity, name, *, at):
+    signup = Signup(
+        activity=activity,
+        user=UserProfile(openid=f"delta-{name}", name=name),
+        status=SignupStatus.PENDING,
+        created_at=at,
+        updated_at=at,
+    )
+    session.add(signup)
+    session.flush()
+    return signup
+
+
+@pytest.fixture()
+def delta_service(session, monkeypatch):
+    service = ExportService(session)
+    monkeypatch.setattr(service.settings, "export_delta_settle_seconds", 0)
+    return service
+
+
+def test_delta_export_emits_changes_and_tombstones_since_cursor(session, delta_service):
+    activity = Activity(title="增量导出", status=ActivityStatus.PUBLISHED)
+    other = Activity(title="其他活动", status=ActivityStatus.PUBLISHED)
+    session.add_all([activity, other])
+    kept, changed, removed = (add_signup(session, activity, name, at=BASE) for name in ("kept", "changed", "removed"))
+    add_signup(session, other, "elsewhere", at=BASE)
+    session.commit()
+
+    rows, cursor = read_delta(delta_service, "signups", activity_id=activity.id, now=BASE + timedelta(seconds=10))
+    assert sorted(int(row["signup_id"]) for row in rows) == sorted([kept.id, changed.id, removed.id])
+    assert {row["op"] for row in rows} == {"upsert"}
+
+    later = BASE + timedelta(seconds=20)
+    changed.status = SignupStatus.APPROVED
+    changed.updated_at = later
+    removed_id = removed.id
+    session.delete(removed)
+    added = add_signup(session, activity, "added", at=later)
+    session.flush()
+    tombstone = session.execute(select(ExportTombstone)).scalar_one()
+    assert (tombstone.entity_type, tombstone.entity_id, tombstone.activity_id) == ("signup", removed_id, activity.id)
+    tombstone.deleted_at = later
+    session.commit()
+
+    rows, next_cursor = read_delta(
+        delta_service, "signups", activity_id=activity.id, cursor=cursor, now=BASE + timedelta(seconds=30)
+    )
+    by_id = {int(row["signup_id"]): row for row in rows}
+    assert set(by_id) == {changed.id, added.id, removed_id}
+    assert by_id[changed.id]["op"] == "upsert" and by_id[changed.id]["status"] == "approved"
+    assert by_id[removed_id]["op"] == "delete"
+    assert by_id[removed_id]["activity_id"] == str(activity.id)
+    assert by_id[removed_id]["updated_at"] == later.isoformat()
+
+    rows, _ = read_delta(
+        delta_service, "signups", activity_id=activity.id, cursor=next_cursor, now=BASE + timedelta(seconds=40)
+    )
+    assert rows == []
+
+
+def test_delta_export_accepts_since_and_covers_payments(session, delta_service):
+    activity = Activity(title="缴费活动", status=ActivityStatus.PUBLISHED)
+    user = UserProfile(openid="delta-payer", name="缴费用户")
+    session.add_all([activity, user])
+    session.flush()
+    for index, at in enumerate([BASE, BASE + timedelta(seconds=5)]):
+        session.add(
+            Payment(
+                user_id=user.id,
+                activity_id=activity.id,
+                activity_title=activity.title,
+                amount=10.0 * (index + 1),
+                order_no=f"ORDER-{index}",
+                created_at=at,
+                updated_at=at,
+            )
+        )
+    session.commit()
+
+    rows, cursor = read_delta(
+        delta_service,
+        "payments",
+        since=(BASE + timedelta(seconds=1)).replace(tzinfo=timezone.utc),
+        now=BASE + timedelta(seconds=10),
+    )
+    assert [row["order_no"] for row in rows] == ["ORDER-1"]
+    assert decode_cursor(cursor, kind="payments", activity_id=None) == BASE + timedelta(seconds=9)
+
+
+def test_delta_changed_ids_use_updated_at_index(session):
+    plan = session.execute(
+        text("EXPLAIN QUERY PLAN SELECT id FROM signups WHERE updated_at > :since AND updated_at <= :until"),
+        {"since": BASE, "until": BASE + timedelta(seconds=10)},
+    ).all()
+    assert any("ix_signups_updated_at" in str(row) for row in plan)
+
+
+def test_delta_cursor_validation(session, delta_service):
+    cursor = encode_cursor("signups", None, BASE)
+    assert decode_cursor(cursor, kind="signups", activity_id=None) == BASE
+    with pytest.raises(ValueError, match="export_cursor_mismatch"):
+        decode_cursor(cursor, kind="payments", activity_id=None)
+    with pytest.raises(ValueError, match="invalid_export_cursor"):
+        delta_service.stream_delta_export("signups", cursor="not-a-cursor")
+    with pytest.raises(ValueError, match="unknown_export_kind"):
+        delta_service.stream_delta_export("badges")
+
+
+def test_delta_until_leaves_the_current_second_for_the_next_pull():
+    now = datetime(2026, 1, 1, 10, 0, 7, 250000, tzinfo=timezone.utc)
+    assert delta_until(now=now) == datetime(2026, 1, 1, 10, 0, 6)
+    assert delta_until(now=now, settle_seconds=5) == datetime(2026, 1, 1, 10, 0, 1)
+
+
+def test_delta_rows_are_read_in_keyset_chunks(session, delta_service, query_counter):
+    activity = Activity(title="分块增量", status=ActivityStatus.PUBLISHED)
+    session.add(activity)
+    # several rows share each second, so chunks end in the middle of a timestamp
+    signups = [
+        add_signup(session, activity, f"chunk-{index}", at=BASE + timedelta(seconds=index // 3)) for index in range(10)
+    ]
+    signups[0].updated_at = BASE + timedelta(seconds=5)
+    session.commit()
+
+    query_counter.clear()
+    rows, _ = read_delta(delta_service, "signups", now=BASE + timedelta(seconds=10), chunk_size=4)
+    expected = sorted(signups, key=lambda signup: (signup.updated_at, signup.id))
+    assert [int(row["signup_id"]) for row in rows] == [signup.id for signup in expected]
+    # three chunks of changed rows, each its own bounded query
+    assert len([sql for sql in query_counter if "FROM signups" in sql and "LIMIT" in sql]) == 3
@@ -0,0 +1,207 @@
+import csv
+import io
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import select
+
+from app.models.activity import Activity
+from app.models.audit import AuditLog
+from app.models.enums import ActivityStatus, AuditAction, ExportJobStatus, SignupStatus
+from app.models.export_job import ExportJob
+from app.models.signup import Signup
+from app.models.user import UserProfile
+from app.services.export_jobs import ExportJobService
+from app.services.scheduler import SchedulerService
+
+
+class InlineExecutor:
+    def __init__(self, run: bool = True) -> None:
+        self.run = run
+        self.submitted: list = []
+
+    def submit(self, fn, *args):
+        self.submitted.append(args)
+        if self.run:
+            fn(*args)
+
+
+def create_activity(session, signups: int = 5) -> Activity:
+    activity = Activity(title="异步导出活动", status=ActivityStatus.PUBLISHED)
+    session.add(activity)
+    for index in range(signups):
+        user = UserProfile(openid=f"job-user-{index}", name=f"用户{index}")
+        session.add(Signup(activity=activity, user=user, status=SignupStatus.APPROVED))
+    session.flush()
+    return activity
+
+
+def job_service(session, monkeypatch, tmp_path, executor) -> ExportJobService:
+    service = ExportJobService(session, executor=executor)
+    monkeypatch.setattr(service.settings, "export_artifacts_dir", str(tmp_path))
+    return service
+
+
+def test_export_job_builds_artifact_with_progress(session, admin_user, monkeypatch, tmp_path):
+    activity = create_activity(session, signups=5)
+    service = job_service(session, monkeypatch, tmp_path, InlineExecutor())
+
+    job, created = service.submit(kind="signups", activity_id=activity.id, actor_admin_id=admin_user.id)
+    assert created is True
+
+    session.expire_all()
+    job = service.get(job.id)
+    assert job.status == ExportJobStatus.SUCCEEDED
+    assert job.total_rows == 5
+    assert job.processed_rows == 5
+    assert job.progress == 1.0
+    assert job.filename == f"activity_{activity.id}_signups.csv"
+    assert job.expires_at is not None
+
+    path = service.artifact_path(job)
+    assert path is not None and path.parent == tmp_path
+    assert not list(tmp_path.glob("*.part"))
+    rows = list(csv.reader(io.StringIO(path.read_bytes().decode("utf-8-sig"))))
+    assert len(rows) == 6
+    assert job.file_size == path.stat().st_size
+
+    audits = session.execute(select(AuditLog).where(AuditLog.action == AuditAction.EXPORT_SIGNUPS)).scalars().all()
+    assert len(audits) == 1
+
+
+def test_identical_recent_export_job_is_reused(session, admin_user, monkeypatch, tmp_path):
+    activity = create_activity(session, signups=2)
+    executor = InlineExecutor(run=False)
+    service = job_service(session, monkeypatch, tmp_path, executor)
+
+    first, created = service.submit(kind="signups", activity_id=activity.id, ids=[2, 1])
+    assert created is True and first.status == ExportJobStatus.PENDING
+    again, created_again = service.submit(kind="signups", activity_id=activity.id, ids=[1, 2, 2])
+    assert created_again is False
+    assert again.id == first.id
+    assert len(executor.submitted) == 1
+
+    other, created_other = service.submit(kind="signups", activity_id=activity.id, fmt="csv")
+    assert created_other is True and other.id != first.id
+
+    monkeypatch.setattr(service.settings, "export_job_reuse_seconds", 0)
+    _, created_without_reuse = service.submit(kind="signups", activity_id=activity.id, ids=[1, 2])
+    assert created_without_reuse is True
+
+
+def test_failed_export_job_records_error(session, monkeypatch, tmp_path):
+    activity = create_activity(session, signups=1)
+    service = job_service(session, monkeypatch, tmp_path, InlineExecutor())
+
+    def boom(*args, **kwargs):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr("app.services.exports.ExportService.write_export", boom)
+    job, _ = service.submit(kind="shares", activity_id=activity.id)
+
+    session.expire_all()
+    job = service.get(job.id)
+    assert job.status == ExportJobStatus.FAILED
+    assert job.error_message == "disk full"
+    assert service.artifact_path(job) is None
+    assert not list(tmp_path.iterdir())
+
+
+def test_expired_artifacts_are_cleaned_up(session, monkeypatch, tmp_path):
+    activity = create_activity(session, signups=1)
+    service = job_service(session, monkeypatch, tmp_path, InlineExecutor())
+    job, _ = service.submit(kind="comments", activity_id=activity.id)
+    session.expire_all()
+    job = service.get(job.id)
+    path = Path(job.file_path)
+    assert path.is_file()
+
+    assert service.cleanup_expired() == 0
+    assert service.cleanup_expired(now=datetime.now(timezone.utc) + timedelta(days=2)) == 1
+    assert job.status == ExportJobStatus.EXPIRED
+    assert job.file_path is None
+    assert not path.exists()
+    # an expired job is not reused
+    _, created = service.submit(kind="comments", activity_id=activity.id)
+    assert created is True
+
+
+def test_scheduler_registers_export_cleanup(session):
+    scheduler = SchedulerService(session)
+    scheduler.register_defaults()
+    assert any(task["task"] == "export_artifacts_cleanup" for task in scheduler.list_tasks())
+
+
+def test_export_job_for_missing_activity(session, monkeypatch, tmp_path):
+    service = job_service(session, monkeypatch, tmp_path, InlineExecutor())
+    assert service.submit(kind="signups", activity_id=9999) is None
+
+
+def test_stale_jobs_are_requeued_or_failed_and_not_reused(session, monkeypatch, tmp_path):
+    activity = create_activity(session, signups=2)
+    executor = InlineExecutor(run=False)
+    service = job_service(session, monkeypatch, tmp_path, executor)
+    pending, _ = service.submit(kind="signups", activity_id=activity.id)
+    running, _ = service.submit(kind="shares", activity_id=activity.id)
+    running.status = ExportJobStatus.RUNNING
+    session.commit()
+    (tmp_path / f"{running.id}.part").write_bytes(b"partial")
+
+    # a restart lost both jobs: nothing updates them any more
+    later = datetime.now(timezone.utc) + timedelta(seconds=service.settings.export_job_stale_seconds + 60)
+    assert service.recover_stale() == 0
+    assert service.recover_stale(now=later) == 2
+
+    session.expire_all()
+    assert service.get(running.id).status == ExportJobStatus.FAILED
+    assert service.get(running.id).error_message == "worker_lost"
+    assert not (tmp_path / f"{running.id}.part").exists()
+    assert service.get(pending.id).status == ExportJobStatus.PENDING
+    assert executor.submitted[-1] == (pending.id,)
+
+    # a stale pending job is not handed out again
+    monkeypatch.setattr(service.settings, "export_job_stale_seconds", 0)
+    again, created = service.submit(kind="signups", activity_id=activity.id)
+    assert created is True and again.id != pending.id
+
+
+def test_scheduled_cleanup_commits_expired_jobs(tmp_path, monkeypatch):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app.core.config import get_settings
+    from app.db.base import Base
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}", future=True)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, autoflush=False, future=True)
+    monkeypatch.setattr(get_settings(), "export_artifacts_dir", str(tmp_path))
+    session = factory()
+    try:
+        activity = create_activity(session, signups=1)
+        session.commit()
+        service = ExportJobService(session, session_factory=factory, executor=InlineExecutor())
+        job, _ = service.submit(kind="signups", activity_id=activity.id)
+        job_id = job.id
+        session.expire_all()
+        path = Path(service.get(job_id).file_path)
+        service.get(job_id).expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+        session.commit()
+
+        # only the cleanup is due, and nothing runs after it to commit on its behalf
+        scheduler = SchedulerService(session)
+        scheduler.register_defaults()
+        for name, task in scheduler._tasks.items():
+            task.enabled = name == "export_artifacts_cleanup"
+        assert [result["task"] for result in scheduler.run_due(max_tasks=1)] == ["export_artifacts_cleanup"]
+    finally:
+        session.close()
+
+    reader = factory()
+    try:
+        stored = reader.get(ExportJob, job_id)
+        assert (stored.status, stored.file_path) == (ExportJobStatus.EXPIRED, None)
+        assert not path.exists()
+    finally:
+        reader.close()
+        engine.dispose()
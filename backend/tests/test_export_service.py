@@ -2,12 +2,15 @@ from sqlalchemy import select
 
 from app.models.activity import Activity
 from app.models.audit import AuditLog
-from app.models.enums import ActivityStatus, AuditAction, AuditEntity, CheckinStatus, SignupStatus
-from app.models.signup import Signup
+from app.models.enums import ActivityStatus, AuditAction, AuditEntity, CheckinStatus, FieldType, SignupStatus
+from app.models.form_field import ActivityFormField
+from app.models.signup import Signup, SignupFieldAnswer
 from app.models.user import UserProfile
 import csv
 import io
 
+import pytest
+
 from app.services.exports import ExportService
 from app.services.engagements import ActivityEngagementService
 from app.services.feedbacks import ActivityFeedbackService
@@ -107,3 +110,242 @@ def test_activity_comments_and_shares_export(session, admin_user):
     assert shares_file is not None
     _, shares_bytes = shares_file
     assert "moments" in shares_bytes.decode("utf-8-sig")
+
+
+def test_streaming_exports_match_buffered_exports(tmp_path):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app.db.base import Base
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'exports.db'}", future=True)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, autoflush=False, future=True)
+    session = factory()
+    try:
+        activity = Activity(title="流式导出", status=ActivityStatus.PUBLISHED)
+        session.add(activity)
+        session.flush()
+        engagement_service = ActivityEngagementService(session)
+        for index in range(7):
+            user = UserProfile(openid=f"stream-user-{index}", name=f"流式用户{index}")
+            session.add_all([user, Signup(activity=activity, user=user, status=SignupStatus.PENDING)])
+            session.flush()
+            engagement_service.share(
+                activity_id=activity.id, user_id=user.id, payload=ActivityShareRequest(channel="wechat")
+            )
+            engagement_service.create_comment(
+                activity_id=activity.id, user_id=user.id, payload=ActivityCommentCreate(content=f"评论{index}")
+            )
+        session.commit()
+
+        service = ExportService(session, session_factory=factory)
+        cases = [
+            (service.activity_signups_export, service.stream_activity_signups_export),
+            (service.activity_shares_export, service.stream_activity_shares_export),
+            (service.activity_comments_export, service.stream_activity_comments_export),
+        ]
+        for buffered, streaming in cases:
+            _, expected = buffered(activity.id)
+            filename, stream = streaming(activity.id, chunk_size=3)
+            blocks = list(stream)
+            assert filename.endswith(".csv")
+            assert blocks[0].startswith(b"\xef\xbb\xbf")
+            # BOM + header, then ceil(7 / 3) row blocks
+            assert len(blocks) == 1 + 3
+            assert b"".join(blocks) == expected
+            rows = list(csv.DictReader(io.StringIO(expected.decode("utf-8-sig"))))
+            assert len(rows) == 7
+
+        assert service.stream_activity_signups_export(9999) is None
+        session.expire_all()
+        exports = session.execute(
+            select(AuditLog).where(AuditLog.action == AuditAction.EXPORT_SIGNUPS, AuditLog.entity_id == activity.id)
+        ).scalars().all()
+        assert len(exports) == 6
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def _signups_with_engagement(session, activity, count, offset=0):
+    engagement_service = ActivityEngagementService(session)
+    feedback_service = ActivityFeedbackService(session)
+    for index in range(offset, offset + count):
+        user = UserProfile(openid=f"batch-export-{index}", name=f"批量用户{index}")
+        signup = Signup(
+            activity=activity, user=user, status=SignupStatus.APPROVED, checkin_status=CheckinStatus.CHECKED_IN
+        )
+        session.add_all([user, signup])
+        session.flush()
+        if index % 2:
+            engagement_service.like(activity_id=activity.id, user_id=user.id)
+        if index % 3:
+            engagement_service.share(activity_id=activity.id, user_id=user.id, payload=ActivityShareRequest(channel="wechat"))
+        if index % 4 == 0:
+            feedback_service.submit_feedback(
+                user_id=user.id,
+                activity_id=activity.id,
+                payload=ActivityFeedbackSubmit(rating=4, comment=f"反馈{index}", is_public=True),
+            )
+
+
+def test_signup_export_query_count_is_independent_of_signups(session, query_counter):
+    activity = Activity(title="批量导出", status=ActivityStatus.PUBLISHED)
+    session.add(activity)
+    session.flush()
+    service = ExportService(session)
+
+    _signups_with_engagement(session, activity, 3)
+    query_counter.clear()
+    _, small_content = service.activity_signups_export(activity.id)
+    small = len(query_counter)
+
+    _signups_with_engagement(session, activity, 30, offset=3)
+    query_counter.clear()
+    _, content = service.activity_signups_export(activity.id)
+    assert len(query_counter) == small
+
+    rows = {row["user_name"]: row for row in csv.DictReader(io.StringIO(content.decode("utf-8-sig")))}
+    assert len(rows) == 33
+    assert rows["批量用户1"]["is_liked"] == "yes"
+    assert rows["批量用户2"]["is_liked"] == "no"
+    assert rows["批量用户3"]["user_share_count"] == "0"
+    assert rows["批量用户4"]["user_share_count"] == "1"
+    assert rows["批量用户4"]["feedback_comment"] == "反馈4"
+    assert rows["批量用户5"]["feedback_rating"] == ""
+
+
+def test_streaming_xlsx_export_uses_spooled_write_only_workbook(session, admin_user, monkeypatch):
+    openpyxl = pytest.importorskip("openpyxl")
+    activity, user, signup = create_signup(session)
+    session.commit()
+    service = ExportService(session)
+    # force the spool to disk to cover the spill path
+    monkeypatch.setattr(service.settings, "export_spool_max_bytes", 1)
+
+    filename, stream = service.stream_activity_signups_export(
+        activity.id, actor_admin_id=admin_user.id, fmt="xlsx", chunk_size=1
+    )
+    content = b"".join(stream)
+
+    assert filename == f"activity_{activity.id}_signups.xlsx"
+    workbook = openpyxl.load_workbook(io.BytesIO(content), read_only=True)
+    rows = list(workbook.active.iter_rows(values_only=True))
+    assert rows[0][0] == "signup_id"
+    assert rows[1][0] == signup.id
+    assert rows[1][2] == user.name
+
+    _, buffered = service.activity_signups_export(activity.id, fmt="xlsx")
+    buffered_rows = list(openpyxl.load_workbook(io.BytesIO(buffered), read_only=True).active.iter_rows(values_only=True))
+    assert buffered_rows == rows
+
+
+def test_signup_export_pivots_form_answers_into_columns(session, query_counter):
+    activity = Activity(title="表单导出", status=ActivityStatus.PUBLISHED)
+    company = ActivityFormField(activity=activity, name="company", label="公司", field_type=FieldType.TEXT, display_order=1)
+    topics = ActivityFormField(
+        activity=activity, name="topics", label="关注话题", field_type=FieldType.MULTI_SELECT, display_order=2
+    )
+    session.add_all([activity, company, topics])
+    for index in range(5):
+        user = UserProfile(openid=f"form-user-{index}", name=f"表单用户{index}")
+        signup = Signup(activity=activity, user=user, status=SignupStatus.APPROVED)
+        if index != 2:
+            signup.answers.append(SignupFieldAnswer(field=company, value_text=f"公司{index}"))
+        if index % 2 == 0:
+            signup.answers.append(SignupFieldAnswer(field=topics, value_json=["AI", f"话题{index}"]))
+        session.add(signup)
+    session.commit()
+    service = ExportService(session)
+
+    query_counter.clear()
+    filename, stream = service.stream_activity_signups_export(activity.id, chunk_size=2)
+    content = b"".join(stream)
+    # fields and answers are each read with a single query, whatever the number of chunks
+    assert sum("FROM activity_form_fields" in statement for statement in query_counter) == 1
+    assert sum("FROM signup_field_answers" in statement for statement in query_counter) == 1
+
+    reader = csv.DictReader(io.StringIO(content.decode("utf-8-sig")))
+    assert reader.fieldnames[-2:] == ["公司", "关注话题"]
+    rows = {row["user_name"]: row for row in reader}
+    assert len(rows) == 5
+    assert rows["表单用户0"]["公司"] == "公司0"
+    assert rows["表单用户0"]["关注话题"] == '["AI", "话题0"]'
+    assert rows["表单用户1"]["关注话题"] == ""
+    assert rows["表单用户2"]["公司"] == ""
+    assert rows["表单用户4"]["关注话题"] == '["AI", "话题4"]'
+
+    _, buffered = service.activity_signups_export(activity.id)
+    assert buffered == content
+
+
+def test_columnar_exports_keep_types_and_nulls(session, admin_user, monkeypatch):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    activity, user, signup = create_signup(session)
+    other = UserProfile(openid="columnar-user", name=None)
+    session.add_all([other, Signup(activity=activity, user=other, status=SignupStatus.PENDING)])
+    ActivityEngagementService(session).like(activity_id=activity.id, user_id=user.id)
+    session.commit()
+    service = ExportService(session)
+
+    filename, stream = service.stream_activity_signups_export(
+        activity.id, actor_admin_id=admin_user.id, fmt="parquet", chunk_size=1
+    )
+    assert filename == f"activity_{activity.id}_signups.parquet"
+    table = pq.read_table(io.BytesIO(b"".join(stream)))
+    assert table.schema.field("signup_id").type == pa.int64()
+    assert table.schema.field("is_liked").type == pa.bool_()
+    assert pa.types.is_timestamp(table.schema.field("created_at").type)
+    rows = {row["signup_id"]: row for row in table.to_pylist()}
+    assert rows[signup.id]["is_liked"] is True
+    assert rows[signup.id]["user_name"] == user.name
+    assert rows[signup.id]["feedback_rating"] is None
+    assert rows[signup.id]["approved_at"] is None
+
+    filename, content = service.activity_comments_export(activity.id, fmt="arrow")
+    assert filename.endswith(".arrow")
+    assert pa.ipc.open_file(pa.BufferReader(content)).read_all().num_rows == 0
+
+    monkeypatch.setattr(service, "_arrow_available", lambda: False)
+    filename, _ = service.activity_shares_export(activity.id, fmt="parquet")
+    assert filename.endswith(".csv")
+
+
+def test_parquet_row_groups_follow_row_group_size():
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    from app.services.export_columnar import write_columnar
+
+    output = io.BytesIO()
+    chunks = ([[index, f"row{index}"] for index in range(start, start + 3)] for start in range(0, 9, 3))
+    write_columnar("parquet", [("id", "int"), ("name", "str")], chunks, output, row_group_rows=6)
+    metadata = pq.ParquetFile(io.BytesIO(output.getvalue())).metadata
+    assert metadata.num_rows == 9
+    assert [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)] == [6, 3]
+
+
+def test_payment_and_audit_log_exports(session, admin_user):
+    from app.models.payment import Payment
+
+    activity, user, signup = create_signup(session)
+    session.add(Payment(activity_id=activity.id, user_id=user.id, activity_title=activity.title, amount=120.5, category="报名费", status="paid"))
+    session.commit()
+    service = ExportService(session)
+
+    filename, stream = service.stream_activity_payments_export(activity.id, actor_admin_id=admin_user.id)
+    assert filename == f"activity_{activity.id}_payments.csv"
+    rows = list(csv.DictReader(io.StringIO(b"".join(stream).decode("utf-8-sig"))))
+    assert len(rows) == 1
+    assert rows[0]["user_name"] == user.name
+    assert float(rows[0]["amount"]) == 120.5
+    assert rows[0]["transaction_no"] == ""
+
+    filename, stream = service.stream_audit_log_export(actor_admin_id=admin_user.id, action=AuditAction.EXPORT_SIGNUPS)
+    assert filename == "audit_logs.csv"
+    logs = list(csv.DictReader(io.StringIO(b"".join(stream).decode("utf-8-sig"))))
+    # the payments export and the audit log export itself
+    assert [log["action"] for log in logs] == ["export_signups", "export_signups"]
+    assert '"kind": "audit_logs"' in logs[0]["context"]
@@ -9,3 +9,19 @@ def test_health_check():
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
+
+
+def test_shutdown_closes_the_sender_runtime(monkeypatch):
+    import app.main as main
+
+    closed = []
+
+    class FakeRuntime:
+        def close(self):
+            closed.append(True)
+
+    monkeypatch.setattr(main, "get_sender_runtime", lambda: FakeRuntime())
+    with TestClient(app) as started:
+        assert started.get("/health").status_code == 200
+        assert closed == []
+    assert closed == [True]
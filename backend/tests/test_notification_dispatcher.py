@@ -0,0 +1,380 @@
+import threading
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.models.audit import AuditLog
+from app.models.enums import AuditAction, NotificationChannel, NotificationEvent, NotificationStatus
+from app.models.notification import NotificationLog
+from app.repositories.notifications import NotificationRepository
+from app.services.notification_dispatcher import NotificationDispatcher
+from app.services.notification_senders import NotificationContext
+
+
+class RecordingSender:
+    def __init__(self, fail_numbers: set[int] | None = None) -> None:
+        self.sent: Counter = Counter()
+        self.fail_numbers = fail_numbers or set()
+        self._lock = threading.Lock()
+
+    def send(self, context: NotificationContext) -> None:
+        if context.payload["n"] in self.fail_numbers:
+            raise RuntimeError("provider_rejected")
+        with self._lock:
+            self.sent[context.payload["n"]] += 1
+
+
+@pytest.fixture()
+def factory(tmp_path):
+    # workers run on threads with their own sessions: use a file database
+    engine = create_engine(f"sqlite:///{tmp_path / 'dispatch.db'}", future=True)
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine, autoflush=False, future=True)
+    engine.dispose()
+
+
+def add_pending(session, count, **values):
+    session.add_all(
+        NotificationLog(
+            channel=NotificationChannel.WECHAT,
+            event=NotificationEvent.SIGNUP_SUBMITTED,
+            status=NotificationStatus.PENDING,
+            payload={"n": index},
+            **values,
+        )
+        for index in range(count)
+    )
+    session.commit()
+
+
+def test_parallel_workers_send_each_notification_once(factory):
+    session = factory()
+    add_pending(session, 120)
+    add_pending(session, 5, scheduled_send_at=datetime.now(timezone.utc) + timedelta(hours=1))
+    sender = RecordingSender(fail_numbers={7})
+
+    dispatched = NotificationDispatcher(
+        factory, workers=4, batch_size=10, senders={NotificationChannel.WECHAT: sender}
+    ).run()
+
+    assert dispatched == 120
+    assert len(sender.sent) == 119
+    assert set(sender.sent.values()) == {1}
+    statuses = dict(
+        session.execute(select(NotificationLog.status, func.count()).group_by(NotificationLog.status)).all()
+    )
+    assert statuses == {NotificationStatus.SENT: 119, NotificationStatus.FAILED: 1, NotificationStatus.PENDING: 5}
+    failed = session.execute(
+        select(NotificationLog).where(NotificationLog.status == NotificationStatus.FAILED)
+    ).scalar_one()
+    assert (failed.retry_count, failed.error_message, failed.claim_token) == (1, "provider_rejected", None)
+    audits = session.execute(
+        select(func.count()).select_from(AuditLog).where(AuditLog.action == AuditAction.NOTIFICATION_SENT)
+    ).scalar_one()
+    assert audits == 120
+    session.close()
+
+
+def test_claims_are_exclusive_until_the_lease_expires(factory):
+    session = factory()
+    add_pending(session, 3)
+    repo = NotificationRepository(session)
+    now = datetime.now(timezone.utc)
+    lease_until = now + timedelta(minutes=5)
+
+    first = repo.claim_batch(token="worker-a", limit=10, now=now, lease_until=lease_until)
+    session.commit()
+    assert len(first) == 3
+    assert all(log.status == NotificationStatus.SENDING for log in first)
+    assert repo.claim_batch(token="worker-b", limit=10, now=now, lease_until=lease_until) == []
+
+    # worker-a crashed: once its lease has run out the rows are claimed again
+    later = lease_until + timedelta(seconds=1)
+    retaken = repo.claim_batch(token="worker-b", limit=10, now=later, lease_until=later + timedelta(minutes=5))
+    assert [log.id for log in retaken] == [log.id for log in first]
+
+    ids = [log.id for log in first]
+    assert repo.finish_claimed(ids, token="worker-a", status=NotificationStatus.SENT, now=later) == 0
+    assert repo.finish_claimed(ids, token="worker-b", status=NotificationStatus.SENT, now=later) == 3
+    session.commit()
+    session.close()
+
+
+def test_background_dispatcher_sends_deferred_notifications_after_commit(factory, monkeypatch):
+    import time
+
+    from app.services.notification_dispatcher import BackgroundNotificationDispatcher
+    from app.services.notifications import NotificationService
+
+    sender = RecordingSender()
+    senders = {NotificationChannel.WECHAT: sender}
+    # a long poll interval: delivery has to come from the commit wake-up
+    background = BackgroundNotificationDispatcher(
+        NotificationDispatcher(factory, workers=1, senders=senders), latency_seconds=60
+    )
+    background.start()
+    session = factory()
+    try:
+        service = NotificationService(session, senders=senders)
+        monkeypatch.setattr(service.settings, "notification_delivery_mode", "deferred")
+        log = service.enqueue(
+            user_id=None,
+            activity_id=None,
+            signup_id=None,
+            channel=NotificationChannel.WECHAT,
+            event=NotificationEvent.SIGNUP_SUBMITTED,
+            payload={"n": 1},
+        )
+        session.commit()
+        deadline = time.monotonic() + 5
+        while not sender.sent and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        background.stop()
+    assert sender.sent == Counter({1: 1})
+    session.refresh(log)
+    assert log.status == NotificationStatus.SENT
+    session.close()
+
+
+class AlwaysFailing:
+    def send(self, context: NotificationContext) -> None:
+        raise RuntimeError("throttled")
+
+
+def test_failed_sends_back_off_then_move_to_dead_letter(session, monkeypatch):
+    from app.services.notifications import NotificationService
+
+    add_pending(session, 1)
+    service = NotificationService(session, senders={NotificationChannel.WECHAT: AlwaysFailing()})
+    monkeypatch.setattr(service.settings, "notification_max_attempts", 3)
+    monkeypatch.setattr(service.settings, "notification_retry_base_seconds", 60)
+    log = session.execute(select(NotificationLog)).scalar_one()
+
+    before = datetime.now(timezone.utc)
+    assert service.dispatch_pending() == 1
+    session.refresh(log)
+    assert (log.status, log.retry_count, log.error_message) == (NotificationStatus.FAILED, 1, "throttled")
+    retry_at = log.scheduled_send_at.replace(tzinfo=timezone.utc)
+    # first retry waits between half and all of the base delay
+    assert before + timedelta(seconds=29) <= retry_at <= datetime.now(timezone.utc) + timedelta(seconds=60)
+    assert service.dispatch_pending() == 0
+
+    for attempt in (2, 3):
+        log.scheduled_send_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+        session.commit()
+        assert service.dispatch_pending() == 1
+        session.refresh(log)
+        assert log.retry_count == attempt
+    assert log.status == NotificationStatus.DEAD_LETTER
+    assert log.scheduled_send_at.replace(tzinfo=timezone.utc) < datetime.now(timezone.utc)
+    assert service.dispatch_pending() == 0
+    contexts = [entry.context["status"] for entry in session.execute(select(AuditLog)).scalars()]
+    assert contexts == ["failed", "failed", "dead_letter"]
+
+
+def test_token_bucket_grants_bursts_then_paces():
+    from app.utils.token_bucket import TokenBucket
+
+    now = [0.0]
+    sleeps: list[float] = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    bucket = TokenBucket(10, 5, clock=lambda: now[0], sleep=sleep)
+    assert bucket.acquire(8) == 5
+    assert bucket.acquire(8) == 1
+    assert sleeps == [pytest.approx(0.1)]
+    now[0] += 1.0
+    assert bucket.acquire(8) == 5
+
+
+def test_dispatch_is_paced_by_the_channel_rate_limit(session, monkeypatch):
+    import time
+
+    from app.services.notifications import NotificationService
+
+    class BatchRecorder:
+        def __init__(self):
+            self.batches: list[int] = []
+
+        def send(self, context):
+            self.batches.append(1)
+
+        def send_many(self, contexts):
+            self.batches.append(len(contexts))
+            return [None] * len(contexts)
+
+    add_pending(session, 30)
+    sender = BatchRecorder()
+    service = NotificationService(session, senders={NotificationChannel.WECHAT: sender})
+    monkeypatch.setattr(service.settings, "notification_rate_limit_wechat", 97.0)
+    monkeypatch.setattr(service.settings, "notification_rate_burst", 10)
+
+    started = time.monotonic()
+    assert service.dispatch_pending(limit=30) == 30
+    elapsed = time.monotonic() - started
+
+    assert sum(sender.batches) == 30
+    assert sender.batches[0] == 10
+    assert max(sender.batches) <= 10
+    # 10 sent as the burst, the other 20 at ~97/s
+    assert elapsed >= 0.18
+
+
+def test_paced_batch_outlasting_its_lease_sends_each_notification_once(factory, monkeypatch):
+    import time
+
+    from app.services.notifications import NotificationService
+
+    session = factory()
+    add_pending(session, 30)
+    sender = RecordingSender()
+    service = NotificationService(session, senders={NotificationChannel.WECHAT: sender})
+    monkeypatch.setattr(service.settings, "notification_claim_lease_seconds", 1)
+    monkeypatch.setattr(service.settings, "notification_rate_limit_wechat", 20.0)
+    monkeypatch.setattr(service.settings, "notification_rate_burst", 2)
+
+    # a second worker polls while the first paces its batch (~1.4 s) past the 1 s lease
+    stop = threading.Event()
+
+    def poll():
+        time.sleep(0.2)  # let the first worker claim the whole batch
+        other = factory()
+        try:
+            while not stop.is_set():
+                NotificationService(other, senders={NotificationChannel.WECHAT: sender}).dispatch_pending(limit=30)
+                time.sleep(0.05)
+        finally:
+            other.close()
+
+    poller = threading.Thread(target=poll)
+    poller.start()
+    started = time.monotonic()
+    assert service.dispatch_pending(limit=30) == 30
+    stop.set()
+    poller.join()
+
+    assert time.monotonic() - started > 1
+    assert sorted(sender.sent) == list(range(30))
+    assert set(sender.sent.values()) == {1}
+    statuses = session.execute(select(NotificationLog.status)).scalars().all()
+    assert statuses == [NotificationStatus.SENT] * 30
+    session.close()
+
+
+def test_coalesced_notifications_go_out_as_one_digest(session, monkeypatch):
+    from app.models.user import UserProfile
+    from app.services.notifications import NotificationService
+
+    class ContextRecorder:
+        def __init__(self):
+            self.contexts: list[NotificationContext] = []
+
+        def send(self, context):
+            self.contexts.append(context)
+
+    owner = UserProfile(openid="digest-owner", name="合并用户")
+    other = UserProfile(openid="digest-other", name="其他用户")
+    session.add_all([owner, other])
+    session.commit()
+    wechat, email = ContextRecorder(), ContextRecorder()
+    service = NotificationService(
+        session, senders={NotificationChannel.WECHAT: wechat, NotificationChannel.EMAIL: email}
+    )
+    monkeypatch.setattr(service.settings, "notification_coalesce_window_seconds", 60)
+    monkeypatch.setattr(service.settings, "notification_delivery_mode", "deferred")
+
+    def enqueue(user, channel, n):
+        return service.enqueue(
+            user_id=user.id,
+            activity_id=None,
+            signup_id=None,
+            channel=channel,
+            event=NotificationEvent.SIGNUP_APPROVED,
+            payload={"n": n},
+        )
+
+    burst = [enqueue(owner, NotificationChannel.WECHAT, n) for n in range(3)]
+    enqueue(owner, NotificationChannel.EMAIL, 3)
+    enqueue(other, NotificationChannel.WECHAT, 4)
+    session.commit()
+
+    digests = session.execute(
+        select(NotificationLog).where(NotificationLog.event == NotificationEvent.DIGEST).order_by(NotificationLog.id)
+    ).scalars().all()
+    assert len(digests) == 3
+    assert {log.digest_id for log in burst} == {digests[0].id}
+    assert all(log.status == NotificationStatus.PENDING for log in burst)
+    assert service.unread_count(owner.id) == 4
+    assert len(service.list_inbox(owner.id)[0]) == 4
+    # nothing goes out before the window closes
+    assert service.dispatch_pending() == 0
+
+    for digest in digests:
+        digest.scheduled_send_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    session.commit()
+    assert service.dispatch_pending() == 3
+
+    delivered = [(context.user_id, context.payload["count"]) for context in wechat.contexts]
+    assert delivered == [(owner.id, 3), (other.id, 1)]
+    assert [item["payload"]["n"] for item in wechat.contexts[0].payload["items"]] == [0, 1, 2]
+    assert len(email.contexts) == 1
+    statuses = session.execute(
+        select(NotificationLog.status).where(NotificationLog.event != NotificationEvent.DIGEST)
+    ).scalars().all()
+    assert statuses == [NotificationStatus.SENT] * 5
+    audits = session.execute(select(AuditLog).order_by(AuditLog.id)).scalars().all()
+    assert [entry.entity_id for entry in audits] == [digests[0].id, digests[2].id, digests[1].id]
+    assert audits[0].context["notification_ids"] == [log.id for log in burst]
+
+    # a notification that joined a digest after it went out is sent on its own
+    straggler = NotificationLog(
+        user_id=owner.id,
+        channel=NotificationChannel.WECHAT,
+        event=NotificationEvent.SIGNUP_REMINDER,
+        status=NotificationStatus.PENDING,
+        payload={"n": 5},
+        digest_id=digests[0].id,
+    )
+    session.add(straggler)
+    session.commit()
+    assert service.dispatch_pending() == 1
+    assert wechat.contexts[-1].event == NotificationEvent.SIGNUP_REMINDER
+
+
+def test_inline_mode_sends_each_notification_without_a_digest(session, monkeypatch):
+    from app.models.user import UserProfile
+    from app.services.notifications import NotificationService
+
+    user = UserProfile(openid="digest-inline", name="即时用户")
+    session.add(user)
+    session.commit()
+    sender = RecordingSender()
+    service = NotificationService(session, senders={NotificationChannel.WECHAT: sender})
+    monkeypatch.setattr(service.settings, "notification_coalesce_window_seconds", 60)
+    monkeypatch.setattr(service.settings, "notification_delivery_mode", "inline")
+
+    # no background dispatcher runs in inline mode to send a digest when its window closes
+    for n in range(3):
+        service.enqueue(
+            user_id=user.id,
+            activity_id=None,
+            signup_id=None,
+            channel=NotificationChannel.WECHAT,
+            event=NotificationEvent.SIGNUP_APPROVED,
+            payload={"n": n},
+        )
+    session.commit()
+
+    assert sorted(sender.sent) == [0, 1, 2]
+    logs = session.execute(select(NotificationLog)).scalars().all()
+    assert [(log.event, log.status, log.digest_id) for log in logs] == [
+        (NotificationEvent.SIGNUP_APPROVED, NotificationStatus.SENT, None)
+    ] * 3
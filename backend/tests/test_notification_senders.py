@@ -0,0 +1,150 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.models.enums import NotificationChannel, NotificationEvent
+from app.services.notification_senders import (
+    AsyncSenderRuntime,
+    HttpNotificationSender,
+    NotificationContext,
+    create_sender,
+    send_many,
+)
+
+
+class StubGateway:
+    """Local HTTP server standing in for a provider gateway."""
+
+    def __init__(self, *, delay: float = 0.0) -> None:
+        self.requests: list[dict] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.connections: set[int] = set()
+        lock = threading.Lock()
+        gateway = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with lock:
+                    gateway.requests.append(body)
+                    gateway.connections.add(self.client_address[1])
+                    gateway.in_flight += 1
+                    gateway.max_in_flight = max(gateway.max_in_flight, gateway.in_flight)
+                time.sleep(delay)
+                with lock:
+                    gateway.in_flight -= 1
+                status = 500 if (body["payload"] or {}).get("fail") else 200
+                self.send_response(status)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"{}")
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/send"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture()
+def runtime():
+    runtime = AsyncSenderRuntime(max_connections=20)
+    yield runtime
+    runtime.close()
+
+
+def contexts(count, **payload):
+    return [
+        NotificationContext(
+            channel=NotificationChannel.SMS,
+            event=NotificationEvent.SIGNUP_APPROVED,
+            user_id=index,
+            activity_id=None,
+            signup_id=None,
+            payload={"n": index, **payload},
+        )
+        for index in range(count)
+    ]
+
+
+def test_http_sender_sends_a_batch_concurrently_within_its_limit(runtime):
+    gateway = StubGateway(delay=0.05)
+    try:
+        sender = HttpNotificationSender(gateway.url, concurrency=4, timeout=5, runtime=runtime)
+        errors = sender.send_many(contexts(12))
+        assert errors == [None] * 12
+        assert sorted(request["user_id"] for request in gateway.requests) == list(range(12))
+        assert gateway.requests[0]["channel"] == "sms"
+        assert 1 < gateway.max_in_flight <= 4
+        # pooled keep-alive connections are reused across batches
+        assert sender.send_many(contexts(4)) == [None] * 4
+        assert len(gateway.connections) <= 4
+    finally:
+        gateway.close()
+
+
+def test_http_sender_reports_status_errors_and_timeouts(runtime):
+    gateway = StubGateway(delay=0.3)
+    try:
+        sender = HttpNotificationSender(gateway.url, concurrency=2, timeout=5, runtime=runtime)
+        assert sender.send_many(contexts(1, fail=True)) == ["http_500"]
+        with pytest.raises(Exception):
+            sender.send(contexts(1, fail=True)[0])
+        impatient = HttpNotificationSender(gateway.url, timeout=0.05, runtime=runtime)
+        assert impatient.send_many(contexts(1)) == ["timeout"]
+    finally:
+        gateway.close()
+
+
+def test_senders_for_one_url_share_its_concurrency_limit(runtime):
+    gateway = StubGateway(delay=0.05)
+    try:
+        first = runtime.http_sender(gateway.url, concurrency=2, timeout=5)
+        second = runtime.http_sender(gateway.url, concurrency=2, timeout=5)
+        assert first is second
+        # two callers (e.g. two requests' services) sending at once stay within the one limit
+        threads = [threading.Thread(target=sender.send_many, args=(contexts(6),)) for sender in (first, second)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(gateway.requests) == 12
+        assert gateway.max_in_flight <= 2
+    finally:
+        gateway.close()
+
+
+def test_a_sender_keeps_working_after_its_runtime_is_closed(runtime):
+    gateway = StubGateway()
+    try:
+        sender = runtime.http_sender(gateway.url, concurrency=2, timeout=5)
+        assert sender.send_many(contexts(2)) == [None, None]
+        # shutdown stops the loop; a service still holding the sender gets a fresh loop and semaphore
+        runtime.close()
+        assert runtime.http_sender(gateway.url, concurrency=2, timeout=5) is sender
+        assert sender.send_many(contexts(3)) == [None] * 3
+        assert len(gateway.requests) == 5
+    finally:
+        gateway.close()
+
+
+def test_send_many_falls_back_to_send_and_urls_build_http_senders():
+    class Flaky:
+        def send(self, context):
+            if context.user_id == 1:
+                raise RuntimeError("boom")
+
+    assert send_many(Flaky(), contexts(3)) == [None, "boom", None]
+    assert isinstance(create_sender("https://sms.example.com/send"), HttpNotificationSender)
+    assert create_sender("https://sms.example.com/send") is create_sender("https://sms.example.com/send")
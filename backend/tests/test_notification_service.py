@@ -157,3 +157,169 @@ def test_notification_preview(session):
             event=NotificationEvent.SIGNUP_APPROVED,
             signup_id=999,
         )
+
+
+def test_deferred_enqueue_only_inserts_the_log(session, query_counter, monkeypatch):
+    from app.services.notifications import delivery_requested
+
+    user = UserProfile(openid="notif-deferred", name="延迟通知用户")
+    session.add(user)
+    session.flush()
+    service = NotificationService(session)
+    monkeypatch.setattr(service.settings, "notification_delivery_mode", "deferred")
+    delivery_requested.clear()
+    query_counter.clear()
+
+    log = service.enqueue(
+        user_id=user.id,
+        activity_id=None,
+        signup_id=None,
+        channel=NotificationChannel.WECHAT,
+        event=NotificationEvent.SIGNUP_SUBMITTED,
+    )
+
+    assert log.status == NotificationStatus.PENDING
+    assert _writes(query_counter) == [("INSERT", "notification_logs"), ("UPDATE", "user_profiles")]
+    assert not delivery_requested.is_set()
+    session.commit()
+    assert delivery_requested.is_set()
+
+    assert service.dispatch_pending(limit=10) == 1
+    session.refresh(log)
+    assert log.status == NotificationStatus.SENT
+    audit_logs = session.execute(select(AuditLog)).scalars().all()
+    assert [entry.action for entry in audit_logs] == [AuditAction.NOTIFICATION_SENT]
+
+
+def _writes(statements):
+    """(verb, table) of each recorded statement."""
+    result = []
+    for statement in statements:
+        words = statement.split()
+        result.append((words[0], words[2] if words[1] in ("INTO", "FROM") else words[1]))
+    return result
+
+
+def _user_notifications(session, openid, statuses):
+    # rows are added directly (all unread), so seed the counter the repository would have kept
+    user = UserProfile(openid=openid, name=openid, unread_notification_count=len(statuses))
+    session.add(user)
+    session.flush()
+    logs = [
+        NotificationLog(
+            user_id=user.id,
+            channel=NotificationChannel.WECHAT,
+            event=NotificationEvent.SIGNUP_SUBMITTED,
+            status=status,
+        )
+        for status in statuses
+    ]
+    session.add_all(logs)
+    session.commit()
+    return user, logs
+
+
+def test_bulk_notification_operations_run_one_statement(session, query_counter):
+    owner, logs = _user_notifications(
+        session, "bulk-owner", [NotificationStatus.SENT] * 3 + [NotificationStatus.PENDING, NotificationStatus.FAILED]
+    )
+    other, other_logs = _user_notifications(session, "bulk-other", [NotificationStatus.SENT] * 2)
+    service = NotificationService(session)
+    owner_id = owner.id
+    owner_ids = [log.id for log in logs]
+    other_ids = [log.id for log in other_logs]
+
+    other_id = other.id
+    counter_update = ("UPDATE", "user_profiles")
+
+    query_counter.clear()
+    assert service.mark_all_read(owner_id) == 5
+    assert _writes(query_counter) == [("UPDATE", "notification_logs"), counter_update]
+    assert all(log.read_at is not None for log in logs)
+    # reading does not touch delivery: the pending row and the retry still go out
+    assert [log.status for log in logs[3:]] == [NotificationStatus.PENDING, NotificationStatus.FAILED]
+    assert service.mark_all_read(owner_id) == 0
+
+    query_counter.clear()
+    assert service.batch_delete([owner_ids[0], owner_ids[1], other_ids[0]], user_id=owner_id) == 2
+    assert _writes(query_counter) == [counter_update, ("DELETE", "notification_logs")]
+
+    query_counter.clear()
+    assert service.delete_notification(other_ids[1], user_id=owner_id) is False
+    assert service.delete_all_for_user(owner_id) == 3
+    assert _writes(query_counter) == [counter_update, ("DELETE", "notification_logs")] * 2
+
+    remaining = session.execute(select(NotificationLog.user_id, NotificationLog.status)).all()
+    assert remaining == [(other_id, NotificationStatus.SENT)] * 2
+    assert (service.unread_count(owner_id), service.unread_count(other_id)) == (0, 2)
+
+
+def test_unread_counter_follows_enqueue_read_and_delete(session, monkeypatch):
+    user = UserProfile(openid="notif-unread", name="未读用户")
+    session.add(user)
+    session.commit()
+    service = NotificationService(session)
+    monkeypatch.setattr(service.settings, "notification_delivery_mode", "deferred")
+
+    def enqueue():
+        log = service.enqueue(
+            user_id=user.id,
+            activity_id=None,
+            signup_id=None,
+            channel=NotificationChannel.WECHAT,
+            event=NotificationEvent.SIGNUP_SUBMITTED,
+        )
+        session.commit()
+        return log
+
+    first, second = enqueue(), enqueue()
+    assert service.unread_count(user.id) == 2
+    service.mark_all_read(user.id)
+    assert service.unread_count(user.id) == 0
+    third = enqueue()
+    assert service.unread_count(user.id) == 1
+    # deleting a read notification leaves the counter alone, deleting an unread one lowers it
+    assert service.delete_notification(first.id, user_id=user.id) is True
+    assert service.unread_count(user.id) == 1
+    assert service.batch_delete([second.id, third.id], user_id=user.id) == 2
+    assert service.unread_count(user.id) == 0
+    assert service.unread_count(9999) == 0
+
+
+def test_retry_survives_mark_all_read(session):
+    user, (retry,) = _user_notifications(session, "notif-retry", [NotificationStatus.FAILED])
+    retry.retry_count = 1
+    retry.scheduled_send_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    session.commit()
+    service = NotificationService(session)
+
+    assert service.mark_all_read(user.id) == 1
+    assert service.unread_count(user.id) == 0
+    assert service.dispatch_pending() == 1
+
+    session.refresh(retry)
+    assert retry.status == NotificationStatus.SENT
+    assert retry.read_at is not None
+    assert service.unread_count(user.id) == 0
+
+
+def test_inbox_pages_by_created_at_then_id(session):
+    user, logs = _user_notifications(session, "notif-inbox", [NotificationStatus.SENT] * 7)
+    same_time = datetime(2026, 1, 1, 9, 0, 0)
+    for index, log in enumerate(logs):
+        # the newest four share a timestamp: the id has to break the tie
+        log.created_at = same_time if index >= 3 else same_time - timedelta(minutes=10 - index)
+    session.commit()
+    service = NotificationService(session)
+
+    pages, cursor = [], None
+    while True:
+        page, cursor = service.list_inbox(user.id, limit=3, cursor=cursor)
+        pages.append([log.id for log in page])
+        if cursor is None:
+            break
+    ids = [log.id for log in logs]
+    assert pages == [ids[6:3:-1], [ids[3], ids[2], ids[1]], [ids[0]]]
+
+    with pytest.raises(ValueError):
+        service.list_inbox(user.id, cursor="not-a-cursor")
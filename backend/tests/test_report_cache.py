@@ -0,0 +1,164 @@
+import threading
+import time
+
+import pytest
+
+from app.models.activity import Activity
+from app.models.enums import ActivityStatus
+from app.models.user import UserProfile
+from app.schemas.engagement import ActivityShareRequest
+from app.services.engagements import ActivityEngagementService
+from app.services.report_cache import ReportCache, get_report_cache
+from app.services.reports import ReportService
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture()
+def report_cache():
+    cache = get_report_cache()
+    cache.clear()
+    yield cache
+    cache.clear()
+
+
+def test_cache_hits_until_ttl_expires():
+    clock = FakeClock()
+    cache = ReportCache(ttl_seconds=10, clock=clock)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get_or_compute(("overview", None, 7), compute) == 1
+    assert cache.get_or_compute(("overview", None, 7), compute) == 1
+    clock.now = 11
+    assert cache.get_or_compute(("overview", None, 7), compute) == 2
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+
+
+def test_invalidate_scopes_to_activity_and_overview():
+    cache = ReportCache(ttl_seconds=60)
+    cache.get_or_compute(("overview", None, None), lambda: "overview")
+    cache.get_or_compute(("activity", 1, None), lambda: "a1")
+    cache.get_or_compute(("activity", 2, None), lambda: "a2")
+
+    cache.invalidate(activity_id=1)
+
+    assert cache.get_or_compute(("overview", None, None), lambda: "overview-new") == "overview-new"
+    assert cache.get_or_compute(("activity", 1, None), lambda: "a1-new") == "a1-new"
+    assert cache.get_or_compute(("activity", 2, None), lambda: "a2-new") == "a2"
+
+
+def test_stale_while_revalidate_serves_stale_and_refreshes_once():
+    clock = FakeClock()
+    cache = ReportCache(ttl_seconds=10, stale_seconds=60, clock=clock)
+    cache.get_or_compute(("overview", None, 30), lambda: "v1")
+    clock.now = 15
+
+    release = threading.Event()
+    refreshed = []
+
+    def slow_refresh():
+        release.wait(5)
+        refreshed.append(1)
+        return "v2"
+
+    # concurrent callers get the stale value without waiting for the refresh
+    assert cache.get_or_compute(("overview", None, 30), lambda: "blocking", refresh=slow_refresh) == "v1"
+    assert cache.get_or_compute(("overview", None, 30), lambda: "blocking", refresh=slow_refresh) == "v1"
+    release.set()
+    for _ in range(100):
+        if cache.stats()["refreshes"] == 1 and refreshed:
+            break
+        time.sleep(0.01)
+    time.sleep(0.05)
+
+    assert cache.get_or_compute(("overview", None, 30), lambda: "blocking") == "v2"
+    stats = cache.stats()
+    assert stats["stale_hits"] == 2
+    assert stats["refreshes"] == 1
+
+
+def test_cold_key_is_computed_once_for_concurrent_callers():
+    cache = ReportCache(ttl_seconds=60)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return "value"
+
+    threads = [threading.Thread(target=cache.get_or_compute, args=(("overview", None, 1), compute)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+
+
+def test_engagement_write_invalidates_cached_activity_report(session, report_cache):
+    activity = Activity(title="缓存活动", status=ActivityStatus.PUBLISHED)
+    user = UserProfile(openid="cache-user", name="缓存用户")
+    session.add_all([activity, user])
+    session.commit()
+
+    service = ReportService(session)
+    assert service.cached_activity_report(activity.id)["total_shares"] == 0
+    assert service.cached_activity_report(activity.id)["total_shares"] == 0
+    assert report_cache.stats()["hits"] == 1
+
+    ActivityEngagementService(session).share(
+        activity_id=activity.id, user_id=user.id, payload=ActivityShareRequest(channel="weapp")
+    )
+
+    assert service.cached_activity_report(activity.id)["total_shares"] == 1
+
+
+def test_cache_evicts_least_recently_used_and_sweeps_expired_entries():
+    clock = FakeClock()
+    cache = ReportCache(ttl_seconds=10, max_entries=2, clock=clock)
+    cache.get_or_compute(("activity", 1, None), lambda: "a")
+    cache.get_or_compute(("activity", 2, None), lambda: "b")
+    cache.get_or_compute(("activity", 1, None), lambda: "stale")  # touch 1: 2 is now the oldest
+    cache.get_or_compute(("activity", 3, None), lambda: "c")
+
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["evictions"] == 1
+    assert cache.get_or_compute(("activity", 1, None), lambda: "recomputed") == "a"
+    assert cache.get_or_compute(("activity", 2, None), lambda: "recomputed") == "recomputed"
+
+    clock.now = 25
+    cache.get_or_compute(("overview", None, 7), lambda: "fresh")
+    assert cache.stats()["entries"] == 1
+    assert set(cache._locks) == {("overview", None, 7)}
+
+
+def test_batch_reports_share_one_entry_per_set_of_ids(session, report_cache, monkeypatch):
+    activities = [Activity(title=f"批量缓存{index}", status=ActivityStatus.PUBLISHED) for index in range(3)]
+    session.add_all(activities)
+    session.commit()
+    ids = [activity.id for activity in activities]
+    service = ReportService(session)
+
+    first = service.cached_batch_activity_reports([ids[2], ids[0], ids[1]])
+    second = service.cached_batch_activity_reports([ids[1], ids[2], ids[1], ids[0]])
+    assert [item["activity_id"] for item in first] == [ids[2], ids[0], ids[1]]
+    assert [item["activity_id"] for item in second] == [ids[1], ids[2], ids[0]]
+    assert report_cache.stats()["entries"] == 1
+    assert report_cache.stats()["hits"] == 1
+
+    monkeypatch.setattr(service.settings, "report_cache_batch_max_ids", 2)
+    assert len(service.cached_batch_activity_reports(ids)) == 3
+    assert report_cache.stats()["entries"] == 1
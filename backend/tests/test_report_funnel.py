@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.activity import Activity
+from app.models.activity_feedback import ActivityFeedback
+from app.models.enums import ActivityStatus, CheckinStatus, SignupStatus
+from app.models.signup import Signup
+from app.models.user import UserProfile
+from app.services import report_stats
+from app.services.report_stats import latency_summary, percentiles
+from app.services.reports import ReportService
+
+
+def test_percentiles_interpolate_like_numpy(monkeypatch):
+    monkeypatch.setattr(report_stats, "_numpy", lambda: None)
+    values = [float(value) for value in range(1, 11)]
+
+    result = percentiles(values)
+
+    assert result["p50"] == pytest.approx(5.5)
+    assert result["p90"] == pytest.approx(9.1)
+    assert result["p99"] == pytest.approx(9.91)
+    assert percentiles([]) == {"p50": None, "p90": None, "p99": None}
+
+
+def test_latency_summary_paths_agree(monkeypatch):
+    sample = [3.0, 1.0, 7.5, 2.0, 10.0]
+    vectorised = latency_summary(sample)
+    monkeypatch.setattr(report_stats, "_numpy", lambda: None)
+    fallback = latency_summary(sample)
+
+    assert fallback == pytest.approx(vectorised)
+    assert fallback["count"] == 5
+    assert fallback["mean"] == pytest.approx(4.7)
+    assert (fallback["min"], fallback["max"]) == (1.0, 10.0)
+
+
+def test_funnel_report(session):
+    activity = Activity(title="漏斗活动", status=ActivityStatus.PUBLISHED)
+    session.add(activity)
+    session.flush()
+    created = datetime(2024, 5, 1, 8, 0, tzinfo=timezone.utc)
+    specs = [
+        # (status, checkin_status, minutes until approval, has feedback)
+        (SignupStatus.APPROVED, CheckinStatus.CHECKED_IN, 10, True),
+        (SignupStatus.APPROVED, CheckinStatus.CHECKED_IN, 20, False),
+        (SignupStatus.APPROVED, CheckinStatus.NOT_CHECKED_IN, 30, False),
+        (SignupStatus.PENDING, CheckinStatus.NOT_CHECKED_IN, None, False),
+    ]
+    for index, (status, checkin_status, minutes, has_feedback) in enumerate(specs):
+        user = UserProfile(openid=f"funnel-user-{index}", name="漏斗用户")
+        reviewed_at = created + timedelta(minutes=minutes) if minutes is not None else None
+        session.add_all(
+            [
+                user,
+                Signup(
+                    activity=activity,
+                    user=user,
+                    status=status,
+                    checkin_status=checkin_status,
+                    created_at=created,
+                    approved_at=reviewed_at,
+                    reviewed_at=reviewed_at,
+                ),
+            ]
+        )
+        if has_feedback:
+            session.add(ActivityFeedback(activity=activity, user=user, rating=5))
+    session.flush()
+
+    report = ReportService(session).funnel_report(activity.id)
+
+    stages = {stage["stage"]: stage for stage in report["stages"]}
+    assert [stage["stage"] for stage in report["stages"]] == ["signed_up", "approved", "checked_in", "feedback"]
+    assert stages["signed_up"]["count"] == 4
+    assert stages["approved"]["count"] == 3
+    assert stages["approved"]["rate_from_previous"] == 0.75
+    assert stages["checked_in"]["rate_from_previous"] == pytest.approx(0.6667)
+    assert stages["feedback"]["count"] == 1
+    assert stages["feedback"]["rate_from_signup"] == 0.25
+
+    approval = report["approval_latency"]
+    assert approval["count"] == 3
+    assert approval["p50"] == pytest.approx(1200, abs=1)
+    assert approval["max"] == pytest.approx(1800, abs=1)
+    assert report["review_latency"]["count"] == 3
@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.activity import Activity
+from app.models.activity_daily_metric import ActivityDailyMetric
+from app.models.activity_engagement import ActivityLike, ActivityShare
+from app.models.enums import ActivityStatus, CheckinStatus, SignupStatus
+from app.models.signup import Signup
+from app.models.user import UserProfile
+from app.services.report_rollups import rebuild_daily_metrics, rollup_series
+from app.services.report_timeseries import daily_series
+
+
+def _dt(days_offset: int) -> datetime:
+    return datetime.now(timezone.utc) - timedelta(days=days_offset)
+
+
+def _rollup_rows(session):
+    rows = session.execute(select(ActivityDailyMetric).order_by(ActivityDailyMetric.activity_id, ActivityDailyMetric.metric_date)).scalars().all()
+    columns = ("signups", "approvals", "checkins", "feedbacks", "favorites", "likes", "shares", "comments")
+    return {
+        (row.activity_id, row.metric_date): {name: getattr(row, name) for name in columns}
+        for row in rows
+        if any(getattr(row, name) for name in columns)
+    }
+
+
+def _seed(session):
+    activity = Activity(title="汇总活动", status=ActivityStatus.PUBLISHED)
+    users = [UserProfile(openid=f"rollup-user-{i}", name=f"汇总用户{i}") for i in range(3)]
+    signups = []
+    for i, user in enumerate(users):
+        signup = Signup(activity=activity, user=user, status=SignupStatus.PENDING, checkin_status=CheckinStatus.NOT_CHECKED_IN)
+        signup.created_at = _dt(i + 1)
+        signups.append(signup)
+    like = ActivityLike(activity=activity, user=users[0])
+    share = ActivityShare(activity=activity, user=users[1], channel="weapp")
+    share.created_at = _dt(2)
+    session.add_all([activity, *users, *signups, like, share])
+    session.flush()
+    return activity, users, signups, like
+
+
+def test_rollup_tracks_inserts_updates_and_deletes(session):
+    activity, users, signups, like = _seed(session)
+    session.commit()
+
+    # approval and check-in on an expired (post-commit) instance
+    signups[0].status = SignupStatus.APPROVED
+    signups[0].approved_at = _dt(0)
+    session.flush()
+    signups[0].checkin_status = CheckinStatus.CHECKED_IN
+    signups[0].checkin_time = _dt(0)
+    session.flush()
+
+    # removals decrement the day they were counted on
+    session.delete(like)
+    session.delete(signups[2])
+    session.flush()
+
+    for days in (1, 7):
+        assert rollup_series(session, days=days) == daily_series(session, days=days)
+        assert rollup_series(session, days=days, activity_id=activity.id) == daily_series(
+            session, days=days, activity_id=activity.id
+        )
+
+    today = rollup_series(session, days=1)[0]
+    assert today["approvals"] == 1
+    assert today["checkins"] == 1
+    assert today["likes"] == 0
+
+
+def test_rebuild_matches_incremental_rollup(session):
+    activity, *_ = _seed(session)
+    session.flush()
+    incremental = _rollup_rows(session)
+    assert incremental
+
+    written = rebuild_daily_metrics(session)
+    assert written == len(incremental)
+    assert _rollup_rows(session) == incremental
+
+    rebuild_daily_metrics(session, activity_id=activity.id)
+    assert _rollup_rows(session) == incremental
+
+
+def test_flush_without_tracked_rows_skips_rollup(session, query_counter):
+    activity, users, *_ = _seed(session)
+    session.commit()
+    query_counter.clear()
+
+    activity.title = "改名活动"
+    users[0].name = "改名用户"
+    session.flush()
+
+    assert query_counter
+    assert not any("activity_daily_metrics" in statement for statement in query_counter)
+
+
+def test_sessions_outside_tracked_factories_leave_rollup_alone(session):
+    activity, users, *_ = _seed(session)
+    session.commit()
+    before = _rollup_rows(session)
+
+    with Session(bind=session.get_bind(), future=True) as other:
+        other.add(Signup(activity_id=activity.id, user_id=users[0].id, status=SignupStatus.PENDING, checkin_status=CheckinStatus.NOT_CHECKED_IN))
+        other.commit()
+
+    assert _rollup_rows(session) == before
@@ -1,8 +1,13 @@
+from datetime import datetime, timezone
+
 from app.models.activity import Activity
 from app.models.enums import ActivityStatus, CheckinStatus, SignupStatus
 from app.models.signup import Signup
 from app.models.user import UserProfile
+from app.repositories.signups import SignupRepository
+from app.services.report_rollups import track_daily_metrics
 from app.services.reports import ReportService
+from app.services.signups import SignupService
 
 
 def create_sample_data(session):
@@ -35,3 +40,177 @@ def test_report_overview(session):
     assert "total_likes" in overview
     assert "total_shares" in overview
     assert "total_comments" in overview
+
+
+def _add_signups(session, activity, specs):
+    for index, (status, checkin_status) in enumerate(specs):
+        user = UserProfile(openid=f"count-user-{activity.id}-{index}", name="计数用户")
+        # check-in sets both the status and the time
+        checkin_time = datetime.now(timezone.utc) if checkin_status == CheckinStatus.CHECKED_IN else None
+        signup = Signup(
+            activity=activity, user=user, status=status, checkin_status=checkin_status, checkin_time=checkin_time
+        )
+        session.add_all([user, signup])
+    session.flush()
+
+
+def test_status_counts_use_a_single_query(session, query_counter):
+    activity = Activity(title="计数活动", status=ActivityStatus.PUBLISHED)
+    other = Activity(title="其他活动", status=ActivityStatus.PUBLISHED)
+    session.add_all([activity, other])
+    session.flush()
+    _add_signups(
+        session,
+        activity,
+        [
+            (SignupStatus.APPROVED, CheckinStatus.CHECKED_IN),
+            (SignupStatus.APPROVED, CheckinStatus.NOT_CHECKED_IN),
+            (SignupStatus.PENDING, CheckinStatus.NOT_CHECKED_IN),
+            (SignupStatus.REJECTED, CheckinStatus.NO_SHOW),
+        ],
+    )
+    _add_signups(session, other, [(SignupStatus.APPROVED, CheckinStatus.CHECKED_IN)])
+    repo = SignupRepository(session)
+
+    query_counter.clear()
+    counts = repo.status_counts(activity_id=activity.id)
+    assert len(query_counter) == 1
+    assert counts["total"] == 4
+    assert counts["status"][SignupStatus.APPROVED] == 2
+    assert counts["status"][SignupStatus.WAITLISTED] == 0
+    assert counts["checkin"][CheckinStatus.CHECKED_IN] == 1
+    assert counts["checkin"][CheckinStatus.NO_SHOW] == 1
+
+    query_counter.clear()
+    assert repo.overall_counts() == {"total": 5, "approved": 3, "checked_in": 2}
+    assert len(query_counter) == 1
+
+    query_counter.clear()
+    stats = SignupService(session).activity_stats(activity.id)
+    assert len(query_counter) == 1
+    assert stats["total_signups"] == 4
+    assert stats["status_counts"][SignupStatus.PENDING.value] == 1
+
+    query_counter.clear()
+    report = ReportService(session).activity_report(activity.id)
+    signup_queries = [sql for sql in query_counter if "FROM signups" in sql]
+    assert len(signup_queries) == 1
+    assert (report["total_signups"], report["approved_signups"], report["checked_in_signups"]) == (4, 2, 1)
+
+
+def test_activity_report_counts_check_ins_by_checkin_time(session):
+    activity = Activity(title="签到口径活动", status=ActivityStatus.PUBLISHED)
+    session.add(activity)
+    session.flush()
+    _add_signups(session, activity, [(SignupStatus.APPROVED, CheckinStatus.CHECKED_IN)])
+    # rows where the two disagree: the report follows checkin_time, the overview checkin_status
+    now = datetime.now(timezone.utc)
+    mismatches = [(CheckinStatus.NOT_CHECKED_IN, now), (CheckinStatus.NOT_CHECKED_IN, now), (CheckinStatus.CHECKED_IN, None)]
+    for index, (checkin_status, checkin_time) in enumerate(mismatches):
+        user = UserProfile(openid=f"checkin-mismatch-{index}", name="口径用户")
+        session.add_all(
+            [
+                user,
+                Signup(
+                    activity=activity,
+                    user=user,
+                    status=SignupStatus.APPROVED,
+                    checkin_status=checkin_status,
+                    checkin_time=checkin_time,
+                ),
+            ]
+        )
+    session.flush()
+    service = ReportService(session)
+
+    assert service.activity_report(activity.id)["checked_in_signups"] == 3
+    assert service.batch_activity_reports([activity.id])[0]["checked_in_signups"] == 3
+    counts = SignupRepository(session).status_counts(activity_id=activity.id)
+    assert (counts["with_checkin_time"], counts["checkin"][CheckinStatus.CHECKED_IN]) == (3, 2)
+
+
+def test_status_counts_empty(session):
+    counts = SignupRepository(session).status_counts(activity_id=999)
+    assert counts["total"] == 0
+    assert all(count == 0 for count in counts["status"].values())
+
+
+def test_concurrent_overview_matches_sequential(tmp_path, monkeypatch):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app.db.base import Base
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'reports.db'}", future=True)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, autoflush=False, future=True)
+    track_daily_metrics(factory)
+    session = factory()
+    try:
+        create_sample_data(session)
+        session.commit()
+        service = ReportService(session, session_factory=factory)
+
+        monkeypatch.setattr(service.settings, "report_concurrent_enabled", False)
+        sequential = service.overview(days=7)
+        monkeypatch.setattr(service.settings, "report_concurrent_enabled", True)
+        concurrent = service.overview(days=7)
+    finally:
+        session.close()
+        engine.dispose()
+
+    expected_queries = {"signups", "feedbacks", "engagements", "time_series", "badge_rule_issuance"}
+    assert set(concurrent["query_timings_ms"]) == expected_queries
+    assert set(sequential["query_timings_ms"]) == expected_queries
+    assert all(value >= 0 for value in concurrent["query_timings_ms"].values())
+    for data in (sequential, concurrent):
+        data.pop("generated_at")
+        data.pop("query_timings_ms")
+    assert concurrent == sequential
+    assert concurrent["total_signups"] == 1
+
+
+def _batch_fixture(session, count):
+    activities = [Activity(title=f"批量活动{i}", status=ActivityStatus.PUBLISHED) for i in range(count)]
+    session.add_all(activities)
+    session.flush()
+    for i, activity in enumerate(activities):
+        _add_signups(
+            session,
+            activity,
+            [(SignupStatus.APPROVED, CheckinStatus.CHECKED_IN)] * (i % 3)
+            + [(SignupStatus.PENDING, CheckinStatus.NOT_CHECKED_IN)],
+        )
+    return activities
+
+
+def test_batch_activity_reports_match_single_reports(session):
+    activities = _batch_fixture(session, 4)
+    service = ReportService(session)
+    ids = [activity.id for activity in activities] + [activities[0].id, 9999]
+
+    batch = service.batch_activity_reports(ids, days=7)
+
+    assert [item["activity_id"] for item in batch] == [activity.id for activity in activities] + [9999]
+    for item in batch:
+        single = service.activity_report(item["activity_id"], days=7)
+        item.pop("generated_at")
+        single.pop("generated_at")
+        assert item == single
+
+
+def test_batch_activity_reports_use_constant_queries(session, query_counter):
+    activities = _batch_fixture(session, 8)
+    service = ReportService(session)
+
+    query_counter.clear()
+    service.batch_activity_reports([activities[0].id, activities[1].id], days=7, granularity="week")
+    small = len(query_counter)
+    query_counter.clear()
+    service.batch_activity_reports([activity.id for activity in activities], days=7, granularity="week")
+    assert len(query_counter) == small
+
+    query_counter.clear()
+    service.batch_activity_reports([activity.id for activity in activities], days=2, granularity="hour")
+    # signups + feedback + four engagement tables + one per series metric
+    assert len(query_counter) == 1 + 1 + 4 + 8
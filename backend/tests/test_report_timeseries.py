@@ -1,11 +1,24 @@
 from datetime import datetime, timedelta, timezone
 
+import pytest
+
+from sqlalchemy import select
+
 from app.models.activity import Activity
 from app.models.activity_engagement import ActivityFavorite, ActivityLike, ActivityShare, ActivityComment
 from app.models.activity_feedback import ActivityFeedback
 from app.models.enums import ActivityStatus, CheckinStatus, SignupStatus
 from app.models.signup import Signup
 from app.models.user import UserProfile
+from app.services.report_rollups import rollup_series
+from app.services.report_timeseries import (
+    bucket_key,
+    bucket_labels,
+    bucket_start,
+    daily_series,
+    time_series,
+    utc_offset_minutes,
+)
 from app.services.reports import ReportService
 
 
@@ -65,3 +78,163 @@ def test_activity_report_timeseries(session):
     assert data["activity_id"] == a.id
     assert "time_series" in data
     assert len(data["time_series"]) == 1
+
+
+def _python_bucketed_series(session, *, days, activity_id=None):
+    """Reference implementation: load every row and bucket it in Python."""
+
+    def key(dt):
+        if not dt:
+            return None
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.astimezone(timezone.utc).strftime("%Y-%m-%d")
+
+    today = datetime.now(timezone.utc).date()
+    start_date = today - timedelta(days=days - 1)
+    metrics = ("signups", "approvals", "checkins", "feedbacks", "favorites", "likes", "shares", "comments")
+    buckets = {
+        (start_date + timedelta(days=i)).strftime("%Y-%m-%d"): {m: 0 for m in metrics} for i in range(days)
+    }
+    sources = [
+        (Signup, "created_at", "signups"),
+        (Signup, "approved_at", "approvals"),
+        (Signup, "checkin_time", "checkins"),
+        (ActivityFeedback, "created_at", "feedbacks"),
+        (ActivityFavorite, "created_at", "favorites"),
+        (ActivityLike, "created_at", "likes"),
+        (ActivityShare, "created_at", "shares"),
+        (ActivityComment, "created_at", "comments"),
+    ]
+    for model, attr, metric in sources:
+        query = select(model)
+        if activity_id is not None:
+            query = query.where(model.activity_id == activity_id)
+        for row in session.execute(query).scalars().all():
+            k = key(getattr(row, attr))
+            if k in buckets:
+                buckets[k][metric] += 1
+    return [{"date": d, **m} for d, m in sorted(buckets.items())]
+
+
+def test_sql_time_series_matches_python_bucketing(session):
+    activities = [Activity(title=f"对比活动{i}", status=ActivityStatus.PUBLISHED) for i in range(2)]
+    session.add_all(activities)
+    offsets = [0, 1, 2, 5, 6, 7, 12, 40]
+    for i, offset in enumerate(offsets):
+        activity = activities[i % 2]
+        user = UserProfile(openid=f"cmp-user-{i}", name=f"对比用户{i}")
+        signup = Signup(activity=activity, user=user, status=SignupStatus.APPROVED, checkin_status=CheckinStatus.CHECKED_IN)
+        signup.created_at = _dt(offset)
+        signup.approved_at = _dt(max(offset - 1, 0))
+        signup.checkin_time = _dt(max(offset - 2, 0)) if i % 3 else None
+        fb = ActivityFeedback(activity=activity, user=user, rating=4, comment="ok")
+        fb.created_at = _dt(offset)
+        fav = ActivityFavorite(activity=activity, user=user)
+        fav.created_at = _dt(offset + 1)
+        like = ActivityLike(activity=activity, user=user)
+        like.created_at = _dt(offset)
+        share = ActivityShare(activity=activity, user=user, channel="weapp")
+        share.created_at = _dt(offset).replace(tzinfo=None)
+        comment = ActivityComment(activity=activity, user=user, content="评论")
+        comment.created_at = _dt(offset + 2)
+        session.add_all([user, signup, fb, fav, like, share, comment])
+    session.flush()
+
+    for days in (1, 3, 7, 30):
+        assert daily_series(session, days=days) == _python_bucketed_series(session, days=days)
+        for activity in activities:
+            assert daily_series(session, days=days, activity_id=activity.id) == _python_bucketed_series(
+                session, days=days, activity_id=activity.id
+            )
+
+
+def _python_granular_series(session, *, days, granularity, offset_minutes):
+    """Reference implementation for local-time buckets of any granularity."""
+    local_tz = timezone(timedelta(minutes=offset_minutes))
+    today = datetime.now(timezone.utc).astimezone(local_tz).date()
+    start_date = today - timedelta(days=days - 1)
+    labels = bucket_labels(start_date, today, granularity)
+    metrics = ("signups", "approvals", "checkins", "feedbacks", "favorites", "likes", "shares", "comments")
+    buckets = {label: {m: 0 for m in metrics} for label in labels}
+    sources = [
+        (Signup, "created_at", "signups"),
+        (Signup, "approved_at", "approvals"),
+        (Signup, "checkin_time", "checkins"),
+        (ActivityFeedback, "created_at", "feedbacks"),
+        (ActivityFavorite, "created_at", "favorites"),
+        (ActivityLike, "created_at", "likes"),
+        (ActivityShare, "created_at", "shares"),
+        (ActivityComment, "created_at", "comments"),
+    ]
+    for model, attr, metric in sources:
+        for row in session.execute(select(model)).scalars().all():
+            value = getattr(row, attr)
+            if value is None:
+                continue
+            if value.tzinfo is None:
+                value = value.replace(tzinfo=timezone.utc)
+            local = value.astimezone(local_tz).replace(tzinfo=None)
+            if not start_date <= local.date() <= today:
+                continue
+            label = bucket_key(bucket_start(local, granularity), granularity)
+            buckets[label][metric] += 1
+    return [{"date": label, **m} for label, m in sorted(buckets.items())]
+
+
+def test_granular_time_series_in_local_time(session):
+    activity = Activity(title="时区活动", status=ActivityStatus.PUBLISHED)
+    session.add(activity)
+    now = datetime.now(timezone.utc)
+    for i, hours in enumerate([0, 3, 7, 15, 23, 30, 49, 170, 400, 900]):
+        user = UserProfile(openid=f"tz-user-{i}", name=f"时区用户{i}")
+        moment = now - timedelta(hours=hours)
+        signup = Signup(activity=activity, user=user, status=SignupStatus.APPROVED, checkin_status=CheckinStatus.CHECKED_IN)
+        signup.created_at = moment
+        signup.approved_at = moment + timedelta(minutes=30)
+        signup.checkin_time = moment + timedelta(hours=2) if i % 2 else None
+        like = ActivityLike(activity=activity, user=user)
+        like.created_at = moment
+        session.add_all([user, signup, like])
+    session.flush()
+
+    shanghai = utc_offset_minutes("Asia/Shanghai")
+    assert shanghai == 480
+    for granularity, days in (("hour", 3), ("day", 30), ("week", 60), ("month", 365)):
+        for offset in (0, shanghai):
+            assert time_series(session, days=days, granularity=granularity, offset_minutes=offset) == (
+                _python_granular_series(session, days=days, granularity=granularity, offset_minutes=offset)
+            )
+
+    hourly = time_series(session, days=1, granularity="hour", offset_minutes=shanghai)
+    assert len(hourly) == 24
+    assert hourly[0]["date"].endswith(" 00:00")
+
+
+def test_rollup_series_folds_weeks_and_months(session):
+    activity = Activity(title="汇总活动", status=ActivityStatus.PUBLISHED)
+    session.add(activity)
+    for i, offset in enumerate([0, 1, 8, 20, 45, 100]):
+        user = UserProfile(openid=f"fold-user-{i}", name=f"汇总用户{i}")
+        signup = Signup(activity=activity, user=user, status=SignupStatus.PENDING, checkin_status=CheckinStatus.NOT_CHECKED_IN)
+        signup.created_at = _dt(offset)
+        session.add_all([user, signup])
+    session.flush()
+
+    for granularity in ("day", "week", "month"):
+        assert rollup_series(session, days=120, granularity=granularity) == time_series(
+            session, days=120, granularity=granularity
+        )
+
+
+def test_series_params_are_validated(session):
+    service = ReportService(session)
+    with pytest.raises(ValueError):
+        service.overview(days=7, granularity="minute")
+    with pytest.raises(ValueError):
+        service.overview(days=90, granularity="hour")
+    with pytest.raises(ValueError):
+        service.overview(days=7, tz="Mars/Olympus")
+    data = service.overview(days=2, granularity="hour", tz="Asia/Shanghai")
+    assert len(data["time_series"]) == 48
+    assert data["timezone"] == "Asia/Shanghai"